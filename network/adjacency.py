@@ -0,0 +1,220 @@
+"""
+follow-up 별 CSR(compressed sparse row) 인접 인덱스.
+
+`cause_abb = X OR outcome_abb = X` 조건은 파티션 전체를 훑어야 하므로, 노드마다
+나가는 엣지(out: cause → outcome)와 들어오는 엣지(in: outcome ← cause)의 행 번호를
+연속 구간으로 모아 둡니다. 각 구간은 rr_values 오름차순이므로 RR 범위는 이진 탐색으로
+자르고, 한 노드의 이웃/에고 네트워크 조회 비용은 그 노드의 차수에 비례합니다.
+"""
+import threading
+
+import numpy as np
+
+from . import snapshot
+
+# neighbor_edges()의 정렬 기준 ('-rr'은 RR 내림차순, p-value는 오름차순 후 RR 내림차순)
+NEIGHBOR_SORTS = ('-rr', 'rr', 'chisq_p', 'fisher_p', 'code')
+
+
+class CSRIndex:
+    """
+    한 방향의 CSR 인접 구조입니다.
+
+    Attributes:
+        indptr: 노드 id별 구간 시작 위치 (길이 = 노드 수 + 1)
+        rows: 파티션 행 번호 (노드별 구간 안에서 rr 오름차순)
+        rr: rows에 해당하는 rr_values (이진 탐색용)
+    """
+
+    def __init__(self, keys, rr, n_nodes):
+        # 파티션 행은 이미 rr 오름차순이므로 안정 정렬이면 구간 안의 rr 순서가 유지됨
+        order = np.argsort(keys, kind='stable')
+        counts = np.bincount(keys, minlength=n_nodes)
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.rows = order.astype(np.int32 if len(order) < 2 ** 31 else np.int64)
+        self.rr = rr[order]
+
+    def degree(self, node):
+        return int(self.indptr[node + 1] - self.indptr[node])
+
+    def rows_of(self, node, rr_min=None, rr_max=None):
+        """
+        노드의 엣지 행 번호를 반환합니다 (RR 범위 지정 시 이진 탐색으로 자름).
+
+        Args:
+            node: 노드 id (파티션 codes 인덱스)
+            rr_min, rr_max: RR 범위 (경계 포함, float32 비교)
+
+        Returns:
+            np.ndarray: 파티션 행 번호 (rr 오름차순)
+        """
+        start, end = self.indptr[node], self.indptr[node + 1]
+        if rr_min is not None:
+            start += np.searchsorted(self.rr[start:end], np.float32(rr_min), side='left')
+        if rr_max is not None:
+            end = self.indptr[node] + np.searchsorted(
+                self.rr[self.indptr[node]:end], np.float32(rr_max), side='right')
+        return self.rows[start:max(start, end)]
+
+
+class Adjacency:
+    """
+    하나의 follow-up 파티션에 대한 양방향 인접 인덱스입니다.
+
+    Attributes:
+        partition: 원본 EdgePartition
+        out: cause 기준 CSRIndex (나가는 엣지)
+        inbound: outcome 기준 CSRIndex (들어오는 엣지)
+    """
+
+    def __init__(self, partition):
+        self.partition = partition
+        n_nodes = len(partition.codes)
+        self.out = CSRIndex(partition.cause, partition.rr, n_nodes)
+        self.inbound = CSRIndex(partition.outcome, partition.rr, n_nodes)
+
+    @property
+    def nbytes(self):
+        return sum(index.indptr.nbytes + index.rows.nbytes + index.rr.nbytes
+                   for index in (self.out, self.inbound))
+
+    def _filter(self, rows, chisq_max, fisher_max):
+        p = self.partition
+        keep = (p.chisq[rows] <= np.float32(chisq_max)) & (p.fisher[rows] <= np.float32(fisher_max))
+        return rows[keep]
+
+    def edge_rows(self, code, rr_min, rr_max, chisq_max, fisher_max, direction='both'):
+        """
+        질병에 연결된 엣지의 행 번호를 구합니다.
+
+        partition.select(..., code=code)와 같은 결과를 차수에 비례하는 비용으로 구합니다.
+
+        Args:
+            code: 질병 코드
+            rr_min, rr_max: RR 범위
+            chisq_max, fisher_max: p-value 임계값
+            direction: 'out' (code가 cause), 'in' (code가 outcome), 'both'
+
+        Returns:
+            np.ndarray: 행 번호 (오름차순, 중복 없음)
+        """
+        node = self.partition.code_id(code)
+        if node is None:
+            return np.empty(0, dtype=np.int64)
+        parts = []
+        if direction in ('out', 'both'):
+            parts.append(self.out.rows_of(node, rr_min, rr_max))
+        if direction in ('in', 'both'):
+            parts.append(self.inbound.rows_of(node, rr_min, rr_max))
+        # 자기 자신으로 가는 엣지는 양쪽에 모두 있으므로 합집합으로 중복 제거
+        rows = np.unique(np.concatenate(parts)) if len(parts) > 1 else np.sort(parts[0])
+        return self._filter(rows, chisq_max, fisher_max).astype(np.int64)
+
+    def neighbors(self, code, rr_min, rr_max, chisq_max, fisher_max, direction='both'):
+        """
+        질병과 직접 연결된 질병 코드를 구합니다.
+
+        Args:
+            code: 질병 코드
+            rr_min, rr_max: RR 범위
+            chisq_max, fisher_max: p-value 임계값
+            direction: 'out', 'in', 'both'
+
+        Returns:
+            np.ndarray: 이웃 질병 코드 배열 (정렬, 자기 자신 제외)
+        """
+        p = self.partition
+        node = p.code_id(code)
+        if node is None:
+            return np.empty(0, dtype=str)
+        ids = []
+        if direction in ('out', 'both'):
+            ids.append(p.outcome[self._filter(self.out.rows_of(node, rr_min, rr_max), chisq_max, fisher_max)])
+        if direction in ('in', 'both'):
+            ids.append(p.cause[self._filter(self.inbound.rows_of(node, rr_min, rr_max), chisq_max, fisher_max)])
+        ids = np.unique(np.concatenate(ids))
+        return p.codes[ids[ids != node]]
+
+    def neighbor_edges(self, code, rr_min, rr_max, chisq_max, fisher_max, direction='both', sort='-rr'):
+        """
+        질병에 연결된 엣지를 이웃 단위로 정렬해 구합니다 (neighbor API 페이지네이션용).
+
+        정렬은 해당 노드의 엣지에 대해서만 수행하므로 비용은 차수에 비례합니다.
+        같은 값은 행 번호 순으로 정렬되어 같은 스냅샷에서는 순서가 항상 같습니다.
+
+        Args:
+            code: 질병 코드
+            rr_min, rr_max: RR 범위
+            chisq_max, fisher_max: p-value 임계값
+            direction: 'out' (이웃이 outcome), 'in' (이웃이 cause), 'both'
+            sort: NEIGHBOR_SORTS 중 하나
+
+        Returns:
+            tuple: (행 번호 배열, 이웃 노드 id 배열, 방향 배열(True = out))
+        """
+        p = self.partition
+        node = p.code_id(code)
+        if node is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+        rows, others, outgoing = [], [], []
+        if direction in ('out', 'both'):
+            part = self._filter(self.out.rows_of(node, rr_min, rr_max), chisq_max, fisher_max)
+            rows.append(part)
+            others.append(p.outcome[part])
+            outgoing.append(np.ones(len(part), dtype=bool))
+        if direction in ('in', 'both'):
+            part = self._filter(self.inbound.rows_of(node, rr_min, rr_max), chisq_max, fisher_max)
+            # 자기 자신으로 가는 엣지는 out 쪽에만 포함
+            part = part[p.cause[part] != node] if direction == 'both' else part
+            rows.append(part)
+            others.append(p.cause[part])
+            outgoing.append(np.zeros(len(part), dtype=bool))
+        rows = np.concatenate(rows).astype(np.int64)
+        others = np.concatenate(others).astype(np.int64)
+        outgoing = np.concatenate(outgoing)
+
+        if sort == 'rr':
+            order = np.lexsort((rows, p.rr[rows]))
+        elif sort == '-rr':
+            order = np.lexsort((rows, -p.rr[rows]))
+        elif sort in ('chisq_p', 'fisher_p'):
+            values = p.chisq[rows] if sort == 'chisq_p' else p.fisher[rows]
+            order = np.lexsort((rows, -p.rr[rows], values))
+        elif sort == 'code':
+            order = np.lexsort((rows, p.codes[others]))
+        else:
+            raise ValueError(f"지원되지 않는 정렬: {sort}")
+        return rows[order], others[order], outgoing[order]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_adjacency(follow_up):
+    """
+    Follow-up 파티션의 인접 인덱스를 반환합니다. 처음 요청될 때 한 번만 만듭니다.
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        Adjacency: 해당 follow-up의 인접 인덱스
+    """
+    partition = snapshot.get_partition(follow_up)
+    index = _indexes.get(follow_up)
+    if index is not None and index.partition is partition:
+        return index
+    with _lock:
+        index = _indexes.get(follow_up)
+        if index is None or index.partition is not partition:
+            index = Adjacency(partition)
+            _indexes[follow_up] = index
+    return index
+
+
+def clear():
+    """만들어 둔 인접 인덱스를 모두 버립니다."""
+    with _lock:
+        _indexes.clear()
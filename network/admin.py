@@ -1,5 +1,7 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import UserGraph
+from .models import NetworkMetrics, PubmedResult, UserGraph
 admin.site.register(UserGraph)
+admin.site.register(PubmedResult)
+admin.site.register(NetworkMetrics)
@@ -0,0 +1,163 @@
+"""
+follow-up × 임계값 구간별 이웃 비트셋 행렬.
+
+노드마다 임계값을 만족하는 엣지로 연결된 이웃(방향 무시)을 uint64 비트셋 한 줄로
+저장합니다. 노드 i는 (i >> 6)번째 워드의 (i & 63)번째 비트이며(cube.py와 같은 배치),
+노드 1,187개면 한 줄이 19워드(152바이트)입니다. 여러 질병의 공통 이웃은 해당 줄들의
+AND, "n개 중 m개 이상과 연결" 조건은 줄별 비트 합으로 한 번에 계산합니다.
+
+유도 부분 그래프(선택 노드들 사이의 엣지)는 adjacency.py의 CSR 인덱스로 대상 노드의
+엣지만 읽어 만들므로 전체 엣지 테이블을 DataFrame으로 적재하지 않습니다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import adjacency
+
+# 프로세스당 유지할 임계값 구간 수 (행렬 하나는 노드 수 × 워드 수 × 8바이트)
+MAX_BANDS = 64
+
+
+class NeighborBitsets:
+    """
+    하나의 follow-up/임계값 구간에 대한 이웃 비트셋 행렬입니다.
+
+    Attributes:
+        index: 원본 adjacency.Adjacency
+        band: (rr_min, rr_max, chisq_max, fisher_max)
+        matrix: [노드 수, 워드 수] uint64 비트셋
+    """
+
+    def __init__(self, index, band):
+        self.index = index
+        self.band = band
+        partition = index.partition
+        n_nodes = len(partition.codes)
+        self.n_words = (n_nodes + 63) // 64
+
+        idx = partition.select(*band)
+        cause = partition.cause[idx].astype(np.int64)
+        outcome = partition.outcome[idx].astype(np.int64)
+        matrix = np.zeros(n_nodes * self.n_words, dtype=np.uint64)
+        for node, other in ((cause, outcome), (outcome, cause)):
+            np.bitwise_or.at(matrix, node * self.n_words + (other >> 6),
+                             np.left_shift(np.uint64(1), (other & 63).astype(np.uint64)))
+        self.matrix = matrix.reshape(n_nodes, self.n_words)
+
+    def node_ids(self, codes):
+        """질병 코드를 노드 id 배열로 바꿉니다 (없는 코드는 제외)."""
+        ids = [self.index.partition.code_id(code) for code in codes]
+        return np.array([i for i in ids if i is not None], dtype=np.int64)
+
+    def to_ids(self, bits):
+        """비트셋을 노드 id 배열(오름차순)로 바꿉니다."""
+        n_nodes = len(self.index.partition.codes)
+        return np.flatnonzero(np.unpackbits(bits.view(np.uint8), bitorder='little')[:n_nodes])
+
+    def shared(self, ids, at_least=None):
+        """
+        선택 노드들 중 at_least개 이상과 연결된 노드의 비트셋을 구합니다.
+
+        Args:
+            ids: 선택 노드 id 배열
+            at_least: 최소 연결 수 (생략 시 전부, 즉 공통 이웃. 선택 수보다 크면 빈 집합)
+
+        Returns:
+            np.ndarray: [워드 수] uint64 비트셋
+        """
+        if at_least is None:
+            at_least = len(ids)
+        if len(ids) == 0 or at_least > len(ids):
+            return np.zeros(self.n_words, dtype=np.uint64)
+        rows = self.matrix[ids]
+        if at_least == len(ids):
+            return np.bitwise_and.reduce(rows, axis=0)
+        if at_least <= 1:
+            return np.bitwise_or.reduce(rows, axis=0)
+        counts = np.unpackbits(rows.view(np.uint8), axis=1, bitorder='little').sum(axis=0)
+        return np.packbits(counts >= at_least, bitorder='little').view(np.uint64)
+
+    def count(self, bits):
+        """비트셋의 노드 수 (popcount)."""
+        return int(np.bitwise_count(bits).sum())
+
+    def induced_rows(self, ids):
+        """
+        노드 집합 사이의 엣지(양 끝이 모두 집합 안)의 행 번호를 구합니다.
+
+        Args:
+            ids: 노드 id 배열
+
+        Returns:
+            np.ndarray: 파티션 행 번호 (오름차순)
+        """
+        partition = self.index.partition
+        member = np.zeros(len(partition.codes), dtype=bool)
+        member[ids] = True
+        rr_min, rr_max, chisq_max, fisher_max = self.band
+        parts = [self.index.out.rows_of(node, rr_min, rr_max) for node in ids]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(parts)
+        rows = rows[member[partition.outcome[rows]]]
+        rows = self.index._filter(rows, chisq_max, fisher_max)
+        return np.sort(rows).astype(np.int64)
+
+    def common_subgraph(self, codes, at_least=None):
+        """
+        선택 질병들과 그 공통 이웃(at_least 지정 시 그 수 이상과 연결된 이웃) 사이의 엣지를 구합니다.
+
+        Args:
+            codes: 선택 질병 코드 목록
+            at_least: 최소 연결 수 (생략 시 선택 질병 전부)
+
+        Returns:
+            np.ndarray: 파티션 행 번호 (오름차순)
+        """
+        ids = self.node_ids(codes)
+        # 스냅샷에 없는 질병은 이웃이 없는 것으로 셈
+        if at_least is None:
+            at_least = len(codes)
+        targets = np.union1d(self.to_ids(self.shared(ids, at_least)), ids)
+        return self.induced_rows(targets)
+
+
+_bitsets = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_bitsets(follow_up, rr_min, rr_max, chisq_max, fisher_max):
+    """
+    Follow-up/임계값 구간의 이웃 비트셋 행렬을 반환합니다. 최근 사용한 MAX_BANDS개를 유지합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+        rr_min, rr_max: RR 범위
+        chisq_max, fisher_max: p-value 임계값
+
+    Returns:
+        NeighborBitsets: 해당 구간의 비트셋 행렬
+    """
+    index = adjacency.get_adjacency(follow_up)
+    band = (float(rr_min), float(rr_max), float(chisq_max), float(fisher_max))
+    key = (follow_up, band)
+    with _lock:
+        bitsets = _bitsets.get(key)
+        if bitsets is not None and bitsets.index is index:
+            _bitsets.move_to_end(key)
+            return bitsets
+    bitsets = NeighborBitsets(index, band)
+    with _lock:
+        _bitsets[key] = bitsets
+        _bitsets.move_to_end(key)
+        while len(_bitsets) > MAX_BANDS:
+            _bitsets.popitem(last=False)
+    return bitsets
+
+
+def clear():
+    """만들어 둔 비트셋 행렬을 모두 버립니다."""
+    with _lock:
+        _bitsets.clear()
@@ -0,0 +1,397 @@
+"""
+follow-up 별 union-find 연결성 인덱스.
+
+RR 상한과 p-value 임계값을 고정한 채 RR 하한을 낮춰 가며(임계값 완화) 엣지를 RR 내림차순으로
+union-find에 넣고, 컴포넌트가 합쳐질 때마다 그 시점의 컴포넌트 라벨을 기록합니다.
+RR 하한이 rr_min일 때의 연결성은 rr_min 이상에서 일어난 병합 수 k를 이진 탐색으로 찾은 뒤
+labels[k]에서 선택 질병들의 라벨이 모두 같은지 비교하는 것으로 끝납니다.
+
+병합을 일으킨 엣지들은 RR 기준 최대 신장 숲(Kruskal)이기도 합니다. SpanningForest는
+follow-up × p-value 단계별로 이 숲만 저장해 두고, 연결되지 않은 질병들을 하나의 컴포넌트로
+묶는 가장 엄격한 RR/p-value 조건과 그 병목 엣지를 숲 위의 경로 탐색으로 제안합니다.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import snapshot
+from .params import RR_DECIMALS
+
+# 프로세스당 유지할 (follow-up, RR 상한, p-value) 인덱스 수 (하나는 최대 노드 수² × 2바이트)
+MAX_INDEXES = 16
+
+# 조건 제안에 쓰는 p-value 단계 (화면의 chisq/fisher 선택 목록, 엄격한 순)
+P_CHOICES = (0.0001, 0.005, 0.05, 0.5)
+
+
+def kruskal(partition, rr_max, chisq_max, fisher_max):
+    """
+    RR 상한/p-value 조건을 만족하는 엣지로 RR 기준 최대 신장 숲을 구합니다.
+
+    Args:
+        partition: EdgePartition
+        rr_max: RR 상한
+        chisq_max, fisher_max: p-value 임계값
+
+    Returns:
+        tuple: spanning_forest()와 같음
+    """
+    # RR 상한 이하 구간(파티션 앞부분) 중 p-value 조건을 만족하는 행
+    hi = np.searchsorted(partition.rr, np.float32(rr_max), side='right')
+    keep = (partition.chisq[:hi] <= np.float32(chisq_max)) & \
+           (partition.fisher[:hi] <= np.float32(fisher_max))
+    return spanning_forest(partition, np.flatnonzero(keep)[::-1])  # RR 내림차순
+
+
+def spanning_forest(partition, rows):
+    """
+    주어진 엣지 행들로 RR 기준 최대 신장 숲을 구합니다.
+
+    엣지를 RR 내림차순으로 union-find에 넣으며 컴포넌트를 합친 엣지만 남깁니다.
+
+    Args:
+        partition: EdgePartition
+        rows: 파티션 행 번호 (RR 내림차순)
+
+    Returns:
+        tuple: (행 번호, 합쳐진 쪽 노드 id, 합쳐지는 쪽 노드 id) 배열. 병합 순서(RR 내림차순)
+    """
+    n_nodes = len(partition.codes)
+
+    # 방향 없는 쌍마다 RR이 가장 큰 엣지 하나만 남김 (자기 자신 엣지 제외)
+    a = partition.cause[rows].astype(np.int64)
+    b = partition.outcome[rows].astype(np.int64)
+    pair = np.minimum(a, b) * n_nodes + np.maximum(a, b)
+    _, first = np.unique(pair, return_index=True)
+    first = np.sort(first)
+    first = first[a[first] != b[first]]
+    rows, a, b = rows[first], a[first], b[first]
+
+    n_active = len(np.union1d(a, b))
+    parent = list(range(n_nodes))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    merged = []
+    for i, (x, y) in enumerate(zip(a.tolist(), b.tolist())):
+        rx, ry = find(x), find(y)
+        if rx == ry:
+            continue
+        parent[ry] = rx
+        merged.append(i)
+        if len(merged) == n_active - 1:
+            break  # 엣지가 있는 노드가 모두 한 컴포넌트
+    merged = np.array(merged, dtype=np.int64)
+    return rows[merged], a[merged], b[merged]
+
+
+class ConnectivityIndex:
+    """
+    하나의 follow-up/RR 상한/p-value 조건에 대한 연결성 인덱스입니다.
+
+    Attributes:
+        partition: 원본 EdgePartition
+        band: (rr_max, chisq_max, fisher_max)
+        merge_rr: 병합을 일으킨 엣지의 RR (내림차순)
+        merge_rows: 병합을 일으킨 엣지의 파티션 행 번호 (최대 신장 숲)
+        labels: [병합 수 + 1, 노드 수] 병합 k번 후의 컴포넌트 라벨
+    """
+
+    def __init__(self, partition, band):
+        self.partition = partition
+        self.band = band
+        n_nodes = len(partition.codes)
+
+        rows, a, b = kruskal(partition, *band)
+        # 병합 k번 후의 라벨: 병합마다 한쪽 컴포넌트의 라벨을 다른 쪽 라벨로 바꿈
+        labels = np.empty((len(rows) + 1, n_nodes), dtype=np.int16 if n_nodes < 2 ** 15 else np.int32)
+        labels[0] = np.arange(n_nodes)
+        for k, (x, y) in enumerate(zip(a.tolist(), b.tolist()), start=1):
+            current = labels[k - 1].copy()
+            current[current == current[y]] = current[x]
+            labels[k] = current
+
+        self.merge_rows = rows
+        self.merge_rr = partition.rr[rows]
+        self.labels = labels
+
+    def merges_at(self, rr_min):
+        """RR 하한이 rr_min일 때까지 일어난 병합 수."""
+        # merge_rr는 내림차순이므로 부호를 바꿔 오름차순으로 탐색
+        return int(np.searchsorted(-self.merge_rr, -np.float32(rr_min), side='right'))
+
+    def component_labels(self, rr_min):
+        """RR 하한이 rr_min일 때의 노드별 컴포넌트 라벨."""
+        return self.labels[self.merges_at(rr_min)]
+
+    def connected(self, codes, rr_min):
+        """
+        선택 질병들이 [rr_min, rr_max] 조건에서 하나의 컴포넌트에 있는지 확인합니다.
+
+        Args:
+            codes: 질병 코드 목록
+            rr_min: RR 하한
+
+        Returns:
+            bool: 모두 연결되어 있으면 True (스냅샷에 없는 질병이 있으면 False)
+        """
+        ids = [self.partition.code_id(code) for code in codes]
+        if any(i is None for i in ids):
+            return False
+        labels = self.component_labels(rr_min)[ids]
+        return bool((labels == labels[0]).all())
+
+
+class SpanningForest:
+    """
+    하나의 follow-up/p-value 조건에서 RR 기준 최대 신장 숲입니다 (RR 상한 없음).
+
+    숲의 각 트리를 루트에서부터 정리해 노드마다 부모, 부모로 가는 엣지의 행 번호, 깊이를 둡니다.
+    두 노드를 잇는 숲 경로의 최소 RR이 두 노드가 연결되는 가장 큰 RR 하한입니다.
+
+    Attributes:
+        partition: 원본 EdgePartition
+        chisq_max, fisher_max: p-value 임계값
+        parent: 노드별 부모 노드 id (루트는 -1)
+        parent_row: 부모로 가는 엣지의 파티션 행 번호 (루트는 -1)
+        depth: 루트로부터의 깊이
+        tree: 노드별 트리 번호 (루트 노드 id)
+    """
+
+    def __init__(self, partition, chisq_max, fisher_max):
+        self.partition = partition
+        self.chisq_max = chisq_max
+        self.fisher_max = fisher_max
+        n_nodes = len(partition.codes)
+
+        rows, a, b = kruskal(partition, np.inf, chisq_max, fisher_max)
+        neighbors = [[] for _ in range(n_nodes)]
+        for row, x, y in zip(rows.tolist(), a.tolist(), b.tolist()):
+            neighbors[x].append((y, row))
+            neighbors[y].append((x, row))
+
+        parent = [-1] * n_nodes
+        parent_row = [-1] * n_nodes
+        depth = [0] * n_nodes
+        tree = [-1] * n_nodes
+        for root in range(n_nodes):
+            if tree[root] != -1:
+                continue
+            tree[root] = root
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                for other, row in neighbors[node]:
+                    if tree[other] == -1:
+                        tree[other] = root
+                        parent[other], parent_row[other] = node, row
+                        depth[other] = depth[node] + 1
+                        stack.append(other)
+
+        self.parent = parent
+        self.parent_row = parent_row
+        self.depth = depth
+        self.tree = tree
+
+    def connecting_rows(self, ids):
+        """
+        노드들을 잇는 숲의 최소 부분 트리 엣지 행 번호를 구합니다.
+
+        Args:
+            ids: 노드 id 목록
+
+        Returns:
+            list 또는 None: 행 번호 목록. 노드들이 서로 다른 트리에 있으면 None
+        """
+        if len({self.tree[i] for i in ids}) > 1:
+            return None
+        rows = set()
+        first = ids[0]
+        for node in ids[1:]:
+            u, v = node, first
+            while u != v:
+                if self.depth[u] < self.depth[v]:
+                    u, v = v, u
+                rows.add(self.parent_row[u])
+                u = self.parent[u]
+        return sorted(rows)
+
+    def suggest(self, ids):
+        """
+        노드들이 하나의 컴포넌트가 되는 가장 엄격한 RR 조건과 병목 엣지를 구합니다.
+
+        Args:
+            ids: 노드 id 목록
+
+        Returns:
+            dict 또는 None: {"rr_min", "rr_max", "bottleneck": [행 번호]}.
+            이 p-value 조건에서는 연결할 수 없으면 None
+        """
+        rows = self.connecting_rows(ids)
+        if rows is None:
+            return None
+        if not rows:
+            return {"rr_min": None, "rr_max": None, "bottleneck": []}
+        rr = self.partition.rr[rows]
+        bottleneck = [row for row, value in zip(rows, rr) if value == rr.min()]
+        return {"rr_min": float(rr.min()), "rr_max": float(rr.max()), "bottleneck": bottleneck}
+
+
+_indexes = OrderedDict()
+_forests = {}
+_forest_locks = {}
+_lock = threading.Lock()
+
+
+def get_index(follow_up, rr_max, chisq_max, fisher_max):
+    """
+    연결성 인덱스를 반환합니다. 최근 사용한 MAX_INDEXES개를 유지합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+        rr_max: RR 상한
+        chisq_max, fisher_max: p-value 임계값
+
+    Returns:
+        ConnectivityIndex: 해당 조건의 인덱스
+    """
+    partition = snapshot.get_partition(follow_up)
+    band = (float(rr_max), float(chisq_max), float(fisher_max))
+    key = (follow_up, band)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None and index.partition is partition:
+            _indexes.move_to_end(key)
+            return index
+    index = ConnectivityIndex(partition, band)
+    with _lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def is_connected(codes, follow_up, rr_min, rr_max, chisq_max, fisher_max):
+    """
+    선택 질병들이 주어진 조건의 그래프에서 하나의 컴포넌트에 있는지 확인합니다.
+
+    Args:
+        codes: 질병 코드 목록
+        follow_up: Follow-up 기간
+        rr_min, rr_max: RR 범위
+        chisq_max, fisher_max: p-value 임계값
+
+    Returns:
+        bool: 모두 연결되어 있으면 True
+    """
+    return get_index(follow_up, rr_max, chisq_max, fisher_max).connected(codes, rr_min)
+
+
+def get_forest(follow_up, chisq_max, fisher_max):
+    """
+    Follow-up과 p-value 단계의 최대 신장 숲을 반환합니다. 처음 요청될 때 한 번만 만듭니다.
+
+    숲은 (follow_up, chisq_max, fisher_max)마다 따로 잠그고 만들므로, 숲을 만드는 동안에도
+    다른 조합의 숲과 연결성 인덱스(get_index) 조회는 기다리지 않습니다.
+
+    Args:
+        follow_up: Follow-up 기간
+        chisq_max, fisher_max: p-value 임계값 (P_CHOICES 중 하나)
+
+    Returns:
+        SpanningForest: 해당 조건의 숲
+    """
+    partition = snapshot.get_partition(follow_up)
+    key = (follow_up, chisq_max, fisher_max)
+    cached = _forests.get(key)
+    if cached is not None and cached[0] is partition:
+        return cached[1]
+    with _lock:
+        lock = _forest_locks.setdefault(key, threading.Lock())
+    with lock:
+        # 다른 스레드가 먼저 만들었으면 그대로 사용 (동시 요청이 숲을 중복으로 만들지 않음)
+        cached = _forests.get(key)
+        if cached is None or cached[0] is not partition:
+            cached = _forests[key] = (partition, SpanningForest(partition, chisq_max, fisher_max))
+    return cached[1]
+
+
+def get_forests(follow_up):
+    """
+    Follow-up의 p-value 단계별 최대 신장 숲을 반환합니다 (get_forest() 참고).
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        dict: {(chisq_max, fisher_max): SpanningForest}
+    """
+    return {(c, f): get_forest(follow_up, c, f) for c in P_CHOICES for f in P_CHOICES}
+
+
+def _floor(value):
+    return math.floor(value * 10 ** RR_DECIMALS + 1e-6) / 10 ** RR_DECIMALS
+
+
+def _ceil(value):
+    return math.ceil(value * 10 ** RR_DECIMALS - 1e-6) / 10 ** RR_DECIMALS
+
+
+def suggest_thresholds(codes, follow_up, rr_max=None):
+    """
+    선택 질병들을 하나의 컴포넌트로 묶는 가장 엄격한 RR/p-value 조건을 제안합니다.
+
+    p-value 단계 조합마다 숲 경로의 병목(최소 RR) 엣지로 RR 하한을 정하고, 다른 조합보다
+    RR 하한과 p-value가 모두 느슨한 조합은 제외합니다. RR 값은 화면 단위(소수 둘째 자리)로
+    하한은 내림, 상한은 올림하므로 제안 조건의 그래프에는 병목 엣지가 포함됩니다.
+
+    Args:
+        codes: 질병 코드 목록
+        follow_up: Follow-up 기간
+        rr_max: 사용자가 지정한 RR 상한 (제안 상한이 이보다 작으면 이 값 유지)
+
+    Returns:
+        list: [{"chisq_max", "fisher_max", "rr_min", "rr_max", "bottleneck": [행 번호]}]
+        RR 하한이 높은(엄격한) 순. 스냅샷에 없는 질병이 있거나 연결할 수 없으면 빈 리스트
+    """
+    partition = snapshot.get_partition(follow_up)
+    ids = [partition.code_id(code) for code in codes]
+    if not ids or any(i is None for i in ids):
+        return []
+
+    candidates = []
+    for (chisq_max, fisher_max), forest in get_forests(follow_up).items():
+        found = forest.suggest(ids)
+        if found is None or found['rr_min'] is None:
+            continue
+        upper = _ceil(found['rr_max'])
+        candidates.append({
+            "chisq_max": chisq_max,
+            "fisher_max": fisher_max,
+            "rr_min": _floor(found['rr_min']),
+            "rr_max": max(upper, rr_max) if rr_max is not None else upper,
+            "bottleneck": found['bottleneck'],
+        })
+
+    def dominated(c, other):
+        return (other is not c and other['rr_min'] >= c['rr_min']
+                and other['chisq_max'] <= c['chisq_max'] and other['fisher_max'] <= c['fisher_max'])
+
+    frontier = [c for c in candidates if not any(dominated(c, other) for other in candidates)]
+    frontier.sort(key=lambda c: (-c['rr_min'], c['chisq_max'] * c['fisher_max']))
+    return frontier
+
+
+def clear():
+    """만들어 둔 연결성 인덱스와 최대 신장 숲을 모두 버립니다."""
+    with _lock:
+        _indexes.clear()
+        _forests.clear()
+        _forest_locks.clear()
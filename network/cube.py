@@ -0,0 +1,280 @@
+"""
+follow-up × RR 구간 × p-value 구간별 엣지 수/노드 수를 미리 집계한 임계값 큐브.
+
+그래프를 만들기 전에 "이 조건이면 엣지/노드가 몇 개인지"를 누적합(prefix sum)과
+노드 비트셋 OR로 즉시 계산합니다. RR 축은 RR_GRID(rr_values)와 LOG_RR_GRID
+(log_rr_values) 두 가지이며, p-value 축은 화면에서 고르는 P_LEVELS 단계입니다.
+
+임계값은 가장 가까운 격자점으로 맞춰 계산하므로 격자 위의 값이면 정확하고
+(경계값과 똑같은 RR 값을 가진 rr_min 쪽 엣지는 제외), 그 외에는 근사치입니다
+(격자 범위 밖의 RR 값은 양 끝 구간 전체로 계산하므로 근사치).
+큐브는 `python manage.py build_threshold_cube`로 미리 저장해 두며, 파일이 없거나
+데이터셋 버전이 맞지 않으면 메모리 스냅샷에서 바로 집계합니다.
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+
+from . import snapshot
+
+logger = logging.getLogger(__name__)
+
+# RR 축 격자 (구간은 (격자[i-1], 격자[i]], 양 끝에 범위 밖 구간 하나씩)
+RR_GRID = np.round(np.arange(0.0, 10.0 + 1e-9, 0.05), 2).astype(np.float32)
+LOG_RR_GRID = np.round(np.arange(-5.0, 5.0 + 1e-9, 0.05), 2).astype(np.float32)
+
+# p-value 단계 (chisq/fisher 선택 목록과 같음, 1.0은 전체)
+P_LEVELS = np.array([0.0001, 0.005, 0.05, 0.5, 1.0], dtype=np.float32)
+
+AXES = {
+    'rr_values': ('rr', RR_GRID),
+    'log_rr_values': ('log_rr', LOG_RR_GRID),
+}
+
+
+def cube_path(follow_up, directory=None):
+    """Follow-up 큐브 파일 경로."""
+    return os.path.join(directory or snapshot.snapshot_dir(), f"threshold_cube_fu{follow_up}.npz")
+
+
+def _snap(grid, value):
+    """값에 가장 가까운 격자 인덱스와 격자 위의 값인지 여부."""
+    i = int(np.abs(grid - np.float32(value)).argmin())
+    return i, bool(np.isclose(grid[i], value, rtol=0, atol=1e-6))
+
+
+class AxisCube:
+    """
+    하나의 RR 축에 대한 누적 집계입니다.
+
+    Attributes:
+        grid: RR 격자
+        edges: [p단계, p단계, 구간 + 1] 엣지 수 누적합 (RR 방향 prefix sum, p 방향 누적)
+        nodes: [p단계, p단계, 구간, 워드] 구간별 노드 비트셋 (p 방향 누적 OR)
+    """
+
+    def __init__(self, grid, edges, nodes):
+        self.grid = grid
+        self.edges = edges
+        self.nodes = nodes
+
+    @classmethod
+    def build(cls, values, chisq, fisher, cause, outcome, n_codes, grid):
+        """
+        파티션 컬럼 배열로 큐브를 집계합니다.
+
+        Args:
+            values: RR 축 값 배열 (float32)
+            chisq, fisher: p-value 배열 (float32)
+            cause, outcome: 노드 인덱스 배열
+            n_codes: 노드 사전 크기
+            grid: RR 격자
+
+        Returns:
+            AxisCube: 집계 결과
+        """
+        n_levels = len(P_LEVELS)
+        n_buckets = len(grid) + 1
+        n_words = (n_codes + 63) // 64
+
+        bucket = np.searchsorted(grid, values, side='left')
+        chisq_level = np.searchsorted(P_LEVELS, chisq, side='left')
+        fisher_level = np.searchsorted(P_LEVELS, fisher, side='left')
+        # p > 1 또는 NaN은 어떤 조건에서도 선택되지 않음
+        keep = (chisq_level < n_levels) & (fisher_level < n_levels)
+        bucket, chisq_level, fisher_level = bucket[keep], chisq_level[keep], fisher_level[keep]
+        cause, outcome = cause[keep].astype(np.int64), outcome[keep].astype(np.int64)
+
+        cell = (chisq_level * n_levels + fisher_level) * n_buckets + bucket
+        counts = np.bincount(cell, minlength=n_levels * n_levels * n_buckets)
+        counts = counts.reshape(n_levels, n_levels, n_buckets).cumsum(axis=0).cumsum(axis=1)
+        edges = np.zeros((n_levels, n_levels, n_buckets + 1), dtype=np.int64)
+        edges[:, :, 1:] = counts.cumsum(axis=2)
+
+        nodes = np.zeros(n_levels * n_levels * n_buckets * n_words, dtype=np.uint64)
+        for node in (cause, outcome):
+            np.bitwise_or.at(nodes, cell * n_words + (node >> 6),
+                             np.left_shift(np.uint64(1), (node & 63).astype(np.uint64)))
+        nodes = nodes.reshape(n_levels, n_levels, n_buckets, n_words)
+        nodes = np.bitwise_or.accumulate(np.bitwise_or.accumulate(nodes, axis=0), axis=1)
+        return cls(grid, edges, nodes)
+
+    def estimate(self, rr_min, rr_max, chisq_max, fisher_max):
+        """
+        조건에 해당하는 엣지 수와 노드 수를 계산합니다.
+
+        Args:
+            rr_min, rr_max: RR 범위
+            chisq_max, fisher_max: p-value 임계값
+
+        Returns:
+            dict: {"edges", "nodes", "exact"}
+        """
+        grid = self.grid
+        exact = True
+        # 격자 범위 밖 값은 양 끝 구간을 통째로 포함하므로 근사치
+        if rr_min < grid[0]:
+            lo, exact = 0, False
+        else:
+            i, on_grid = _snap(grid, rr_min)
+            lo, exact = i + 1, exact and on_grid
+        if rr_max > grid[-1]:
+            hi, exact = len(grid), False
+        else:
+            j, on_grid = _snap(grid, rr_max)
+            hi, exact = j, exact and on_grid
+
+        c, on_grid = _snap(P_LEVELS, chisq_max)
+        exact = exact and on_grid
+        f, on_grid = _snap(P_LEVELS, fisher_max)
+        exact = exact and on_grid
+
+        if hi < lo:
+            return {"edges": 0, "nodes": 0, "exact": exact}
+        edges = int(self.edges[c, f, hi + 1] - self.edges[c, f, lo])
+        bits = np.bitwise_or.reduce(self.nodes[c, f, lo:hi + 1], axis=0)
+        nodes = int(np.unpackbits(bits.view(np.uint8)).sum())
+        return {"edges": edges, "nodes": nodes, "exact": exact}
+
+
+class ThresholdCube:
+    """하나의 follow-up에 대한 RR 축별 AxisCube 모음입니다."""
+
+    def __init__(self, follow_up, axes, version=None):
+        self.follow_up = follow_up
+        self.axes = axes
+        self.version = version
+
+    @classmethod
+    def from_partition(cls, partition, version=None):
+        """EdgePartition으로 큐브를 집계합니다."""
+        axes = {}
+        for column, (field, grid) in AXES.items():
+            axes[column] = AxisCube.build(
+                getattr(partition, field), partition.chisq, partition.fisher,
+                partition.cause, partition.outcome, len(partition.codes), grid)
+        return cls(partition.follow_up, axes, version=version)
+
+    def estimate(self, rr_min, rr_max, chisq_max, fisher_max, rr_column='rr_values'):
+        """
+        조건에 해당하는 그래프 크기를 추정합니다.
+
+        Args:
+            rr_min, rr_max: RR 범위
+            chisq_max, fisher_max: p-value 임계값
+            rr_column: 범위를 적용할 컬럼 ('rr_values' 또는 'log_rr_values')
+
+        Returns:
+            dict: {"edges", "nodes", "exact"}
+        """
+        if rr_column not in self.axes:
+            raise ValueError(f"지원되지 않는 컬럼: {rr_column}")
+        return self.axes[rr_column].estimate(rr_min, rr_max, chisq_max, fisher_max)
+
+
+def write_cube(cube, path, version=None):
+    """
+    큐브를 npz 파일로 저장합니다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봅니다.
+
+    Args:
+        cube: ThresholdCube
+        path: 저장 경로
+        version: 데이터셋 버전 (생략 시 현재 설정)
+    """
+    arrays = {}
+    for column, axis in cube.axes.items():
+        arrays[f"{column}.grid"] = axis.grid
+        arrays[f"{column}.edges"] = axis.edges
+        arrays[f"{column}.nodes"] = axis.nodes
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f, follow_up=cube.follow_up, version=version or snapshot.dataset_version(),
+            p_levels=P_LEVELS, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_cube(path, follow_up=None, version=None):
+    """
+    저장된 큐브 파일을 읽습니다.
+
+    Args:
+        path: 큐브 파일 경로
+        follow_up: 기대하는 follow-up 기간 (생략 시 검사하지 않음)
+        version: 기대하는 데이터셋 버전 (생략 시 현재 설정)
+
+    Returns:
+        ThresholdCube: 큐브
+
+    Raises:
+        snapshot.StaleSnapshotError: 데이터셋 버전, follow-up 또는 격자가 맞지 않는 경우
+    """
+    version = version or snapshot.dataset_version()
+    with np.load(path) as data:
+        if str(data['version']) != version:
+            raise snapshot.StaleSnapshotError(
+                f"{path}: 데이터셋 버전 {data['version']} != {version}")
+        if follow_up is not None and int(data['follow_up']) != follow_up:
+            raise snapshot.StaleSnapshotError(f"{path}: follow-up {int(data['follow_up'])} != {follow_up}")
+        if not np.array_equal(data['p_levels'], P_LEVELS):
+            raise snapshot.StaleSnapshotError(f"{path}: p-value 단계가 다릅니다.")
+        axes = {}
+        for column, (_, grid) in AXES.items():
+            if not np.array_equal(data[f"{column}.grid"], grid):
+                raise snapshot.StaleSnapshotError(f"{path}: {column} 격자가 다릅니다.")
+            axes[column] = AxisCube(grid, data[f"{column}.edges"], data[f"{column}.nodes"])
+        return ThresholdCube(int(data['follow_up']), axes, version=version)
+
+
+def load_cube(follow_up):
+    """
+    큐브 파일이 있으면 읽고, 없거나 오래된 경우 스냅샷 파티션에서 집계합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        ThresholdCube: 해당 follow-up의 큐브
+    """
+    path = cube_path(follow_up)
+    if os.path.exists(path):
+        try:
+            return read_cube(path, follow_up=follow_up)
+        except snapshot.StaleSnapshotError as e:
+            logger.warning("큐브 파일을 사용하지 않습니다: %s", e)
+    return ThresholdCube.from_partition(snapshot.get_partition(follow_up),
+                                        version=snapshot.dataset_version())
+
+
+_cubes = {}
+_lock = threading.Lock()
+
+
+def get_cube(follow_up):
+    """
+    Follow-up 큐브를 반환합니다. 처음 요청될 때 한 번만 적재합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        ThresholdCube: 해당 follow-up의 큐브
+    """
+    cube = _cubes.get(follow_up)
+    if cube is not None:
+        return cube
+    with _lock:
+        cube = _cubes.get(follow_up)
+        if cube is None:
+            cube = load_cube(follow_up)
+            _cubes[follow_up] = cube
+    return cube
+
+
+def clear():
+    """적재된 모든 큐브를 버립니다. 다음 요청 시 다시 적재됩니다."""
+    with _lock:
+        _cubes.clear()
@@ -0,0 +1,178 @@
+"""
+프로세스 단위 SQLAlchemy 엔진과 커넥션 풀.
+
+요청마다 create_engine을 호출하면 매번 TCP 연결과 MySQL 인증 비용이 들기 때문에,
+프로세스당 엔진 하나를 만들어 크기가 제한된 커넥션 풀을 공유합니다.
+설정은 settings.COTDEX_DB_ENGINE으로 하며, URL을 생략하면 DATABASES['default']로
+접속 정보를 구성합니다. 풀 통계(체크아웃 수, 대기 시간 등)는 pool_status()로 조회합니다.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_ENGINE_OPTIONS = {
+    'URL': None,
+    'DRIVER': 'mysql+pymysql',
+    'POOL_SIZE': 5,
+    'MAX_OVERFLOW': 10,
+    'POOL_TIMEOUT': 30,
+    'POOL_RECYCLE': 1800,
+    'POOL_PRE_PING': True,
+}
+
+
+class PoolStats:
+    """커넥션 풀 사용 통계 (누적값)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.connects = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def as_dict(self):
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'timeouts': self.timeouts,
+                'wait_total_ms': round(self.wait_total * 1e3, 3),
+                'wait_avg_ms': round(self.wait_total / waits * 1e3, 3) if waits else 0.0,
+                'wait_max_ms': round(self.wait_max * 1e3, 3),
+            }
+
+
+_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """커넥션을 얻기까지 기다린 시간을 기록하는 QueuePool."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except Exception:
+            _stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        _stats.record_wait(time.perf_counter() - started)
+        return entry
+
+    def _create_connection(self):
+        _stats.record_connect()
+        return super()._create_connection()
+
+
+def engine_options():
+    """settings.COTDEX_DB_ENGINE을 기본값과 합친 설정."""
+    return {**DEFAULT_ENGINE_OPTIONS, **getattr(settings, 'COTDEX_DB_ENGINE', {})}
+
+
+def database_url(options=None):
+    """
+    엔진 접속 URL을 구성합니다.
+
+    Args:
+        options: engine_options() 결과 (생략 시 현재 설정)
+
+    Returns:
+        str 또는 sqlalchemy.engine.URL: 접속 URL
+    """
+    options = options or engine_options()
+    if options['URL']:
+        return options['URL']
+    db = settings.DATABASES['default']
+    return URL.create(
+        options['DRIVER'],
+        username=db.get('USER') or None,
+        password=db.get('PASSWORD') or None,
+        host=db.get('HOST') or None,
+        port=int(db['PORT']) if db.get('PORT') else None,
+        database=db.get('NAME') or None,
+    )
+
+
+def _create_engine():
+    options = engine_options()
+    return create_engine(
+        database_url(options),
+        poolclass=TimedQueuePool,
+        pool_size=options['POOL_SIZE'],
+        max_overflow=options['MAX_OVERFLOW'],
+        pool_timeout=options['POOL_TIMEOUT'],
+        pool_recycle=options['POOL_RECYCLE'],
+        pool_pre_ping=options['POOL_PRE_PING'],
+    )
+
+
+_engine = None
+_engine_pid = None
+_lock = threading.Lock()
+
+
+def get_db_connection():
+    """
+    프로세스 단위 MariaDB 엔진을 반환합니다.
+
+    처음 호출될 때 한 번만 생성하며, 이후에는 같은 커넥션 풀을 공유합니다.
+    fork된 워커 프로세스에서는 부모의 커넥션을 닫지 않고 버린 뒤 새로 만듭니다.
+    호출 측에서 engine.dispose()를 부르면 풀이 비워지므로 부르지 않아야 합니다.
+
+    Returns:
+        sqlalchemy.engine.Engine: MariaDB 연결 엔진
+    """
+    global _engine, _engine_pid
+    pid = os.getpid()
+    if _engine is not None and _engine_pid == pid:
+        return _engine
+    with _lock:
+        if _engine is None or _engine_pid != pid:
+            if _engine is not None:
+                _engine.dispose(close=False)
+            _engine = _create_engine()
+            _engine_pid = pid
+        return _engine
+
+
+def pool_status():
+    """
+    커넥션 풀의 현재 상태와 누적 통계를 반환합니다.
+
+    Returns:
+        dict: pool_size, checked_out, checked_in, overflow 및 PoolStats 값
+    """
+    status = {'pid': os.getpid(), **_stats.as_dict()}
+    if _engine is not None and _engine_pid == os.getpid():
+        pool = _engine.pool
+        status.update({
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+    return status
@@ -0,0 +1,445 @@
+"""
+node_attr / edge_attr 인구학적 분포의 고정 크기 배열 저장소.
+
+노드(질병 코드)와 엣지((fu, cause, outcome))마다 성별/연령/소득/지역과 성별 교차
+분포를 같은 배치(Layout)의 int32 벡터 하나로 미리 펼쳐 둡니다. 데이터에 없는 칸은
+ABSENT(-1)이므로 get_detail_info가 행 단위로 만들던 중첩 딕셔너리를 그대로 복원할 수
+있습니다.
+
+`python manage.py build_demographics`로 스냅샷 디렉토리에 메모리 맵 파일을 만들어 두며
+(snapshot.py와 같은 구조), 파일이 없거나 데이터셋 버전이 맞지 않으면 뷰는 DB를 직접
+조회합니다.
+"""
+import json
+import logging
+import mmap
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import snapshot
+from .db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# get_detail_info 응답에 항상 포함되는 키 (단일 분포 4개 + 성별 교차 분포 3개)
+SINGLE_KEYS = ['sex', 'age', 'ctrb', 'sido']
+BASE_KEYS = SINGLE_KEYS + ['sex_age', 'sex_ctrb', 'sex_sido']
+
+ATTR_COLUMNS = ['attribute_1', 'value_1', 'attribute_2', 'value_2', 'count']
+
+# 데이터에 없는 칸
+ABSENT = -1
+
+# 분포 파일 형식
+FILE_MAGIC = b'CTDXDEMO'
+FORMAT_VERSION = 1
+ARRAY_ALIGNMENT = 64
+ARRAY_FIELDS = ['node_counts', 'edge_keys', 'edge_counts']
+
+
+def demographics_path(directory=None):
+    """분포 파일 경로."""
+    return os.path.join(directory or snapshot.snapshot_dir(), "demographics.bin")
+
+
+def _value_labels(values):
+    """value_1/value_2를 응답 키 문자열로 바꿉니다 (숫자 → 정수 문자열, 없으면 None)."""
+    numbers = pd.to_numeric(values, errors='coerce')
+    labels = pd.Series(None, index=values.index, dtype=object)
+    present = numbers.notna()
+    labels[present] = numbers[present].astype(np.int64).astype(str)
+    return labels
+
+
+def normalize_rows(df):
+    """
+    node_attr/edge_attr 행을 (분포 키, 값1, 값2, count)로 정규화합니다.
+
+    get_detail_info와 같은 규칙입니다. value_1이 없는 행은 버리고, attribute_2가 비어
+    있으면 단일 분포(SINGLE_KEYS에 있는 것만), 있으면 "{attribute_1}_{attribute_2}"
+    교차 분포입니다.
+
+    Args:
+        df: ATTR_COLUMNS를 포함한 DataFrame (다른 컬럼은 그대로 유지)
+
+    Returns:
+        pd.DataFrame: key, v1, v2(단일 분포는 None), pair(교차 분포 여부), count 컬럼이
+        추가된 DataFrame
+    """
+    df = df.copy()
+    df['v1'] = _value_labels(df['value_1'])
+    df = df[df['v1'].notna()]
+    attr2 = df['attribute_2'].astype(object)
+    single = attr2.isna() | (attr2.fillna('').astype(str).str.strip() == '')
+    df['key'] = np.where(single, df['attribute_1'].astype(str),
+                         df['attribute_1'].astype(str) + '_' + attr2.fillna('').astype(str))
+    df['v2'] = _value_labels(df['value_2']).where(~single, None)
+    df['pair'] = ~single
+    df = df[~(single & ~df['key'].isin(SINGLE_KEYS))]
+    df['count'] = df['count'].astype(np.int64)
+    return df
+
+
+def rows_to_data(df):
+    """
+    node_attr/edge_attr 조회 결과를 get_detail_info 응답의 data 딕셔너리로 만듭니다.
+
+    Args:
+        df: ATTR_COLUMNS DataFrame
+
+    Returns:
+        dict: {"sex": {값: count}, ..., "sex_age": {값1: {값2: count}}, ...}
+    """
+    data = {key: {} for key in BASE_KEYS}
+    rows = normalize_rows(df)
+    for key, v1, v2, pair, count in zip(rows['key'], rows['v1'], rows['v2'], rows['pair'], rows['count']):
+        if pair:
+            data.setdefault(key, {}).setdefault(v1, {})[v2] = int(count)
+        else:
+            data[key][v1] = int(count)
+    return data
+
+
+class Layout:
+    """
+    분포 벡터의 칸 배치입니다.
+
+    Attributes:
+        blocks: [(분포 키, 값1 목록, 값2 목록 또는 None)] (값2 목록이 있으면 교차 분포)
+        size: 벡터 길이
+    """
+
+    def __init__(self, blocks):
+        self.blocks = [(key, list(values1), None if values2 is None else list(values2))
+                       for key, values1, values2 in blocks]
+        self._slots = {}
+        offset = 0
+        for key, values1, values2 in self.blocks:
+            for v1 in values1:
+                if values2 is None:
+                    self._slots[(key, v1, None)] = offset
+                    offset += 1
+                else:
+                    for v2 in values2:
+                        self._slots[(key, v1, v2)] = offset
+                        offset += 1
+        self.size = offset
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        정규화된 (key, v1, v2) 행들에 나타난 값으로 배치를 만듭니다.
+
+        Args:
+            rows: normalize_rows() 결과 DataFrame
+
+        Returns:
+            Layout: BASE_KEYS 순서, 그 외 교차 분포는 키 이름 순. 값은 숫자 순
+        """
+        def ordered(values):
+            return sorted({v for v in values}, key=lambda v: (v is None, int(v) if v is not None else 0))
+
+        blocks = []
+        distinct = rows[['key', 'v1', 'v2']].drop_duplicates()
+        pair_keys = sorted(set(distinct['key']) - set(SINGLE_KEYS))
+        pair_keys = [k for k in BASE_KEYS if k in pair_keys] + [k for k in pair_keys if k not in BASE_KEYS]
+        for key in SINGLE_KEYS + pair_keys:
+            part = distinct[distinct['key'] == key]
+            if key in SINGLE_KEYS:
+                blocks.append((key, ordered(part['v1']), None))
+            else:
+                blocks.append((key, ordered(part['v1']), ordered(part['v2'])))
+        return cls(blocks)
+
+    def slots(self, rows):
+        """정규화된 행들의 벡터 칸 번호 (배치에 없으면 -1)."""
+        return np.fromiter(
+            (self._slots.get((key, v1, v2), -1)
+             for key, v1, v2 in zip(rows['key'], rows['v1'], rows['v2'])),
+            dtype=np.int64, count=len(rows))
+
+    def decode(self, vector):
+        """
+        분포 벡터를 get_detail_info 응답의 data 딕셔너리로 복원합니다.
+
+        Args:
+            vector: [size] 분포 벡터 (없는 칸은 ABSENT)
+
+        Returns:
+            dict: {"sex": {값: count}, ..., "sex_age": {값1: {값2: count}}, ...}
+        """
+        data = {key: {} for key in BASE_KEYS}
+        values = vector.tolist()
+        offset = 0
+        for key, values1, values2 in self.blocks:
+            if values2 is None:
+                for v1, count in zip(values1, values[offset:offset + len(values1)]):
+                    if count != ABSENT:
+                        data[key][v1] = count
+                offset += len(values1)
+                continue
+            width = len(values2)
+            for i, v1 in enumerate(values1):
+                row = values[offset + i * width:offset + (i + 1) * width]
+                present = {v2: count for v2, count in zip(values2, row) if count != ABSENT}
+                if present:
+                    data.setdefault(key, {})[v1] = present
+            offset += len(values1) * width
+        return data
+
+    def to_json(self):
+        return [[key, values1, values2] for key, values1, values2 in self.blocks]
+
+
+class Demographics:
+    """
+    노드/엣지 분포 벡터 모음입니다.
+
+    Attributes:
+        layout: 벡터 배치
+        node_codes: 노드 분포가 있는 질병 코드 (정렬, 인덱스가 node_counts의 행)
+        edge_codes: 엣지 키 인코딩에 쓰는 질병 코드 사전 (정렬)
+        node_counts: [노드 수, size] int32
+        edge_keys: 정렬된 엣지 키 ((fu × 코드 수 + cause) × 코드 수 + outcome)
+        edge_counts: [엣지 수, size] int32
+    """
+
+    def __init__(self, layout, node_codes, edge_codes, node_counts, edge_keys, edge_counts):
+        self.layout = layout
+        self.node_codes = node_codes
+        self.edge_codes = edge_codes
+        self.node_counts = node_counts
+        self.edge_keys = edge_keys
+        self.edge_counts = edge_counts
+        self._node_index = {code: i for i, code in enumerate(node_codes.tolist())}
+        self._edge_code_index = {code: i for i, code in enumerate(edge_codes.tolist())}
+        self.mapped_path = None
+
+    def edge_key(self, follow_up, source, target):
+        """엣지 키. 코드가 사전에 없으면 None."""
+        cause = self._edge_code_index.get(source)
+        outcome = self._edge_code_index.get(target)
+        if cause is None or outcome is None:
+            return None
+        n_codes = len(self.edge_codes)
+        return (int(follow_up) * n_codes + cause) * n_codes + outcome
+
+    def node(self, code):
+        """
+        질병 코드의 분포를 반환합니다.
+
+        Args:
+            code: 질병 코드
+
+        Returns:
+            dict: get_detail_info의 data (분포가 없으면 빈 분포)
+        """
+        i = self._node_index.get(code)
+        if i is None:
+            return self.layout.decode(np.full(self.layout.size, ABSENT))
+        return self.layout.decode(self.node_counts[i])
+
+    def edge(self, follow_up, source, target):
+        """
+        엣지의 분포를 반환합니다.
+
+        Args:
+            follow_up: Follow-up 기간
+            source, target: cause/outcome 질병 코드
+
+        Returns:
+            dict: get_detail_info의 data (분포가 없으면 빈 분포)
+        """
+        key = self.edge_key(follow_up, source, target)
+        if key is not None:
+            i = int(np.searchsorted(self.edge_keys, key))
+            if i < len(self.edge_keys) and self.edge_keys[i] == key:
+                return self.layout.decode(self.edge_counts[i])
+        return self.layout.decode(np.full(self.layout.size, ABSENT))
+
+
+def _fill(counts, index, rows, slots):
+    """정규화된 행을 [행 번호, 칸] 위치에 채웁니다 (배치/색인에 없는 행은 무시)."""
+    keep = (index >= 0) & (slots >= 0)
+    counts[index[keep], slots[keep]] = rows['count'].to_numpy()[keep]
+
+
+def build_demographics(node_rows, edge_rows):
+    """
+    node_attr/edge_attr 행으로 Demographics를 만듭니다.
+
+    Args:
+        node_rows: node_code + ATTR_COLUMNS DataFrame
+        edge_rows: fu, cause_abb, outcome_abb + ATTR_COLUMNS DataFrame
+
+    Returns:
+        Demographics: 분포 벡터 모음
+    """
+    node_rows = normalize_rows(node_rows)
+    edge_rows = normalize_rows(edge_rows)
+    layout = Layout.from_rows(pd.concat([node_rows[['key', 'v1', 'v2']], edge_rows[['key', 'v1', 'v2']]]))
+
+    node_codes = np.array(sorted(node_rows['node_code'].astype(str).unique()), dtype=str)
+    node_counts = np.full((len(node_codes), layout.size), ABSENT, dtype=np.int32)
+    node_index = np.searchsorted(node_codes, node_rows['node_code'].astype(str).to_numpy())
+    _fill(node_counts, node_index, node_rows, layout.slots(node_rows))
+
+    cause = edge_rows['cause_abb'].astype(str).to_numpy()
+    outcome = edge_rows['outcome_abb'].astype(str).to_numpy()
+    edge_codes = np.array(sorted(set(cause) | set(outcome)), dtype=str)
+    n_codes = len(edge_codes)
+    keys = ((edge_rows['fu'].to_numpy(dtype=np.int64) * n_codes + np.searchsorted(edge_codes, cause))
+            * n_codes + np.searchsorted(edge_codes, outcome))
+    edge_keys, edge_index = np.unique(keys, return_inverse=True)
+    edge_counts = np.full((len(edge_keys), layout.size), ABSENT, dtype=np.int32)
+    _fill(edge_counts, edge_index, edge_rows, layout.slots(edge_rows))
+
+    return Demographics(layout, node_codes, edge_codes, node_counts, edge_keys, edge_counts)
+
+
+def load_demographics_from_db(engine=None):
+    """
+    MariaDB의 node_attr/edge_attr 전체를 읽어 Demographics를 만듭니다.
+
+    Args:
+        engine: SQLAlchemy 엔진 (생략 시 get_db_connection())
+
+    Returns:
+        Demographics: 분포 벡터 모음
+    """
+    engine = engine or get_db_connection()
+    columns = ', '.join(ATTR_COLUMNS)
+    node_rows = pd.read_sql_query(f"SELECT node_code, {columns} FROM node_attr", engine)
+    edge_rows = pd.concat(pd.read_sql_query(
+        f"SELECT fu, cause_abb, outcome_abb, {columns} FROM edge_attr", engine,
+        chunksize=snapshot.LOAD_CHUNKSIZE), ignore_index=True)
+    return build_demographics(node_rows, edge_rows)
+
+
+def _aligned(offset):
+    return (offset + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def write_demographics(demographics, path, version=None):
+    """
+    분포 벡터 모음을 메모리 맵으로 열 수 있는 바이너리 파일로 저장합니다.
+
+    파일 구조는 snapshot.write_partition()과 같습니다: magic(8) | format version(uint32) |
+    header 길이(uint32) | JSON header | 64바이트 정렬된 배열들.
+
+    Args:
+        demographics: 저장할 Demographics
+        path: 저장 경로
+        version: 데이터셋 버전 (생략 시 dataset_version())
+    """
+    arrays = {name: np.ascontiguousarray(getattr(demographics, name)) for name in ARRAY_FIELDS}
+    header = {
+        'dataset_version': version or snapshot.dataset_version(),
+        'layout': demographics.layout.to_json(),
+        'node_codes': demographics.node_codes.tolist(),
+        'edge_codes': demographics.edge_codes.tolist(),
+        'arrays': {},
+    }
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'offset': 0, 'shape': list(array.shape)}
+    prefix_len = len(FILE_MAGIC) + 8 + len(json.dumps(header).encode()) + 32 * len(arrays)
+    offset = _aligned(prefix_len)
+    for name, array in arrays.items():
+        header['arrays'][name]['offset'] = offset
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * (prefix_len - len(FILE_MAGIC) - 8 - len(header_bytes))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(FILE_MAGIC)
+        f.write(np.array([FORMAT_VERSION, len(header_bytes)], dtype='<u4').tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def open_demographics(path, version=None):
+    """
+    분포 파일을 읽기 전용 메모리 맵으로 엽니다.
+
+    Args:
+        path: 분포 파일 경로
+        version: 기대하는 데이터셋 버전 (생략 시 dataset_version())
+
+    Returns:
+        Demographics: 메모리 맵 기반 분포 벡터 모음
+
+    Raises:
+        snapshot.StaleSnapshotError: 형식/데이터셋 버전이 맞지 않는 경우
+    """
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buf[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise snapshot.StaleSnapshotError(f"{path}: 분포 파일이 아닙니다.")
+    format_version, header_len = np.frombuffer(buf, dtype='<u4', count=2, offset=len(FILE_MAGIC))
+    if format_version != FORMAT_VERSION:
+        raise snapshot.StaleSnapshotError(
+            f"{path}: 파일 형식 버전 {format_version} != {FORMAT_VERSION}")
+    header_start = len(FILE_MAGIC) + 8
+    header = json.loads(buf[header_start:header_start + int(header_len)])
+
+    expected_version = version or snapshot.dataset_version()
+    if header['dataset_version'] != expected_version:
+        raise snapshot.StaleSnapshotError(
+            f"{path}: 데이터셋 버전 {header['dataset_version']} != {expected_version}")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        shape = tuple(spec['shape'])
+        arrays[name] = np.frombuffer(buf, dtype=np.dtype(spec['dtype']), count=int(np.prod(shape)),
+                                     offset=spec['offset']).reshape(shape)
+    demographics = Demographics(
+        Layout(header['layout']),
+        np.array(header['node_codes'], dtype=str),
+        np.array(header['edge_codes'], dtype=str),
+        **arrays,
+    )
+    demographics.mapped_path = path
+    return demographics
+
+
+_demographics = None
+_lock = threading.Lock()
+
+
+def get_demographics():
+    """
+    분포 파일을 열어 반환합니다. 처음 요청될 때 한 번만 엽니다.
+
+    Returns:
+        Demographics 또는 None: 파일이 없거나 데이터셋 버전이 맞지 않으면 None
+    """
+    global _demographics
+    if _demographics is not None:
+        return _demographics
+    path = demographics_path()
+    if not os.path.exists(path):
+        return None
+    with _lock:
+        if _demographics is None:
+            try:
+                _demographics = open_demographics(path)
+            except snapshot.StaleSnapshotError as e:
+                logger.warning("분포 파일을 사용하지 않습니다: %s", e)
+                return None
+    return _demographics
+
+
+def clear():
+    """열어 둔 분포 파일을 버립니다. 다음 요청 시 다시 엽니다."""
+    global _demographics
+    with _lock:
+        _demographics = None
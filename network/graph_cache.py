@@ -0,0 +1,194 @@
+"""
+그래프 뷰들이 공유하는 결과 캐시.
+
+키는 파라미터의 정규화 문자열(수치는 유효숫자 네 자리로 양자화)과 데이터셋 버전으로
+만들고(params_etag), 값은 응답 본문(JSON 또는 바이너리 payload)을 zlib으로 압축한
+bytes입니다. 저장소는 settings.GRAPH_CACHE['ALIAS']의 Django 캐시이므로
+로컬 메모리(LocMemCache)뿐 아니라 파일 기반 캐시 등 프로세스 간 공유 백엔드도 쓸 수 있습니다.
+
+바이트 예산(MAX_BYTES)은 프로세스가 쓰거나 읽은 항목을 LRU 순서로 추적해 지키며,
+예산을 넘으면 가장 오래 사용하지 않은 항목부터 백엔드에서 삭제합니다. 공유 백엔드에서는
+프로세스마다 자기가 추적하는 항목에 대해서만 예산을 적용합니다.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .params import params_etag
+
+DEFAULT_GRAPH_CACHE = {
+    'ALIAS': 'default',
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'TIMEOUT': 3600,
+    'COMPRESS_LEVEL': 6,
+}
+
+
+def cache_options():
+    """settings.GRAPH_CACHE를 기본값과 합친 설정."""
+    return {**DEFAULT_GRAPH_CACHE, **getattr(settings, 'GRAPH_CACHE', {})}
+
+
+class GraphCache:
+    """
+    압축된 그래프 payload를 바이트 예산 LRU로 관리하는 캐시입니다.
+
+    Attributes:
+        max_bytes: 압축 후 크기 기준 바이트 예산
+        hits, misses, evictions: 누적 통계
+    """
+
+    def __init__(self, alias='default', max_bytes=DEFAULT_GRAPH_CACHE['MAX_BYTES'],
+                 timeout=DEFAULT_GRAPH_CACHE['TIMEOUT'], compress_level=DEFAULT_GRAPH_CACHE['COMPRESS_LEVEL']):
+        self.alias = alias
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.compress_level = compress_level
+        self._entries = OrderedDict()  # key -> 압축 크기 (LRU 순서)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(kind, fmt, params):
+        """응답 종류/형식/파라미터의 캐시 키."""
+        return f"graph:{kind}.{fmt}:{params_etag(f'{kind}.{fmt}', params)}"
+
+    def _touch(self, key, size):
+        """항목을 최근 사용으로 표시하고, 예산을 넘은 만큼 오래된 항목 키를 반환합니다."""
+        with self._lock:
+            self._bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = []
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                evicted.append(old_key)
+            self.evictions += len(evicted)
+            return evicted
+
+    def _forget(self, key):
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+
+    def get(self, key):
+        """
+        캐시된 payload를 반환합니다.
+
+        Args:
+            key: GraphCache.key()로 만든 키
+
+        Returns:
+            bytes 또는 None: 압축을 푼 응답 본문
+        """
+        blob = self.backend.get(key)
+        if blob is None:
+            self._forget(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        evicted = self._touch(key, len(blob))
+        if evicted:
+            self.backend.delete_many(evicted)
+        return zlib.decompress(blob)
+
+    def set(self, key, data):
+        """
+        payload를 압축해 저장하고, 바이트 예산을 넘으면 LRU 항목을 삭제합니다.
+
+        Args:
+            key: GraphCache.key()로 만든 키
+            data: 응답 본문 bytes
+
+        Returns:
+            int 또는 None: 저장된 압축 크기 (예산보다 커서 저장하지 않았으면 None)
+        """
+        blob = zlib.compress(data, self.compress_level)
+        if len(blob) > self.max_bytes:
+            return None
+        self.backend.set(key, blob, timeout=self.timeout)
+        evicted = self._touch(key, len(blob))
+        if evicted:
+            self.backend.delete_many(evicted)
+        return len(blob)
+
+    def get_or_build(self, kind, fmt, params, build):
+        """
+        캐시된 payload를 반환하고, 없으면 build()로 만들어 저장합니다.
+
+        Args:
+            kind: 응답 종류 ('main', 'single', 'sub')
+            fmt: 응답 형식 ('json', 'binary')
+            params: 요청 파라미터 딕셔너리 (키는 params_etag()로 양자화)
+            build: 응답 본문 bytes를 만드는 함수
+
+        Returns:
+            bytes: 응답 본문
+        """
+        key = self.key(kind, fmt, params)
+        data = self.get(key)
+        if data is None:
+            data = build()
+            self.set(key, data)
+        return data
+
+    def stats(self):
+        """히트/미스/삭제 수와 현재 추적 중인 항목 수, 바이트 수."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'alias': self.alias,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """추적 중인 항목을 백엔드에서 삭제하고 통계를 초기화합니다."""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+        if keys:
+            self.backend.delete_many(keys)
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def get_graph_cache():
+    """
+    프로세스 단위 GraphCache를 반환합니다.
+
+    Returns:
+        GraphCache: settings.GRAPH_CACHE 설정의 그래프 캐시
+    """
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                options = cache_options()
+                _cache = GraphCache(
+                    alias=options['ALIAS'],
+                    max_bytes=options['MAX_BYTES'],
+                    timeout=options['TIMEOUT'],
+                    compress_level=options['COMPRESS_LEVEL'],
+                )
+    return _cache
@@ -0,0 +1,395 @@
+"""
+서버 측 그래프 레이아웃(노드 좌표) 계산과 캐시.
+
+브라우저의 fcose 대신 NumPy로 구현한 force-directed(Fruchterman-Reingold) 레이아웃으로
+노드 좌표를 계산하고, 그래프 payload의 노드마다 position을 넣어 클라이언트가 preset
+레이아웃으로 바로 그리게 합니다. 척력은 노드 블록 단위로 모든 쌍에 대해, 인력은 엣지
+배열에 대해 한 번에 계산하므로 반복당 비용은 노드 수² / 엣지 수에 비례합니다.
+
+좌표는 응답 종류와 양자화된 파라미터(follow-up, 임계값, 선택 질병) 키로 그래프 캐시에
+저장합니다(kind는 '<종류>.layout'). 같은 그래프에서 임계값만 바뀐 요청은 가장 가까운
+임계값의 캐시된 좌표에서 시작해 적은 반복으로 다듬으므로, 슬라이더를 움직여도 기존
+노드가 제자리 근처에 머뭅니다.
+
+요청 처리 중에는 계산량((노드 수² + EDGE_COST × 엣지 수) × 반복 수)을 REQUEST_WORK 이하로
+제한합니다. 반복 수를
+줄여도 MIN_ITERATIONS보다 적어지는 큰 그래프는 좌표 없이 응답하고(클라이언트 fcose),
+warm_graph_cache 명령이 offline() 안에서 제한 없이 미리 계산해 둡니다.
+"""
+import json
+import math
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+from .graph_cache import GraphCache, get_graph_cache
+from .params import canonical_query
+
+DEFAULT_GRAPH_LAYOUT = {
+    'ENABLED': True,
+    # 노드가 이보다 많으면 서버 레이아웃을 만들지 않음 (클라이언트 fcose 사용)
+    'MAX_NODES': 3000,
+    'ITERATIONS': 120,
+    # 이웃 임계값의 좌표에서 시작할 때의 반복 수
+    'SEEDED_ITERATIONS': 40,
+    # 연결된 노드 사이의 목표 거리 (화면 좌표)
+    'EDGE_LENGTH': 150,
+    # 좌표 시작점을 찾기 위해 기억하는 그래프(임계값을 뺀 파라미터) 수
+    'MAX_FAMILIES': 256,
+    # 요청 처리 중 레이아웃 계산량 상한 ((노드 수² + EDGE_COST × 엣지 수) × 반복 수, 약 0.3초)
+    'REQUEST_WORK': 30_000_000,
+    # 계산량 상한으로 줄인 반복 수가 이보다 적으면 좌표를 계산하지 않음
+    'MIN_ITERATIONS': 20,
+}
+
+# 그래프 모양은 같고 값만 바뀌는 임계값 파라미터 (시작 좌표를 찾을 때 거리 계산에 사용)
+THRESHOLDS = ('rr_values_min', 'rr_values_max', 'chisq_p_values', 'fisher_p_values')
+
+# 그래프마다 기억하는 (좌표를 계산한) 임계값 수
+MAX_THRESHOLDS_PER_FAMILY = 16
+
+# 중심으로 당기는 힘의 계수 (연결되지 않은 컴포넌트가 멀어지지 않도록)
+GRAVITY = 2.0
+
+# 계산량 추정 시 엣지 하나(인력)의 비용 (노드 쌍 하나의 척력 계산 대비)
+EDGE_COST = 10
+
+# 척력 계산 시 한 번에 처리하는 (노드 블록 × 전체 노드) 쌍 수
+_BLOCK_PAIRS = 1 << 20
+
+
+def layout_options():
+    """settings.GRAPH_LAYOUT을 기본값과 합친 설정."""
+    return {**DEFAULT_GRAPH_LAYOUT, **getattr(settings, 'GRAPH_LAYOUT', {})}
+
+
+_local = threading.local()
+
+
+@contextmanager
+def offline():
+    """이 블록 안에서는 REQUEST_WORK 제한 없이 레이아웃을 계산합니다 (캐시 예열 명령용)."""
+    previous = getattr(_local, 'offline', False)
+    _local.offline = True
+    try:
+        yield
+    finally:
+        _local.offline = previous
+
+
+def iteration_budget(n_nodes, n_edges, iterations):
+    """
+    계산량 상한(REQUEST_WORK)에 맞춘 반복 수.
+
+    Returns:
+        int 또는 None: 반복 수. 상한에 맞추면 MIN_ITERATIONS보다 적어지는 경우 None
+    """
+    if getattr(_local, 'offline', False):
+        return iterations
+    options = layout_options()
+    work = max(n_nodes * n_nodes + EDGE_COST * n_edges, 1)
+    iterations = min(iterations, options['REQUEST_WORK'] // work)
+    return iterations if iterations >= options['MIN_ITERATIONS'] else None
+
+
+def force_layout(source, target, n_nodes, init=None, fixed=None, iterations=120,
+                 edge_length=150.0, temperature=None, seed=0):
+    """
+    Fruchterman-Reingold 레이아웃으로 노드 좌표를 계산합니다.
+
+    Args:
+        source, target: 엣지 양 끝 노드 번호 배열 (0 ~ n_nodes-1)
+        n_nodes: 노드 수
+        init: [n_nodes, 2] 시작 좌표 (생략 시 무작위)
+        fixed: 움직이지 않는 노드의 bool 마스크 (init 좌표 유지)
+        iterations: 반복 수
+        edge_length: 연결된 노드 사이의 목표 거리
+        temperature: 첫 반복의 최대 이동 거리 (생략 시 배치 영역 폭의 1/10)
+        seed: 무작위 시작 좌표의 시드
+
+    Returns:
+        np.ndarray: [n_nodes, 2] float64 좌표
+    """
+    k = float(edge_length)
+    rng = np.random.default_rng(seed)
+    width = k * math.sqrt(max(n_nodes, 1))
+    pos = (rng.random((n_nodes, 2)) - 0.5) * width if init is None else np.array(init, dtype=np.float64)
+    if n_nodes < 2:
+        return pos
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    movable = np.ones(n_nodes, dtype=bool) if fixed is None else ~np.asarray(fixed, dtype=bool)
+    center = pos[~movable].mean(axis=0) if not movable.all() else np.zeros(2)
+    block = max(1, _BLOCK_PAIRS // n_nodes)
+    degree = np.maximum(np.bincount(source, minlength=n_nodes) + np.bincount(target, minlength=n_nodes), 1)
+    t0 = width / 10 if temperature is None else float(temperature)
+
+    for step in range(iterations):
+        x, y = pos[:, 0].astype(np.float32), pos[:, 1].astype(np.float32)
+        disp = np.zeros_like(pos)
+        # 척력: 모든 쌍에 k² / d (노드 블록 단위, float32)
+        for start in range(0, n_nodes, block):
+            dx = x[start:start + block, None] - x[None, :]
+            dy = y[start:start + block, None] - y[None, :]
+            scale = np.float32(k * k) / np.maximum(dx * dx + dy * dy, np.float32(1e-2))
+            disp[start:start + block, 0] += (dx * scale).sum(axis=1)
+            disp[start:start + block, 1] += (dy * scale).sum(axis=1)
+        # 인력: 엣지마다 d² / k (노드 차수로 나눠 엣지가 많은 노드가 뭉치지 않게 함)
+        delta = pos[source] - pos[target]
+        force = delta * (np.sqrt(np.einsum('ij,ij->i', delta, delta)) / k)[:, None]
+        for axis in range(2):
+            disp[:, axis] -= np.bincount(source, force[:, axis], n_nodes) / degree
+            disp[:, axis] += np.bincount(target, force[:, axis], n_nodes) / degree
+        # 연결되지 않은 컴포넌트가 멀어지지 않도록 중심 쪽으로 당김
+        disp -= (pos - center) * GRAVITY
+
+        # 온도(최대 이동 거리)를 선형으로 낮추며 이동
+        t = t0 * (1 - step / iterations)
+        length = np.maximum(np.sqrt(np.einsum('ij,ij->i', disp, disp)), 1e-9)
+        move = disp * (np.minimum(length, t) / length)[:, None]
+        pos[movable] += move[movable]
+    return pos
+
+
+def nearest_distances(pos):
+    """노드마다 가장 가까운 다른 노드까지의 거리."""
+    n_nodes = len(pos)
+    block = max(1, _BLOCK_PAIRS // max(n_nodes, 1))
+    nearest = np.empty(n_nodes)
+    for start in range(0, n_nodes, block):
+        delta = pos[start:start + block, None, :] - pos[None, :, :]
+        dist2 = np.einsum('ijk,ijk->ij', delta, delta)
+        dist2[np.arange(len(dist2)), np.arange(start, start + len(dist2))] = np.inf
+        nearest[start:start + block] = np.sqrt(dist2.min(axis=1))
+    return nearest
+
+
+def spread(pos, min_spacing):
+    """
+    노드 간격(가장 가까운 노드까지 거리의 중앙값)이 min_spacing보다 좁으면 중심 기준으로 넓힙니다.
+
+    엣지가 많은 그래프는 인력이 커서 노드가 겹칠 만큼 모이므로, 모양은 유지한 채 배율만 키웁니다.
+    """
+    if len(pos) < 2:
+        return pos
+    spacing = float(np.median(nearest_distances(pos)))
+    if spacing >= min_spacing:
+        return pos
+    center = pos.mean(axis=0)
+    return center + (pos - center) * (min_spacing / max(spacing, 1e-6))
+
+
+def seed_positions(codes, source, target, seed, edge_length, pinned=None, rng_seed=0):
+    """
+    이전 좌표로 시작 좌표를 만듭니다. 이전에 없던 노드는 이미 배치된 이웃들의 평균 근처에 둡니다.
+
+    Args:
+        codes: 노드 코드 목록
+        source, target: 엣지 양 끝 노드 번호 배열
+        seed: {코드: {"x", "y"}} 이전 좌표
+        edge_length: 연결된 노드 사이의 목표 거리
+        pinned: {코드: {"x", "y"}} 고정 위치
+
+    Returns:
+        np.ndarray: [노드 수, 2] 시작 좌표
+    """
+    rng = np.random.default_rng(rng_seed)
+    known = {**seed, **(pinned or {})}
+    pos = np.zeros((len(codes), 2))
+    placed = np.zeros(len(codes), dtype=bool)
+    for i, code in enumerate(codes):
+        if code in known:
+            pos[i] = known[code]['x'], known[code]['y']
+            placed[i] = True
+    if placed.all():
+        return pos
+    origin = pos[placed].mean(axis=0) if placed.any() else np.zeros(2)
+    # 배치된 이웃 좌표의 합/수
+    total = np.zeros_like(pos)
+    count = np.zeros(len(codes))
+    for a, b in ((source, target), (target, source)):
+        mask = placed[b]
+        np.add.at(total, a[mask], pos[b[mask]])
+        np.add.at(count, a[mask], 1)
+    new = ~placed
+    near = new & (count > 0)
+    pos[near] = total[near] / count[near, None]
+    pos[new & (count == 0)] = origin
+    pos[new] += (rng.random((new.sum(), 2)) - 0.5) * edge_length
+    return pos
+
+
+def compute_positions(codes, source, target, seed=None, pinned=None):
+    """
+    노드 코드 목록과 엣지로 좌표를 계산합니다.
+
+    seed에 있는 노드는 그 좌표에 고정하고 새로 나타난 노드만 배치하므로, 임계값을 조금
+    바꾼 그래프에서 기존 노드는 움직이지 않습니다. 노드의 절반 이상이 새 노드이면 seed를
+    쓰지 않고 처음부터 배치합니다.
+
+    Args:
+        codes: 노드 코드 목록
+        source, target: 엣지 양 끝 노드 번호 배열
+        seed: {코드: {"x", "y"}} 시작 좌표로 쓸 이전 좌표 (이웃 임계값의 레이아웃)
+        pinned: {코드: {"x", "y"}} 고정 위치 노드
+
+    Returns:
+        dict 또는 None: {코드: {"x", "y"}} (소수 첫째 자리). 계산량 상한을 넘는 그래프는 None
+    """
+    options = layout_options()
+    pinned = pinned or {}
+    edge_length = options['EDGE_LENGTH']
+    fixed = np.array([code in pinned for code in codes], dtype=bool)
+    seeded = np.array([code in seed for code in codes], dtype=bool) if seed else np.zeros(len(codes), dtype=bool)
+    if seeded.sum() * 2 < len(codes):
+        seed, seeded = None, np.zeros(len(codes), dtype=bool)
+
+    iterations = iteration_budget(len(codes), len(source),
+                                  options['SEEDED_ITERATIONS' if seed else 'ITERATIONS'])
+    if iterations is None:
+        return None
+    if seed:
+        # 기존 노드는 이전 좌표에 고정하고 새 노드만 이웃 근처에서 짧게 배치
+        init = seed_positions(codes, source, target, seed, edge_length, pinned=pinned)
+        pos = force_layout(source, target, len(codes), init=init, fixed=fixed | seeded,
+                           iterations=iterations, edge_length=edge_length,
+                           temperature=edge_length / 2)
+    else:
+        init = seed_positions(codes, source, target, {}, edge_length, pinned=pinned) if fixed.any() else None
+        pos = force_layout(source, target, len(codes), init=init, fixed=fixed,
+                           iterations=iterations, edge_length=edge_length)
+        # 고정 노드가 있으면 그 위치가 기준이므로 넓히지 않음
+        if not fixed.any():
+            pos = spread(pos, edge_length / 2)
+    pos = np.round(pos, 1)
+    return {code: {"x": x, "y": y} for code, (x, y) in zip(codes, pos.tolist())}
+
+
+def family_key(kind, params):
+    """임계값을 뺀 파라미터 (같은 그래프의 다른 임계값 레이아웃끼리 같은 키)."""
+    return f"{kind}|{canonical_query({k: v for k, v in params.items() if k not in THRESHOLDS})}"
+
+
+def threshold_vector(params):
+    """시작 좌표를 고를 때 쓰는 임계값 좌표 (p-value는 log 스케일)."""
+    return np.array([
+        float(params['rr_values_min']), float(params['rr_values_max']),
+        math.log10(max(float(params['chisq_p_values']), 1e-12)),
+        math.log10(max(float(params['fisher_p_values']), 1e-12)),
+    ])
+
+
+# 그래프(family_key)별로 좌표를 계산/조회한 파라미터 목록 (좌표 자체는 그래프 캐시에 있음)
+_families = OrderedDict()
+_lock = threading.Lock()
+
+
+def _remember(kind, params):
+    family = family_key(kind, params)
+    key = canonical_query(params)
+    with _lock:
+        known = _families.pop(family, OrderedDict())
+        known.pop(key, None)
+        known[key] = dict(params)
+        while len(known) > MAX_THRESHOLDS_PER_FAMILY:
+            known.popitem(last=False)
+        _families[family] = known
+        while len(_families) > layout_options()['MAX_FAMILIES']:
+            _families.popitem(last=False)
+
+
+def _nearest(kind, params):
+    """같은 그래프에서 임계값이 가장 가까운, 좌표가 계산된 파라미터 목록 (가까운 순)."""
+    with _lock:
+        known = list(_families.get(family_key(kind, params), {}).values())
+    target = threshold_vector(params)
+    return sorted(known, key=lambda other: float(np.abs(threshold_vector(other) - target).sum()))
+
+
+def cached_positions(kind, params):
+    """
+    캐시된 좌표만 조회합니다 (없으면 계산하지 않고 None).
+
+    Args:
+        kind: 응답 종류
+        params: 요청 파라미터 딕셔너리 (키는 params_etag()로 양자화)
+
+    Returns:
+        dict 또는 None: {코드: {"x", "y"}}
+    """
+    if not layout_options()['ENABLED']:
+        return None
+    data = get_graph_cache().get(GraphCache.key(f'{kind}.layout', 'json', params))
+    if data is None:
+        return None
+    _remember(kind, params)
+    return json.loads(data)
+
+
+def graph_positions(kind, params, codes, source, target, pinned=None):
+    """
+    그래프의 노드 좌표를 캐시에서 찾거나 계산합니다.
+
+    Args:
+        kind: 응답 종류 ('main', 'single', 'sub', 'diff')
+        params: 요청 파라미터 딕셔너리 (그래프 캐시 키와 같음)
+        codes: 노드 코드 목록
+        source, target: 엣지 양 끝 노드 번호 배열 (codes 인덱스)
+        pinned: {코드: {"x", "y"}} 고정 위치 노드
+
+    Returns:
+        dict 또는 None: {코드: {"x", "y"}}. 서버 레이아웃을 끄거나 노드가 MAX_NODES보다 많거나
+        요청 처리 중 계산량 상한(REQUEST_WORK)을 넘으면 None
+    """
+    options = layout_options()
+    if not options['ENABLED'] or not len(codes) or len(codes) > options['MAX_NODES']:
+        return None
+    cache = get_graph_cache()
+    layout_kind = f'{kind}.layout'
+    data = cache.get(GraphCache.key(layout_kind, 'json', params))
+    if data is not None:
+        _remember(kind, params)
+        return json.loads(data)
+
+    seed = None
+    for other in _nearest(kind, params):
+        data = cache.get(GraphCache.key(layout_kind, 'json', other))
+        if data is not None:
+            seed = json.loads(data)
+            break
+    positions = compute_positions(list(codes), source, target, seed=seed, pinned=pinned)
+    if positions is None:
+        return None
+    cache.set(GraphCache.key(layout_kind, 'json', params), json.dumps(positions).encode())
+    _remember(kind, params)
+    return positions
+
+
+def edge_positions(kind, params, cause, outcome, codes=None, pinned=None):
+    """
+    엣지 배열로 그래프의 노드 좌표를 구합니다 (graph_positions()의 엣지 배열 버전).
+
+    Args:
+        kind: 응답 종류
+        params: 요청 파라미터 딕셔너리 (키는 params_etag()로 양자화)
+        cause, outcome: 노드 코드 배열 (codes 지정 시 codes에 대한 정수 인덱스 배열)
+        codes: cause/outcome 인덱스가 가리키는 코드 사전
+        pinned: {코드: {"x", "y"}} 고정 위치 노드
+
+    Returns:
+        dict 또는 None: graph_positions()와 같음
+    """
+    uniq, inverse = np.unique(np.concatenate([np.asarray(cause), np.asarray(outcome)]), return_inverse=True)
+    node_codes = codes[uniq] if codes is not None else uniq
+    node_codes = np.asarray(node_codes, dtype=str).tolist()
+    return graph_positions(kind, params, node_codes, inverse[:len(cause)], inverse[len(cause):],
+                           pinned=pinned)
+
+
+def clear():
+    """좌표를 계산한 임계값 목록을 비웁니다 (좌표는 그래프 캐시에서 함께 지워짐)."""
+    with _lock:
+        _families.clear()
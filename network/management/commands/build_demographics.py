@@ -0,0 +1,33 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from network import demographics, snapshot
+
+
+class Command(BaseCommand):
+    help = "node_attr/edge_attr 인구학적 분포를 노드/엣지별 고정 크기 배열 파일로 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', default=None,
+            help="분포 파일 저장 디렉토리 (기본값: settings.EDGE_SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir'] or snapshot.snapshot_dir()
+        version = snapshot.dataset_version()
+
+        started = time.perf_counter()
+        distributions = demographics.load_demographics_from_db()
+        path = demographics.demographics_path(output_dir)
+        demographics.write_demographics(distributions, path, version=version)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(distributions.node_codes):,} nodes, {len(distributions.edge_keys):,} edges, "
+            f"vector size {distributions.layout.size}, "
+            f"{os.path.getsize(path) / 1e6:.1f} MB -> {path} ({elapsed:.1f}s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"데이터셋 버전 {version} 분포 파일 생성 완료"))
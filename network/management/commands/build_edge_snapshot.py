@@ -0,0 +1,50 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from network import snapshot
+
+
+class Command(BaseCommand):
+    help = "edge_stat의 follow-up 별 파티션을 메모리 맵 스냅샷 파일로 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', choices=['db', 'csv'], default='db',
+            help="데이터 원본: MariaDB edge_stat(db) 또는 media/final_result_{fu}.csv(csv)",
+        )
+        parser.add_argument(
+            '--follow-up', type=int, action='append', dest='follow_ups',
+            help="생성할 follow-up 기간 (여러 번 지정 가능, 기본값: 1~10)",
+        )
+        parser.add_argument(
+            '--output-dir', default=None,
+            help="스냅샷 저장 디렉토리 (기본값: settings.EDGE_SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        follow_ups = options['follow_ups'] or list(range(1, 11))
+        output_dir = options['output_dir'] or snapshot.snapshot_dir()
+        version = snapshot.dataset_version()
+
+        for follow_up in follow_ups:
+            started = time.perf_counter()
+            if options['source'] == 'csv':
+                csv_path = os.path.join(settings.MEDIA_ROOT, f"final_result_{follow_up}.csv")
+                if not os.path.exists(csv_path):
+                    raise CommandError(f"{csv_path} 파일이 없습니다.")
+                partition = snapshot.load_partition_from_csv(follow_up, csv_path)
+            else:
+                partition = snapshot.load_partition_from_db(follow_up)
+
+            path = snapshot.snapshot_path(follow_up, output_dir)
+            snapshot.write_partition(partition, path, version=version)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"fu={follow_up}: {len(partition):,} rows, {len(partition.codes)} codes, "
+                f"{os.path.getsize(path) / 1e6:.1f} MB -> {path} ({elapsed:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"데이터셋 버전 {version} 스냅샷 생성 완료"))
@@ -0,0 +1,40 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from network import cube, snapshot
+
+
+class Command(BaseCommand):
+    help = "follow-up 별 임계값 큐브(RR × p-value 구간별 엣지/노드 수 누적 집계)를 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follow-up', type=int, action='append', dest='follow_ups',
+            help="생성할 follow-up 기간 (여러 번 지정 가능, 기본값: 1~10)",
+        )
+        parser.add_argument(
+            '--output-dir', default=None,
+            help="큐브 저장 디렉토리 (기본값: settings.EDGE_SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        follow_ups = options['follow_ups'] or list(range(1, 11))
+        output_dir = options['output_dir'] or snapshot.snapshot_dir()
+        version = snapshot.dataset_version()
+
+        for follow_up in follow_ups:
+            started = time.perf_counter()
+            partition = snapshot.get_partition(follow_up)
+            threshold_cube = cube.ThresholdCube.from_partition(partition, version=version)
+
+            path = cube.cube_path(follow_up, output_dir)
+            cube.write_cube(threshold_cube, path, version=version)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"fu={follow_up}: {len(partition):,} rows -> {path} "
+                f"({os.path.getsize(path) / 1e3:.0f} KB, {elapsed:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"데이터셋 버전 {version} 큐브 생성 완료"))
@@ -0,0 +1,111 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from network import metrics, snapshot, views
+from network.params import MAIN_DEFAULTS
+
+
+def _init_worker():
+    django.setup()
+
+
+def _compute(params):
+    """워커 프로세스에서 지표 하나를 계산합니다 (저장은 부모 프로세스에서)."""
+    started = time.perf_counter()
+    result = metrics.compute_metrics(*views.main_network_rows(**params))
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = ("follow-up × p-value 임계값 격자의 메인 네트워크 구조 지표를 프로세스 풀에서 계산해 "
+            "NetworkMetrics 테이블에 저장합니다. 현재 데이터셋 버전으로 이미 저장된 조건은 건너뜁니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follow-up', type=int, action='append', dest='follow_ups',
+            help="계산할 follow-up 기간 (여러 번 지정 가능, 기본값: 1~10)",
+        )
+        parser.add_argument(
+            '--p-value', type=float, action='append', dest='p_values',
+            help="chisq/fisher p-value 임계값 (여러 번 지정 가능, 기본값: 0.05)",
+        )
+        parser.add_argument(
+            '--rr-min', type=float, default=MAIN_DEFAULTS['rr_values_min'],
+            help="log RR 최소값 (기본값: 0)",
+        )
+        parser.add_argument(
+            '--rr-max', type=float, default=MAIN_DEFAULTS['rr_values_max'],
+            help="log RR 최대값 (기본값: 2)",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="프로세스 풀 크기 (기본값: CPU 수)",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="이미 저장된 조건도 다시 계산",
+        )
+
+    def jobs(self, follow_ups, p_values, rr_min, rr_max):
+        """계산할 파라미터 목록 (같은 키는 한 번만)."""
+        jobs = {}
+        for follow_up in follow_ups:
+            for p_value in p_values:
+                params = {
+                    'follow_up': follow_up, 'rr_values_min': rr_min, 'rr_values_max': rr_max,
+                    'chisq_p_values': p_value, 'fisher_p_values': p_value,
+                }
+                jobs.setdefault(metrics.metrics_key(params), params)
+        return jobs
+
+    def handle(self, *args, **options):
+        follow_ups = options['follow_ups'] or list(range(1, 11))
+        p_values = options['p_values'] or [MAIN_DEFAULTS['chisq_p_values']]
+        jobs = self.jobs(follow_ups, p_values, options['rr_min'], options['rr_max'])
+        if not options['force']:
+            jobs = {key: params for key, params in jobs.items() if metrics.stored_metrics(params) is None}
+        self.stdout.write(f"{len(jobs)}개 조건 계산 (workers={options['workers']})")
+
+        # fork된 워커가 복사 없이 공유하도록 파티션을 먼저 적재하고, DB 연결은 물려주지 않음
+        for follow_up in sorted({params['follow_up'] for params in jobs.values()}):
+            snapshot.get_partition(follow_up)
+        connections.close_all()
+
+        started = time.perf_counter()
+        failed = 0
+
+        def report(key, result):
+            data, elapsed = result
+            metrics.save_metrics(jobs[key], data)
+            modularity = data['modularity']['value']
+            self.stdout.write(
+                f"{key}: {elapsed * 1e3:.0f} ms, 노드 {data['nodes']}, 엣지 {data['edges']}, "
+                f"density {data['density']:.4f}, modularity {'-' if modularity is None else f'{modularity:.3f}'}")
+
+        def report_error(key, error):
+            nonlocal failed
+            failed += 1
+            self.stderr.write(self.style.ERROR(f"{key}: {error}"))
+
+        if options['workers'] <= 1:
+            for key, params in jobs.items():
+                try:
+                    report(key, _compute(params))
+                except Exception as e:
+                    report_error(key, e)
+        else:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                futures = {pool.submit(_compute, params): key for key, params in jobs.items()}
+                for future in as_completed(futures):
+                    try:
+                        report(futures[future], future.result())
+                    except Exception as e:
+                        report_error(futures[future], e)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{len(jobs) - failed}개 저장, 실패 {failed}개, {elapsed:.1f}s"))
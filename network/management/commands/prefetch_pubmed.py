@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db import close_old_connections
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from network import pubmed, registry, snapshot
+from network.models import PubmedResult
+
+# 상위 엣지를 고르는 유의성 조건
+SIGNIFICANT_P = 0.05
+
+
+def top_edges(partition, top):
+    """유의한(chisq/fisher p ≤ 0.05) 엣지 중 RR이 큰 순서로 top개의 (cause, outcome) 코드."""
+    keep = np.flatnonzero(np.isfinite(partition.rr) &
+                          (partition.chisq <= np.float32(SIGNIFICANT_P)) &
+                          (partition.fisher <= np.float32(SIGNIFICANT_P)))
+    rows = keep[::-1][:top]  # 파티션은 rr 오름차순
+    codes = partition.codes
+    return [(str(codes[c]), str(codes[o])) for c, o in zip(partition.cause[rows], partition.outcome[rows])]
+
+
+def save_results(found, retmax):
+    """(검색어, 결과) 목록을 PubmedResult에 저장합니다 (이미 있으면 갱신)."""
+    now = timezone.now()
+    PubmedResult.objects.bulk_create(
+        [PubmedResult(term=term, results=results, retmax=retmax, fetched_at=now)
+         for term, results in found],
+        update_conflicts=True, unique_fields=['term'], update_fields=['results', 'retmax', 'fetched_at'],
+    )
+    close_old_connections()
+
+
+class Command(BaseCommand):
+    help = ("모든 node_base 질병과 follow-up 별 상위 엣지의 PubMed 검색 결과를 미리 조회해 "
+            "PubmedResult 테이블에 저장합니다. 이미 저장된 검색어는 건너뛰므로 중단된 실행을 이어갈 수 있습니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follow-up', type=int, action='append', dest='follow_ups',
+            help="상위 엣지를 고를 follow-up 기간 (여러 번 지정 가능, 기본값: 1~10)",
+        )
+        parser.add_argument(
+            '--top', type=int, default=200,
+            help="follow-up 별로 조회할 상위 엣지 수 (기본값: 200)",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=3,
+            help="동시에 ESearch를 호출하는 asyncio 워커 수 (기본값: 3)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help="ESummary 한 번에 조회할 PMID 수 (기본값: 200)",
+        )
+        parser.add_argument(
+            '--max-age', type=int, default=None,
+            help="저장된 지 이 일수가 지난 결과는 다시 조회 (기본값: 다시 조회하지 않음)",
+        )
+
+    def terms(self, follow_ups, top):
+        """조회할 검색어 목록 (노드 → 엣지 순, 중복 제거)."""
+        nodes_registry = registry.get_registry()
+        terms = [pubmed.node_term(nodes_registry, code) for code in nodes_registry.codes.tolist()]
+        for follow_up in follow_ups:
+            for source, target in top_edges(snapshot.get_partition(follow_up), top):
+                terms.append(pubmed.edge_term(nodes_registry, source, target))
+        return list(dict.fromkeys(term for term in terms if term))
+
+    def pending(self, terms, max_age, retmax):
+        """체크포인트(저장된 결과)에 없거나 오래된 검색어."""
+        done = PubmedResult.objects.filter(retmax__gte=retmax)
+        if max_age is not None:
+            done = done.filter(fetched_at__gte=timezone.now() - timedelta(days=max_age))
+        done = set(done.values_list('term', flat=True))
+        return [term for term in terms if term not in done]
+
+    async def prefetch(self, backend, terms, retmax, workers, batch_size):
+        """
+        ESearch는 워커들이 동시에 호출하고, 모인 PMID는 batch_size개씩 ESummary 한 번으로 조회합니다.
+
+        Returns:
+            tuple: (저장한 검색어 수, 실패한 검색어 수)
+        """
+        queue = asyncio.Queue()
+        for term in terms:
+            queue.put_nowait(term)
+        searched = []  # 요약을 기다리는 (검색어, PMID 목록)
+        counts = {'saved': 0, 'failed': 0}
+        summarize_lock = asyncio.Lock()
+
+        async def summarize(items):
+            pmids = list(dict.fromkeys(pmid for _, ids in items for pmid in ids))
+            try:
+                summaries = {}
+                for start in range(0, len(pmids), batch_size):
+                    summaries.update(await asyncio.to_thread(backend.esummary, pmids[start:start + batch_size]))
+            except pubmed.PubmedError as e:
+                counts['failed'] += len(items)
+                self.stderr.write(self.style.ERROR(f"ESummary 실패 ({len(items)}개 검색어): {e}"))
+                return
+            await save([(term, pubmed.format_papers(ids, summaries)) for term, ids in items])
+
+        async def save(found):
+            if found:
+                await asyncio.to_thread(save_results, found, retmax)
+                counts['saved'] += len(found)
+                self.stdout.write(f"{counts['saved']}/{len(terms)} 저장")
+
+        async def take_batch(force=False):
+            # 모인 PMID가 batch_size 이상이면(또는 마지막이면) 그만큼 꺼내 요약 조회
+            async with summarize_lock:
+                total = sum(len(ids) for _, ids in searched)
+                if not searched or (total < batch_size and not force):
+                    return
+                batch, size = [], 0
+                while searched and (size < batch_size or force):
+                    item = searched.pop(0)
+                    batch.append(item)
+                    size += len(item[1])
+                await summarize(batch)
+
+        async def worker():
+            while True:
+                try:
+                    term = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    ids = await asyncio.to_thread(backend.esearch, term, retmax)
+                except pubmed.PubmedError as e:
+                    counts['failed'] += 1
+                    self.stderr.write(self.style.ERROR(f"{term}: {e}"))
+                    continue
+                # 결과가 없는 검색어도 다음 배치와 함께 저장
+                searched.append((term, ids))
+                await take_batch()
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await take_batch(force=True)
+        return counts['saved'], counts['failed']
+
+    def handle(self, *args, **options):
+        follow_ups = options['follow_ups'] or list(range(1, 11))
+        client = pubmed.get_client()
+        retmax = client.retmax
+
+        terms = self.terms(follow_ups, options['top'])
+        pending = self.pending(terms, options['max_age'], retmax)
+        self.stdout.write(f"검색어 {len(terms)}개 중 {len(terms) - len(pending)}개는 이미 저장됨, "
+                          f"{len(pending)}개 조회 ({type(client.backend).__name__}, workers={options['workers']})")
+
+        started = time.perf_counter()
+        saved, failed = asyncio.run(self.prefetch(
+            client.backend, pending, retmax, options['workers'], options['batch_size']))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{saved}개 저장, 실패 {failed}개, NCBI 호출 {client.backend.calls}회, {elapsed:.1f}s"))
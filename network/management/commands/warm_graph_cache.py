@@ -0,0 +1,187 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from network import layout, registry, snapshot, views
+from network.graph_cache import GraphCache, get_graph_cache
+from network.models import UserGraph
+from network.params import CONNECTIVITY_PRESET, DISEASE_DEFAULTS, MAIN_DEFAULTS, canonical_query, parse_follow_up
+
+BUILDERS = {
+    'main': views.main_network_bytes,
+    'single': views.single_network_bytes,
+    'sub': views.sub_network_bytes,
+}
+
+THRESHOLDS = ['rr_values_min', 'rr_values_max', 'chisq_p_values', 'fisher_p_values']
+
+
+def _init_worker():
+    django.setup()
+
+
+def _build(job):
+    """워커 프로세스에서 payload 하나를 만듭니다."""
+    kind, fmt, params = job
+    started = time.perf_counter()
+    # 요청 처리와 달리 큰 그래프의 레이아웃도 계산량 제한 없이 미리 계산
+    with layout.offline():
+        data = BUILDERS[kind](fmt, **params)
+    return data, time.perf_counter() - started
+
+
+def graph_type_of(graph):
+    """UserGraph 메모의 [그래프타입:xxx] 표기를 읽습니다 (analysis_history와 같은 규칙)."""
+    if '[그래프타입:' in graph.memo:
+        return graph.memo.split('[그래프타입:')[1].split(']')[0]
+    return 'single'
+
+
+def user_graph_params(graph):
+    """
+    UserGraph를 (kind, 파라미터)로 바꿉니다.
+
+    Raises:
+        ValueError: fu가 서비스하는 follow-up(snapshot.follow_ups())이 아닌 경우
+    """
+    kind = graph_type_of(graph)
+    params = {
+        'follow_up': parse_follow_up(graph.fu, f"UserGraph {graph.pk} follow-up"),
+        'rr_values_min': graph.rr_min,
+        'rr_values_max': graph.rr_max,
+        'chisq_p_values': graph.chisq_p,
+        'fisher_p_values': graph.fisher_p,
+    }
+    if kind == 'single':
+        params['disease'] = graph.disease_names
+    elif kind == 'sub':
+        params['diseases'] = graph.disease_names
+    return kind, params
+
+
+class Command(BaseCommand):
+    help = ("자주 쓰이는 그래프 payload를 프로세스 풀에서 미리 만들어 그래프 캐시에 넣습니다 "
+            "(기본 프리셋 × follow-up, UserGraph에 가장 많이 저장된 조건).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follow-up', type=int, action='append', dest='follow_ups',
+            help="기본 프리셋을 만들 follow-up 기간 (여러 번 지정 가능, 기본값: 서비스하는 전체 기간)",
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help="UserGraph에서 가져올 최빈 조건/질병 수 (기본값: 20)",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="프로세스 풀 크기 (기본값: CPU 수)",
+        )
+
+    def jobs(self, follow_ups, top):
+        """
+        (kind, fmt, params) 작업 목록을 만듭니다. 같은 캐시 키는 한 번만 포함합니다.
+
+        서비스하지 않는 follow-up으로 저장된 UserGraph는 경고를 남기고 건너뜁니다.
+        """
+        graphs = []
+        for graph in UserGraph.objects.all():
+            try:
+                graphs.append(user_graph_params(graph))
+            except ValueError as e:
+                self.stderr.write(self.style.WARNING(f"건너뜀: {e}"))
+        disease_presets = dict(DISEASE_DEFAULTS)
+        disease_presets.pop('follow_up')
+
+        jobs = []
+        for follow_up in follow_ups:
+            params = {'follow_up': follow_up, **MAIN_DEFAULTS}
+            jobs += [('main', 'json', params), ('main', 'binary', params)]
+
+        # 자주 저장된 질병(들)에 대해 단일/Sub 기본값 × follow-up과 연결성 확인 조건
+        for kind, key in (('single', 'disease'), ('sub', 'diseases')):
+            frequent = Counter(params[key] for graph_kind, params in graphs if graph_kind == kind)
+            for codes, _ in frequent.most_common(top):
+                for follow_up in follow_ups:
+                    jobs.append((kind, 'json', {key: codes, 'follow_up': follow_up, **disease_presets}))
+                jobs.append((kind, 'json', {key: codes, **CONNECTIVITY_PRESET}))
+
+        # 가장 많이 저장된 조건 그대로
+        frequent = Counter((kind, canonical_query(params)) for kind, params in graphs)
+        by_query = {(kind, canonical_query(params)): (kind, params) for kind, params in graphs}
+        for key, _ in frequent.most_common(top):
+            kind, params = by_query[key]
+            jobs.append((kind, 'json', params))
+
+        unique = {}
+        for kind, fmt, params in jobs:
+            if kind in BUILDERS:
+                unique.setdefault(GraphCache.key(kind, fmt, params), (kind, fmt, params))
+        return unique
+
+    def handle(self, *args, **options):
+        follow_ups = []
+        for follow_up in options['follow_ups'] or snapshot.follow_ups():
+            if follow_up in snapshot.follow_ups():
+                follow_ups.append(follow_up)
+            else:
+                self.stderr.write(self.style.WARNING(f"서비스하지 않는 follow-up {follow_up}은 건너뜁니다."))
+        graph_cache = get_graph_cache()
+        if isinstance(caches[graph_cache.alias], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                f"그래프 캐시 '{graph_cache.alias}'는 LocMemCache입니다. 이 프로세스 안에서만 유효하므로 "
+                "웹 워커에 반영하려면 settings.GRAPH_CACHE['ALIAS']를 공유 백엔드로 지정하세요."))
+
+        jobs = self.jobs(follow_ups, options['top'])
+        self.stdout.write(f"{len(jobs)}개 payload 생성 (workers={options['workers']})")
+
+        # fork된 워커가 복사 없이 공유하도록 파티션/레지스트리를 먼저 적재
+        registry.get_registry()
+        for follow_up in sorted({params['follow_up'] for _, _, params in jobs.values()}):
+            snapshot.get_partition(follow_up)
+
+        started = time.perf_counter()
+        total_bytes = 0
+        failed = 0
+
+        def report(key, result):
+            nonlocal total_bytes
+            kind, fmt, params = jobs[key]
+            data, elapsed = result
+            size = graph_cache.set(key, data)
+            total_bytes += size or 0
+            stored = f"{size / 1e3:.1f} KB" if size is not None else "예산 초과로 저장 안 함"
+            self.stdout.write(
+                f"{kind:<6} {fmt:<6} {canonical_query(params)}: {elapsed * 1e3:.0f} ms, "
+                f"{len(data) / 1e3:.1f} KB -> {stored}")
+
+        def report_error(key, error):
+            nonlocal failed
+            kind, fmt, params = jobs[key]
+            failed += 1
+            self.stderr.write(self.style.ERROR(f"{kind:<6} {fmt:<6} {canonical_query(params)}: {error}"))
+
+        if options['workers'] <= 1:
+            for key, job in jobs.items():
+                try:
+                    report(key, _build(job))
+                except Exception as e:
+                    report_error(key, e)
+        else:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                futures = {pool.submit(_build, job): key for key, job in jobs.items()}
+                for future in as_completed(futures):
+                    try:
+                        report(futures[future], future.result())
+                    except Exception as e:
+                        report_error(futures[future], e)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(jobs) - failed}개 캐시 완료, 실패 {failed}개, "
+            f"압축 후 {total_bytes / 1e6:.1f} MB, {elapsed:.1f}s"))
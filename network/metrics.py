@@ -0,0 +1,234 @@
+"""
+메인 네트워크 구조 지표 (network_feature_extraction 노트북의 지표를 앱에서 계산).
+
+임계값으로 고른 파티션 행을 노드 번호로 압축한 scipy.sparse 인접 행렬로 바꿔 계산합니다.
+
+- 노드/엣지 수, density (방향 그래프, 자기 루프 제외)
+- degree/strength 분포 (in + out, 자기 루프 포함)
+- clustering: 방향과 가중치를 뺀 단순 그래프의 평균 clustering 계수와 transitivity
+  (삼각형 수 = (B @ B) ∘ B의 행 합)
+- connected component: scipy.sparse.csgraph (weak/strong)
+- modularity: RR을 가중치로 한 무방향 그래프의 Louvain 커뮤니티(networkx)에 대한 modularity
+  (커뮤니티 탐색만 networkx, modularity 값은 희소 행렬로 계산)
+- power-law: degree 분포의 이산 power-law 최대우도 적합 (Clauset et al., 2009),
+  KS 거리가 가장 작은 xmin 선택
+
+결과는 데이터셋 버전과 정규화된 파라미터로 NetworkMetrics 테이블에 저장해 두고
+(compute_network_metrics 명령으로 미리 계산 가능) 같은 조건의 요청은 다시 계산하지 않습니다.
+"""
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.special import zeta
+
+from .params import canonical_query, effective_thresholds, quantize_params
+from .snapshot import dataset_version
+
+# strength 분포 히스토그램 구간 수
+STRENGTH_BINS = 20
+
+# power-law 적합에 필요한 최소 꼬리(tail) 노드 수
+POWER_LAW_MIN_TAIL = 10
+
+# Louvain 커뮤니티 탐색 시드 (같은 그래프는 같은 결과)
+LOUVAIN_SEED = 0
+
+
+def adjacency_matrix(partition, rows):
+    """
+    선택한 행으로 압축된 노드 번호의 방향 가중치 인접 행렬을 만듭니다.
+
+    Returns:
+        tuple: (노드 코드 배열, [n, n] csr_matrix (값은 RR))
+    """
+    uniq, inverse = np.unique(np.concatenate([partition.cause[rows], partition.outcome[rows]]),
+                              return_inverse=True)
+    n = len(uniq)
+    source, target = inverse[:len(rows)], inverse[len(rows):]
+    weight = partition.rr[rows].astype(np.float64)
+    matrix = sparse.csr_matrix((weight, (source, target)), shape=(n, n))
+    return partition.codes[uniq], matrix
+
+
+def summary(values):
+    """평균/중앙값/표준편차/최솟값/최댓값."""
+    if len(values) == 0:
+        return {"mean": None, "median": None, "std": None, "min": None, "max": None}
+    return {
+        "mean": float(np.mean(values)),
+        "median": float(np.median(values)),
+        "std": float(np.std(values)),
+        "min": float(np.min(values)),
+        "max": float(np.max(values)),
+    }
+
+
+def clustering(simple):
+    """
+    무방향 단순 그래프(0/1, 대각 0)의 평균 clustering 계수와 transitivity.
+
+    노드별 삼각형 수는 ((B @ B) ∘ B)의 행 합 / 2입니다.
+    """
+    degree = np.asarray(simple.sum(axis=1)).ravel()
+    triangles = np.asarray((simple @ simple).multiply(simple).sum(axis=1)).ravel() / 2
+    pairs = degree * (degree - 1) / 2
+    local = np.divide(triangles, pairs, out=np.zeros_like(triangles), where=pairs > 0)
+    return {
+        "average": float(local.mean()) if len(local) else 0.0,
+        "transitivity": float(triangles.sum() / pairs.sum()) if pairs.sum() > 0 else 0.0,
+    }
+
+
+def components(matrix):
+    """weak/strong connected component 수와 가장 큰 component의 노드 수."""
+    result = {}
+    for connection in ('weak', 'strong'):
+        count, labels = csgraph.connected_components(matrix, directed=True, connection=connection)
+        result[connection] = int(count)
+        result[f"largest_{connection}"] = int(np.bincount(labels).max()) if len(labels) else 0
+    return result
+
+
+def modularity(weighted):
+    """
+    무방향 가중치 그래프(대칭, 대각 0)의 Louvain 커뮤니티와 modularity.
+
+    Q = Σ_c [in_c / 2m - (K_c / 2m)²] (in_c: 커뮤니티 안 가중치 합, K_c: strength 합)
+    """
+    total = weighted.sum()
+    if total == 0:
+        return {"value": None, "communities": 0, "largest_community": 0}
+    graph = nx.from_scipy_sparse_array(weighted)
+    communities = nx.community.louvain_communities(graph, weight='weight', seed=LOUVAIN_SEED)
+    labels = np.empty(weighted.shape[0], dtype=np.int64)
+    for label, members in enumerate(communities):
+        labels[list(members)] = label
+
+    coo = weighted.tocoo()
+    same = labels[coo.row] == labels[coo.col]
+    inside = np.bincount(labels[coo.row[same]], coo.data[same], len(communities))
+    strength = np.bincount(labels, np.asarray(weighted.sum(axis=1)).ravel(), len(communities))
+    value = float((inside / total - (strength / total) ** 2).sum())
+    return {
+        "value": value,
+        "communities": len(communities),
+        "largest_community": int(np.bincount(labels).max()),
+    }
+
+
+def power_law(degree, min_tail=POWER_LAW_MIN_TAIL):
+    """
+    degree 분포의 이산 power-law 적합.
+
+    xmin 후보(서로 다른 degree 값)마다 α = 1 + n / Σ ln(x / (xmin - 0.5))로 추정하고,
+    꼬리의 경험적 CCDF와 ζ(α, x) / ζ(α, xmin)의 KS 거리가 가장 작은 xmin을 고릅니다.
+
+    Returns:
+        dict 또는 None: {"alpha", "xmin", "ks", "n_tail"} (꼬리가 min_tail보다 작으면 None)
+    """
+    degree = np.sort(np.asarray(degree, dtype=np.float64)[degree > 0])
+    best = None
+    for xmin in np.unique(degree):
+        tail = degree[np.searchsorted(degree, xmin):]
+        if len(tail) < min_tail:
+            break
+        alpha = 1 + len(tail) / np.log(tail / (xmin - 0.5)).sum()
+        values, first = np.unique(tail, return_index=True)
+        empirical = 1 - first / len(tail)  # P(X ≥ x)
+        model = zeta(alpha, values) / zeta(alpha, xmin)
+        ks = float(np.abs(empirical - model).max())
+        if best is None or ks < best["ks"]:
+            best = {"alpha": float(alpha), "xmin": int(xmin), "ks": ks, "n_tail": int(len(tail))}
+    return best
+
+
+def compute_metrics(partition, rows):
+    """
+    선택한 행으로 이루어진 메인 네트워크의 구조 지표를 계산합니다.
+
+    Args:
+        partition: EdgePartition
+        rows: 파티션 행 번호 (메인 네트워크와 같은 선택)
+
+    Returns:
+        dict: 노드/엣지 수, density, degree/strength 분포, clustering, components,
+        modularity, power_law
+    """
+    codes, matrix = adjacency_matrix(partition, rows)
+    n = len(codes)
+    loops = int(np.count_nonzero(matrix.diagonal()))
+    no_loops = matrix - sparse.diags(matrix.diagonal(), format='csr')
+    no_loops.eliminate_zeros()
+
+    out_degree = np.diff(matrix.indptr)
+    in_degree = np.bincount(matrix.indices, minlength=n)
+    degree = out_degree + in_degree
+    strength = np.asarray(matrix.sum(axis=1)).ravel() + np.asarray(matrix.sum(axis=0)).ravel()
+    values, counts = np.unique(degree, return_counts=True)
+    if n:
+        hist, edges = np.histogram(strength, bins=STRENGTH_BINS)
+    else:
+        hist, edges = np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    weighted = no_loops + no_loops.T
+    simple = (weighted > 0).astype(np.float64)
+    return {
+        "nodes": n,
+        "edges": int(matrix.nnz),
+        "self_loops": loops,
+        "density": float(no_loops.nnz / (n * (n - 1))) if n > 1 else 0.0,
+        "degree": {
+            **summary(degree),
+            "mean_in": float(in_degree.mean()) if n else None,
+            "mean_out": float(out_degree.mean()) if n else None,
+            "distribution": {"degree": values.tolist(), "count": counts.tolist()},
+        },
+        "strength": {
+            **summary(strength),
+            "histogram": {"bin_edges": edges.tolist(), "count": hist.tolist()},
+        },
+        "clustering": clustering(simple),
+        "components": components(matrix),
+        "modularity": modularity(weighted),
+        "power_law": power_law(degree),
+    }
+
+
+def metrics_key(params):
+    """NetworkMetrics에 저장하는 파라미터 키 (수치는 quantize_params()로 양자화)."""
+    return canonical_query(quantize_params(params))
+
+
+def stored_metrics(params):
+    """현재 데이터셋 버전으로 저장된 지표 (없으면 None)."""
+    from .models import NetworkMetrics
+    found = NetworkMetrics.objects.filter(dataset_version=dataset_version(), params=metrics_key(params)).first()
+    return found.metrics if found is not None else None
+
+
+def save_metrics(params, metrics):
+    """지표를 현재 데이터셋 버전으로 저장합니다 (이미 있으면 갱신)."""
+    from .models import NetworkMetrics
+    NetworkMetrics.objects.update_or_create(
+        dataset_version=dataset_version(), params=metrics_key(params),
+        defaults={'follow_up': params['follow_up'], 'metrics': metrics},
+    )
+
+
+def get_metrics(params, select):
+    """
+    저장된 지표를 반환하고, 없으면 계산해 저장합니다.
+
+    Args:
+        params: 메인 네트워크 파라미터 (follow_up, 임계값, 희소화)
+        select: () → (partition, rows) 함수 (views.main_network_rows)
+
+    Returns:
+        dict: compute_metrics()의 결과와 계산에 적용한 임계값(thresholds)
+    """
+    metrics = stored_metrics(params)
+    if metrics is None:
+        metrics = {**compute_metrics(*select()), "thresholds": effective_thresholds(params)}
+        save_metrics(params, metrics)
+    return metrics
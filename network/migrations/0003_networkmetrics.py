@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0002_pubmedresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset_version', models.CharField(max_length=64)),
+                ('params', models.CharField(max_length=500)),
+                ('follow_up', models.IntegerField()),
+                ('metrics', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dataset_version', 'params'), name='unique_network_metrics')],
+            },
+        ),
+    ]
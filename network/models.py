@@ -15,3 +15,25 @@ class UserGraph(models.Model):
     disease_names = models.TextField()  # 콤마/JSON 등으로 저장
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+
+class PubmedResult(models.Model):
+    """prefetch_pubmed로 미리 조회해 둔 PubMed 검색 결과 (search_pubmed가 먼저 조회)."""
+    term = models.CharField(max_length=500, unique=True)  # PubMed 검색어
+    results = models.JSONField(default=list)  # [{"title", "url"}]
+    retmax = models.IntegerField()
+    fetched_at = models.DateTimeField(auto_now=True)
+
+
+class NetworkMetrics(models.Model):
+    """메인 네트워크 구조 지표 (network/metrics.py, 데이터셋 버전 + 파라미터별로 한 번 계산)."""
+    dataset_version = models.CharField(max_length=64)
+    params = models.CharField(max_length=500)  # 정규화된 파라미터 (canonical_query)
+    follow_up = models.IntegerField()
+    metrics = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dataset_version', 'params'], name='unique_network_metrics'),
+        ]
@@ -0,0 +1,313 @@
+"""
+그래프 요청 파라미터 파싱과 정규화(canonicalization).
+
+같은 조건의 요청은 쿼리 문자열 표기('0.05'와 '0.050' 등)와 관계없이 같은 키를
+갖도록 정규화하여 ETag, 캐시 키, 데이터 URL에 사용합니다.
+
+캐시 키(ETag, 그래프 캐시, 레이아웃/지표 캐시)를 만들 때만 수치 파라미터를 유효숫자
+네 자리로 양자화하여 표기 오차 수준의 차이('0.05'와 '0.050001')가 같은 키를 공유하게
+합니다. 엣지 선택은 항상 사용자가 요청한 값 그대로 하며, 캐시된 응답에는 실제로
+적용한 임계값(thresholds)이 함께 담깁니다.
+"""
+import base64
+import hashlib
+import math
+from urllib.parse import parse_qsl, urlencode
+
+from .snapshot import dataset_version, follow_ups
+
+# 메인 네트워크(graph_page) 기본값
+MAIN_DEFAULTS = {
+    'rr_values_min': 0.0,
+    'rr_values_max': 2.0,
+    'chisq_p_values': 0.05,
+    'fisher_p_values': 0.05,
+}
+
+# 단일/Sub 네트워크(single_disease_graph, sub_disease_graph) 기본값
+DISEASE_DEFAULTS = {
+    'follow_up': 1,
+    'rr_values_min': 1.1,
+    'rr_values_max': 1.3,
+    'chisq_p_values': 0.5,
+    'fisher_p_values': 0.5,
+}
+
+# 메인 네트워크 엣지 희소화(network/sparsify.py) 방식별 기본값
+# (top/node_top은 sparsify_k, disparity는 sparsify_alpha, backbone은 추가 파라미터 없음)
+SPARSIFY_DEFAULTS = {
+    'top': {'sparsify_k': 2000},
+    'node_top': {'sparsify_k': 5},
+    'disparity': {'sparsify_alpha': 0.05},
+    'backbone': {},
+}
+
+# 두 follow-up 비교(graph_diff)에서 persisted/changed를 나누는 RR 절대 변화량 기본값
+DIFF_RR_TOLERANCE = 0.1
+
+# check_disease_connection이 연결성을 확인하는 조건
+CONNECTIVITY_PRESET = {
+    'follow_up': 2,
+    'rr_values_min': 1.2,
+    'rr_values_max': 1.3,
+    'chisq_p_values': 0.5,
+    'fisher_p_values': 0.5,
+}
+
+# RR 표시/추천값 단위 (connectivity.suggest_thresholds)
+RR_DECIMALS = 2
+
+# 캐시 키용 양자화 (유효숫자 자릿수와 대상 파라미터)
+KEY_SIGNIFICANT_DIGITS = 4
+QUANTIZED_NAMES = ('rr_values_min', 'rr_values_max', 'chisq_p_values', 'fisher_p_values',
+                   'rr_tolerance', 'sparsify_alpha')
+
+
+def format_number(value):
+    """
+    float 값을 정규화된 문자열로 표기합니다 (예: 0.050 → '0.05', 2.0 → '2').
+
+    Raises:
+        ValueError: inf/nan인 경우
+    """
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid numeric value: {value}")
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def quantize_params(params):
+    """
+    캐시 키를 만들기 위해 수치 파라미터를 유효숫자 KEY_SIGNIFICANT_DIGITS 자리로 반올림합니다.
+
+    키 생성(params_etag, metrics.metrics_key) 전용입니다. 엣지 선택에는 쓰지 않습니다.
+
+    Args:
+        params: 파라미터 딕셔너리 (QUANTIZED_NAMES 외의 값은 그대로)
+
+    Returns:
+        dict: 양자화된 파라미터
+    """
+    quantized = dict(params)
+    for name in QUANTIZED_NAMES:
+        if name in quantized:
+            quantized[name] = float(f"{float(quantized[name]):.{KEY_SIGNIFICANT_DIGITS}g}") + 0.0
+    return quantized
+
+
+def effective_thresholds(params):
+    """
+    캐시되는 응답에 담을, 실제로 엣지 선택에 적용한 임계값.
+
+    Args:
+        params: 파라미터 딕셔너리
+
+    Returns:
+        dict: {파라미터 이름: float} (QUANTIZED_NAMES 중 params에 있는 값)
+    """
+    return {name: float(params[name]) for name in QUANTIZED_NAMES if name in params}
+
+
+def parse_follow_up(value, name='follow-up period'):
+    """
+    follow-up 파라미터를 정수로 파싱합니다.
+
+    Args:
+        value: 쿼리 문자열 값
+        name: 오류 메시지에 쓸 파라미터 이름
+
+    Returns:
+        int: follow-up 기간
+
+    Raises:
+        ValueError: 숫자가 아니거나 서비스하는 follow-up(snapshot.follow_ups())이 아닌 경우
+    """
+    if value is None or not str(value).isdigit():
+        raise ValueError(f"Invalid {name}. Please provide a numeric value.")
+    value = int(value)
+    if value not in follow_ups():
+        raise ValueError(f"Invalid {name}. Available follow-up periods: {', '.join(map(str, follow_ups()))}.")
+    return value
+
+
+def parse_thresholds(query, defaults):
+    """
+    임계값 파라미터를 float로 파싱합니다.
+
+    Args:
+        query: request.GET (QueryDict 또는 dict)
+        defaults: {파라미터 이름: 기본값} (값이 없거나 빈 문자열이면 기본값)
+
+    Returns:
+        dict: {파라미터 이름: float}
+
+    Raises:
+        ValueError: 숫자가 아니거나 inf/nan인 경우
+    """
+    thresholds = {}
+    for name, default in defaults.items():
+        raw = query.get(name) or default
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name}: {raw}") from None
+        if not math.isfinite(value):
+            raise ValueError(f"Invalid {name}: {raw}")
+        thresholds[name] = value
+    return thresholds
+
+
+def parse_main_params(query):
+    """
+    메인 네트워크 요청 파라미터를 파싱합니다.
+
+    Args:
+        query: request.GET (QueryDict 또는 dict)
+
+    Returns:
+        dict: follow_up, rr_values_min, rr_values_max, chisq_p_values, fisher_p_values.
+        sparsify가 지정되면 sparsify와
+        방식별 파라미터(sparsify_k 또는 sparsify_alpha)도 포함
+
+    Raises:
+        ValueError: follow_up이 숫자가 아니거나 서비스하는 기간이 아닌 경우, 수치/희소화 파라미터가 잘못된 경우
+    """
+    params = {'follow_up': parse_follow_up(query.get('follow_up') or None)}
+    params.update(parse_thresholds(query, MAIN_DEFAULTS))
+
+    # 희소화를 지정하지 않은 요청은 기존과 같은 키(ETag, 캐시 키)를 유지
+    mode = query.get('sparsify')
+    if mode:
+        if mode not in SPARSIFY_DEFAULTS:
+            raise ValueError(f"Invalid sparsify mode: {mode}")
+        params['sparsify'] = mode
+        for name, default in SPARSIFY_DEFAULTS[mode].items():
+            params[name] = type(default)(query.get(name) or default)
+        if params.get('sparsify_k', 1) < 1 or not 0 < params.get('sparsify_alpha', 1) <= 1:
+            raise ValueError("Invalid sparsify parameter.")
+    return params
+
+
+def parse_disease_params(query, defaults=DISEASE_DEFAULTS):
+    """
+    단일/Sub 네트워크 요청의 follow-up과 임계값을 파싱합니다.
+
+    Args:
+        query: request.GET (QueryDict 또는 dict)
+        defaults: follow_up과 임계값 기본값 (DISEASE_DEFAULTS 또는 CONNECTIVITY_PRESET)
+
+    Returns:
+        dict: follow_up, rr_values_min, rr_values_max, chisq_p_values, fisher_p_values
+
+    Raises:
+        ValueError: follow_up이 숫자가 아니거나 서비스하는 기간이 아닌 경우, 임계값이 잘못된 경우
+    """
+    params = {'follow_up': parse_follow_up(query.get('follow_up') or defaults['follow_up'])}
+    params.update(parse_thresholds(query, {name: defaults[name] for name in MAIN_DEFAULTS}))
+    return params
+
+
+def parse_diff_params(query):
+    """
+    두 follow-up 비교(graph_diff) 요청 파라미터를 파싱합니다.
+
+    임계값은 메인 네트워크와 같으며 두 기간에 똑같이 적용합니다.
+
+    Args:
+        query: request.GET (QueryDict 또는 dict)
+
+    Returns:
+        dict: follow_up_from, follow_up_to, rr_values_min, rr_values_max, chisq_p_values,
+        fisher_p_values, rr_tolerance
+
+    Raises:
+        ValueError: follow-up 값이 숫자가 아니거나 수치 파라미터가 잘못된 경우
+    """
+    params = {}
+    for name in ('follow_up_from', 'follow_up_to'):
+        params[name] = parse_follow_up(query.get(name), name)
+    params.update(parse_thresholds(query, MAIN_DEFAULTS))
+    params.update(parse_thresholds(query, {'rr_tolerance': DIFF_RR_TOLERANCE}))
+    if params['rr_tolerance'] < 0:
+        raise ValueError("Invalid rr_tolerance.")
+    return params
+
+
+def canonical_query(params):
+    """
+    파라미터 딕셔너리를 키 순서와 숫자 표기가 고정된 쿼리 문자열로 만듭니다.
+
+    Args:
+        params: 파라미터 딕셔너리 (값은 숫자 또는 문자열)
+
+    Returns:
+        str: 정규화된 쿼리 문자열
+    """
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = format_number(value)
+        items.append((name, value))
+    return urlencode(items)
+
+
+def params_etag(kind, params):
+    """
+    데이터셋 버전과 정규화된 파라미터로 strong ETag 값을 만듭니다.
+
+    수치 파라미터는 quantize_params()로 양자화한 값으로 키를 만듭니다.
+
+    Args:
+        kind: 응답 종류 (예: 'main')
+        params: 파라미터 딕셔너리
+
+    Returns:
+        str: 따옴표 없는 ETag 값
+    """
+    key = f"{dataset_version()}|{kind}|{canonical_query(quantize_params(params))}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def params_token(kind, params):
+    """
+    델타 응답의 기준이 되는 "이전 파라미터" 토큰을 만듭니다.
+
+    토큰은 데이터셋 버전, 응답 종류, 정규화된 파라미터를 담은 URL-safe 문자열이며
+    서버에 상태를 저장하지 않습니다.
+
+    Args:
+        kind: 응답 종류 (예: 'single', 'sub')
+        params: 파라미터 딕셔너리
+
+    Returns:
+        str: 토큰
+    """
+    raw = f"{dataset_version()}|{kind}|{canonical_query(params)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def parse_params_token(token, kind):
+    """
+    params_token()으로 만든 토큰을 파라미터 딕셔너리로 되돌립니다.
+
+    Args:
+        token: 토큰 문자열
+        kind: 기대하는 응답 종류
+
+    Returns:
+        dict 또는 None: 파라미터 (값은 문자열). 형식이 잘못되었거나 데이터셋 버전/종류가
+        다르면 None
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        version, token_kind, query = raw.split('|', 2)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if version != dataset_version() or token_kind != kind:
+        return None
+    return dict(parse_qsl(query, keep_blank_values=True))
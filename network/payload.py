@@ -0,0 +1,390 @@
+"""
+Cytoscape.js용 노드/엣지 payload 생성기.
+
+그래프 뷰들이 공통으로 사용합니다. 엣지 컬럼 배열을 받아 노드 집합은 np.unique로,
+크기/라벨/색상은 배열 인덱싱으로 구하므로 행 단위 Python 루프(iterrows)가 없습니다.
+"""
+import json
+
+import numpy as np
+
+from .temporal import DIFF_STATUSES
+
+PASTEL_COLORS = {
+    'A': '#FFB3BA', 'B': '#FFDFBA', 'C': '#FFFFBA', 'D': '#BAFFBA',
+    'E': '#BAE1FF', 'F': '#D1BAFF', 'G': '#FFBAFF', 'H': '#FFBABA',
+    'I': '#FFEBBA', 'J': '#BAFFD8', 'K': '#D7FFBA', 'L': '#FFB6C1',
+    'M':'#E3FFE3', 'N': '#BAF3FF', 'O': '#FFD1BA', 'P': '#D9A9FF', 'Q':'#F0F8FF',
+    'R':'#FFCCCC','S':'#E2F3E2', 'T':'#D8E8FF', 'U':'#F8D0B3', 'V':'#B9C7FF',
+    'W':'#F5B7B1','X':'#E9F7D2','Y':'#D6F3FF','Z':'#FFE0E0'
+}
+DEFAULT_COLOR = '#666'
+DEFAULT_SIZE = 30
+SIZE_SCALE = 80
+
+# NDJSON 스트리밍 시 한 줄(청크)에 담는 엣지 수
+STREAM_CHUNK_SIZE = 2000
+
+# graph_page가 NDJSON 스트리밍으로 받는 최소 예상 엣지 수 (임계값 큐브 추정치 기준).
+# 이보다 작은 그래프는 그래프 캐시에 저장되는 JSON/바이너리 응답으로 받음
+STREAM_MIN_EDGES = 20000
+
+# 'A'~'Z' 첫 글자 → 색상 (그 외 문자는 DEFAULT_COLOR)
+_COLOR_TABLE = np.array(
+    [PASTEL_COLORS.get(chr(ord('A') + i), DEFAULT_COLOR) for i in range(26)] + [DEFAULT_COLOR],
+    dtype=object,
+)
+
+
+def pastel_colors_for(codes):
+    """
+    질병 코드 배열의 첫 글자로 파스텔 색상 배열을 구합니다.
+
+    Args:
+        codes: 질병 코드 문자열 배열
+
+    Returns:
+        np.ndarray: 색상 문자열 배열 (object dtype)
+    """
+    codes = np.asarray(codes, dtype=str)
+    if codes.size == 0:
+        return np.empty(0, dtype=object)
+    first = codes.astype('U1').view(np.uint32).astype(np.int64) - ord('A')
+    first[(first < 0) | (first >= 26)] = 26
+    return _COLOR_TABLE[first]
+
+
+class NodeTable:
+    """
+    node_base의 노드 표시 속성을 코드 순으로 정렬해 둔 배열 모음입니다.
+
+    Attributes:
+        codes: 정렬된 질병 코드 배열
+        width, height: 화면 표시용 크기 (node_base 값 × 80, 없으면 30)
+        labels: 표시 라벨 (Korean, 없으면 코드)
+        colors: 첫 글자 기준 파스텔 색상
+    """
+
+    def __init__(self, codes, width, height, labels):
+        order = np.argsort(codes, kind='stable')
+        self.codes = np.asarray(codes, dtype=str)[order]
+        self.width = np.asarray(width, dtype=np.float64)[order]
+        self.height = np.asarray(height, dtype=np.float64)[order]
+        self.labels = np.asarray(labels, dtype=object)[order]
+        self.colors = pastel_colors_for(self.codes)
+
+    @classmethod
+    def from_frame(cls, disease_df):
+        """
+        `SELECT node_code AS code, width, height, Korean FROM node_base` 결과로 생성합니다.
+
+        Args:
+            disease_df: code, width, height, Korean 컬럼을 가진 DataFrame
+
+        Returns:
+            NodeTable: 노드 속성 테이블
+        """
+        codes = disease_df['code'].astype(str).to_numpy()
+        width = (disease_df['width'] * SIZE_SCALE).round(2).fillna(DEFAULT_SIZE).to_numpy()
+        height = (disease_df['height'] * SIZE_SCALE).round(2).fillna(DEFAULT_SIZE).to_numpy()
+        korean = disease_df['Korean']
+        labels = korean.where(korean.notna(), disease_df['code']).to_numpy(dtype=object)
+        return cls(codes, width, height, labels)
+
+    def lookup(self, codes):
+        """
+        질병 코드 배열의 테이블 인덱스를 구합니다.
+
+        Args:
+            codes: 질병 코드 문자열 배열
+
+        Returns:
+            np.ndarray: 인덱스 배열 (테이블에 없는 코드는 -1)
+        """
+        codes = np.asarray(codes, dtype=str)
+        if len(self.codes) == 0:
+            return np.full(len(codes), -1, dtype=np.int64)
+        pos = np.searchsorted(self.codes, codes)
+        pos = np.minimum(pos, len(self.codes) - 1)
+        return np.where(self.codes[pos] == codes, pos, -1)
+
+
+def unique_nodes(cause, outcome):
+    """
+    엣지 양 끝의 노드를 처음 등장한 순서대로 중복 없이 반환합니다.
+
+    기존 뷰가 (cause, outcome) 순으로 노드를 추가하던 순서와 같습니다.
+
+    Args:
+        cause: 시작 노드 코드 배열
+        outcome: 도착 노드 코드 배열
+
+    Returns:
+        np.ndarray: 노드 코드 배열
+    """
+    endpoints = np.column_stack([np.asarray(cause, dtype=str),
+                                 np.asarray(outcome, dtype=str)]).ravel()
+    if endpoints.size == 0:
+        return np.empty(0, dtype=str)
+    uniq, first_index = np.unique(endpoints, return_index=True)
+    return uniq[np.argsort(first_index, kind='stable')]
+
+
+def node_elements(codes, table, pinned=None, positions=None):
+    """
+    노드 코드 배열로 Cytoscape 노드 요소와 노드 이름 목록을 만듭니다.
+
+    Args:
+        codes: 노드 코드 배열
+        table: NodeTable
+        pinned: {코드: {"x": .., "y": ..}} 고정 위치 (해당 노드는 locked)
+        positions: {코드: {"x": .., "y": ..}} 서버 레이아웃 좌표 (network/layout.py, locked 아님)
+
+    Returns:
+        tuple: (nodes, node_names)
+    """
+    codes = np.asarray(codes, dtype=str)
+    pos = table.lookup(codes)
+    known = pos >= 0
+    safe = np.where(known, pos, 0)
+
+    if len(table.codes):
+        width = np.where(known, table.width[safe], DEFAULT_SIZE)
+        height = np.where(known, table.height[safe], DEFAULT_SIZE)
+        labels = np.where(known, table.labels[safe], codes.astype(object))
+    else:
+        width = height = np.full(len(codes), DEFAULT_SIZE, dtype=np.float64)
+        labels = codes.astype(object)
+    colors = pastel_colors_for(codes)
+
+    pinned = pinned or {}
+    positions = positions or {}
+    nodes = []
+    node_names = []
+    for code, label, w, h, color in zip(codes.tolist(), labels.tolist(), width.tolist(),
+                                        height.tolist(), colors.tolist()):
+        node = {
+            "data": {"id": code, "label": label, "width": w, "height": h},
+            "style": {"background-color": color},
+        }
+        if code in pinned:
+            node["position"] = pinned[code]
+            node["locked"] = True
+        elif code in positions:
+            node["position"] = positions[code]
+        nodes.append(node)
+        node_names.append(f"{code} ({label})")
+    return nodes, node_names
+
+
+def edge_weights(rr_values, clip=None):
+    """
+    엣지 weight를 계산합니다.
+
+    Args:
+        rr_values: RR 값 배열
+        clip: (최소, 최대) 지정 시 소수 둘째 자리 반올림 후 범위로 자름
+
+    Returns:
+        np.ndarray: float64 weight 배열
+    """
+    weight = np.asarray(rr_values, dtype=np.float64)
+    if clip is not None:
+        return np.clip(np.round(weight, 2), *clip)
+    # float32 저장 정밀도 이상의 자릿수는 잡음이므로 소수 6자리로 정리
+    return np.round(weight, 6)
+
+
+def edge_elements(cause, outcome, weight):
+    """Cytoscape 엣지 요소 목록을 만듭니다."""
+    return [
+        {"data": {"source": s, "target": t, "weight": w}}
+        for s, t, w in zip(np.asarray(cause, dtype=str).tolist(),
+                           np.asarray(outcome, dtype=str).tolist(),
+                           np.asarray(weight, dtype=np.float64).tolist())
+    ]
+
+
+def build_elements(cause, outcome, rr_values, table, weight_clip=None, pinned=None, positions=None):
+    """
+    엣지 컬럼 배열로 Cytoscape payload 전체를 만듭니다.
+
+    Args:
+        cause: 시작 노드 코드 배열
+        outcome: 도착 노드 코드 배열
+        rr_values: RR 값 배열 (엣지 weight)
+        table: NodeTable
+        weight_clip: (최소, 최대) weight 범위 (graph_page는 (1, 10))
+        pinned: {코드: 위치} 고정 위치 노드
+        positions: {코드: 위치} 서버 레이아웃 좌표
+
+    Returns:
+        tuple: (nodes, edges, node_names)
+    """
+    nodes, node_names = node_elements(unique_nodes(cause, outcome), table, pinned=pinned,
+                                      positions=positions)
+    edges = edge_elements(cause, outcome, edge_weights(rr_values, clip=weight_clip))
+    return nodes, edges, node_names
+
+
+def delta_elements(cause, outcome, rr_values, rows, prev_rows, table, codes=None,
+                   weight_clip=None, pinned=None, positions=None):
+    """
+    이전 선택(prev_rows) 대비 추가/삭제된 노드와 엣지만 담은 델타 payload를 만듭니다.
+
+    두 선택 모두 같은 파티션의 정렬된 행 인덱스이므로 np.setdiff1d로 비교하며,
+    인접한 임계값끼리는 대부분 겹치기 때문에 델타가 전체 payload보다 훨씬 작습니다.
+    삭제된 엣지는 [source, target] 쌍으로 표시하므로 (cause, outcome) 쌍이 follow-up
+    안에서 유일하다고 가정합니다 (edge_stat의 행 단위).
+
+    Args:
+        cause, outcome: 파티션 전체의 노드 배열 (codes 지정 시 정수 인덱스 배열)
+        rr_values: 파티션 전체의 RR 값 배열
+        rows: 현재 선택의 행 인덱스 (오름차순)
+        prev_rows: 이전 선택의 행 인덱스 (오름차순)
+        table: NodeTable
+        codes: cause/outcome 인덱스가 가리키는 코드 사전
+        weight_clip: (최소, 최대) weight 범위
+        pinned: {코드: 위치} 고정 위치 노드
+        positions: {코드: 위치} 현재 선택의 서버 레이아웃 좌표. 지정하면 기존 노드도 옮길 수
+            있도록 응답에 "positions"로 전체 좌표를 포함
+
+    Returns:
+        dict: {"delta": True, "added": {"nodes", "edges"},
+               "removed": {"nodes": [코드], "edges": [[source, target]]}, "node_names"}
+               (+ "positions")
+    """
+    def endpoints(idx):
+        c, o = cause[idx], outcome[idx]
+        if codes is not None:
+            c, o = codes[c], codes[o]
+        return np.asarray(c, dtype=str), np.asarray(o, dtype=str)
+
+    added_rows = np.setdiff1d(rows, prev_rows, assume_unique=True)
+    removed_rows = np.setdiff1d(prev_rows, rows, assume_unique=True)
+
+    cur_cause, cur_outcome = endpoints(rows)
+    prev_cause, prev_outcome = endpoints(prev_rows)
+    cur_nodes = unique_nodes(cur_cause, cur_outcome)
+    prev_nodes = np.unique(np.concatenate([prev_cause, prev_outcome]))
+
+    nodes, node_names = node_elements(cur_nodes, table, pinned=pinned, positions=positions)
+    is_new = ~np.isin(cur_nodes, prev_nodes)
+    added_cause, added_outcome = endpoints(added_rows)
+    removed_cause, removed_outcome = endpoints(removed_rows)
+    delta = {
+        "delta": True,
+        "added": {
+            "nodes": [node for node, new in zip(nodes, is_new.tolist()) if new],
+            "edges": edge_elements(added_cause, added_outcome,
+                                   edge_weights(rr_values[added_rows], clip=weight_clip)),
+        },
+        "removed": {
+            "nodes": prev_nodes[~np.isin(prev_nodes, cur_nodes)].tolist(),
+            "edges": np.column_stack([removed_cause, removed_outcome]).tolist(),
+        },
+        "node_names": node_names,
+    }
+    if positions is not None:
+        delta["positions"] = positions
+    return delta
+
+
+def delta_is_smaller(rows, prev_rows):
+    """추가/삭제될 행 수가 현재 선택의 행 수보다 적으면 True (델타가 전체 payload보다 작음)."""
+    changed = len(rows) + len(prev_rows) - 2 * len(np.intersect1d(rows, prev_rows, assume_unique=True))
+    return changed < len(rows)
+
+
+def stream_elements(cause, outcome, rr_values, table, codes=None, weight_clip=None,
+                    pinned=None, positions=None, trailing_positions=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    엣지를 RR 내림차순으로 정렬해 NDJSON 청크로 내보내는 제너레이터입니다.
+
+    가장 강한 엣지와 그 노드가 먼저 나가므로 클라이언트는 첫 청크부터 골격을 그릴 수
+    있습니다. 각 줄은 {"nodes", "edges", "node_names"}이며 노드는 처음 등장하는
+    청크에만 포함됩니다. 마지막 줄은 {"done": true, "node_count", "edge_count"}입니다.
+    요소 딕셔너리는 청크 단위로만 만들어지므로 메모리 사용량은 결과 크기와 무관합니다.
+
+    trailing_positions를 주면 모든 엣지 청크를 보낸 뒤 호출해 좌표를 {"positions": {...}}
+    줄로 보내므로, 레이아웃 계산이 첫 청크를 늦추지 않습니다.
+
+    Args:
+        cause, outcome: 노드 코드 배열 (codes 지정 시 codes에 대한 정수 인덱스 배열)
+        rr_values: RR 값 배열
+        table: NodeTable
+        codes: cause/outcome 인덱스가 가리키는 코드 사전
+        weight_clip: (최소, 최대) weight 범위
+        pinned: {코드: 위치} 고정 위치 노드
+        positions: {코드: 위치} 서버 레이아웃 좌표 (노드마다 포함)
+        trailing_positions: () → {코드: 위치} 또는 None 함수 (엣지 청크 뒤 한 줄로 전송)
+        chunk_size: 청크당 엣지 수
+
+    Yields:
+        str: NDJSON 한 줄
+    """
+    rr_values = np.asarray(rr_values)
+    order = np.argsort(-rr_values.astype(np.float64), kind='stable')
+    seen = set()
+    for start in range(0, len(order), chunk_size):
+        part = order[start:start + chunk_size]
+        chunk_cause, chunk_outcome = cause[part], outcome[part]
+        if codes is not None:
+            chunk_cause, chunk_outcome = codes[chunk_cause], codes[chunk_outcome]
+
+        new_codes = [c for c in unique_nodes(chunk_cause, chunk_outcome).tolist() if c not in seen]
+        seen.update(new_codes)
+        nodes, node_names = node_elements(np.array(new_codes, dtype=str), table, pinned=pinned,
+                                          positions=positions)
+        edges = edge_elements(chunk_cause, chunk_outcome,
+                              edge_weights(rr_values[part], clip=weight_clip))
+        yield json.dumps({"nodes": nodes, "edges": edges, "node_names": node_names},
+                         ensure_ascii=False) + "\n"
+    if trailing_positions is not None:
+        found = trailing_positions()
+        if found is not None:
+            yield json.dumps({"positions": found}, ensure_ascii=False) + "\n"
+    yield json.dumps({"done": True, "node_count": len(seen), "edge_count": len(order)}) + "\n"
+
+
+def diff_elements(diff, table, weight_clip=None, positions=None):
+    """
+    두 follow-up 비교 결과(temporal.EdgeDiff)로 Cytoscape payload를 만듭니다.
+
+    엣지와 노드에 상태(appeared, disappeared, persisted, changed)를 Cytoscape classes로
+    붙이므로 클라이언트는 스타일시트 선택자(.appeared 등)로 구분해 그릴 수 있습니다.
+    노드는 두 기간 그래프 모두에 있으면 persisted, 한쪽에만 있으면 appeared/disappeared입니다.
+
+    Args:
+        diff: temporal.EdgeDiff
+        table: NodeTable
+        weight_clip: (최소, 최대) weight 범위
+        positions: {코드: 위치} 서버 레이아웃 좌표
+
+    Returns:
+        tuple: (nodes, edges, node_names)
+    """
+    cause = diff.codes[diff.cause]
+    outcome = diff.codes[diff.outcome]
+    codes = unique_nodes(cause, outcome)
+
+    # 노드가 각 기간의 그래프에 있었는지 (그 기간에 RR이 있는 엣지의 끝점)
+    has_from, has_to = np.isfinite(diff.rr_from), np.isfinite(diff.rr_to)
+    in_from = np.isin(codes, np.concatenate([cause[has_from], outcome[has_from]]))
+    in_to = np.isin(codes, np.concatenate([cause[has_to], outcome[has_to]]))
+    node_status = np.where(in_from & in_to, 'persisted', np.where(in_to, 'appeared', 'disappeared'))
+
+    nodes, node_names = node_elements(codes, table, positions=positions)
+    for node, status in zip(nodes, node_status.tolist()):
+        node["classes"] = status
+
+    weight = edge_weights(np.where(has_to, diff.rr_to, diff.rr_from), clip=weight_clip)
+    edges = edge_elements(cause, outcome, weight)
+    statuses = np.array(DIFF_STATUSES)[diff.status].tolist()
+    # 해당 기간에 없는 엣지의 RR은 null
+    rr_from = np.where(has_from, edge_weights(diff.rr_from), None).tolist()
+    rr_to = np.where(has_to, edge_weights(diff.rr_to), None).tolist()
+    for edge, status, before, after in zip(edges, statuses, rr_from, rr_to):
+        edge["data"].update({"rr_from": before, "rr_to": after, "status": status})
+        edge["classes"] = status
+    return nodes, edges, node_names
@@ -0,0 +1,508 @@
+"""
+PubMed(NCBI E-utilities) 검색 클라이언트.
+
+search_pubmed가 클릭마다 ESearch/ESummary를 직접 호출하지 않도록 다음을 한곳에 모읍니다.
+
+- 프로세스 단위 requests.Session (커넥션 풀, 타임아웃)
+- 검색어별 결과의 디스크 캐시 (SQLite, TTL + 최근 사용 기준 LRU, 워커 프로세스 간 공유)
+- 같은 검색어의 동시 요청 합치기 (한 요청만 NCBI를 호출하고 나머지는 그 결과를 기다림)
+- NCBI 호출 속도 제한 (토큰 버킷, API 키가 없으면 초당 3회)
+- 오프라인 테스트용 가짜 백엔드 (settings.PUBMED['BACKEND'] = 'fake', 지연 시간 지정 가능)
+
+`python manage.py prefetch_pubmed`로 모든 노드와 follow-up 별 상위 엣지의 결과를
+PubmedResult 테이블에 미리 저장해 두면 search_pubmed는 그 테이블을 먼저 조회합니다.
+
+설정은 settings.PUBMED로 하며 생략한 항목은 DEFAULT_PUBMED 값을 씁니다.
+"""
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+DEFAULT_PUBMED = {
+    'BACKEND': 'ncbi',
+    'BASE_URL': 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils',
+    'API_KEY': None,
+    'TOOL': 'cotdex',
+    'EMAIL': None,
+    'RETMAX': 5,
+    'TIMEOUT': (3.05, 10),
+    'POOL_SIZE': 10,
+    'RATE': None,         # 초당 호출 수 (None이면 API 키 유무에 따라 10 또는 3)
+    'BURST': None,        # 순간 허용 호출 수 (None이면 RATE와 같음)
+    'CACHE_DIR': None,    # None이면 MEDIA_ROOT/pubmed_cache
+    'CACHE_TTL': 7 * 24 * 3600,
+    'CACHE_MAX_ENTRIES': 20000,
+    'FAKE_LATENCY': 0.0,  # 가짜 백엔드의 호출당 지연 시간(초)
+}
+
+
+def pubmed_options():
+    """settings.PUBMED를 기본값과 합친 설정."""
+    return {**DEFAULT_PUBMED, **getattr(settings, 'PUBMED', {})}
+
+
+class PubmedError(Exception):
+    """NCBI 호출이 실패했을 때 발생합니다 (메시지는 사용자에게 그대로 표시)."""
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷입니다.
+
+    Attributes:
+        rate: 초당 토큰 수
+        burst: 최대 토큰 수
+        waited: 토큰을 기다린 누적 시간(초)
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self, timeout=None):
+        """
+        토큰 하나를 가져갑니다. 없으면 채워질 때까지 기다립니다.
+
+        Args:
+            timeout: 최대 대기 시간(초, 생략 시 무제한)
+
+        Returns:
+            bool: 토큰을 얻었으면 True, 시간 초과면 False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+            with self._lock:
+                self.waited += wait
+
+
+class ResultCache:
+    """
+    검색 결과의 디스크 캐시입니다 (SQLite 파일 하나, 여러 프로세스가 공유).
+
+    TTL이 지난 항목은 없는 것으로 보고, 항목 수가 max_entries를 넘으면 가장 오래
+    사용하지 않은 항목부터 지웁니다. 정리는 PRUNE_INTERVAL번 저장할 때마다 한 번 하므로
+    항목 수는 잠시 max_entries를 조금 넘을 수 있습니다.
+    """
+
+    # 저장 몇 번마다 항목 수를 정리할지
+    PRUNE_INTERVAL = 100
+
+    def __init__(self, directory, ttl, max_entries):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'pubmed.sqlite3')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._inserts = itertools.count(1)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _connect(self):
+        # SQLite 연결은 스레드 간에 공유하지 않음
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """
+        캐시된 값을 반환합니다.
+
+        Args:
+            key: 캐시 키
+
+        Returns:
+            object 또는 None: JSON으로 저장된 값 (없거나 만료되면 None)
+        """
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if now - created > self.ttl:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value):
+        """값을 저장하고, PRUNE_INTERVAL번째 저장마다 prune()으로 항목 수를 정리합니다."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                     (key, json.dumps(value, ensure_ascii=False), now, now))
+        if next(self._inserts) % self.PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def prune(self):
+        """최근 사용한 max_entries개만 남기고 나머지 항목을 지웁니다."""
+        self._connect().execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def __len__(self):
+        (count,) = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()
+        return count
+
+    def clear(self):
+        self._connect().execute("DELETE FROM results")
+
+
+def format_papers(pmids, summaries):
+    """
+    ESearch PMID 목록과 ESummary 결과로 응답 목록을 만듭니다.
+
+    Args:
+        pmids: PMID 목록 (검색 순위 순)
+        summaries: {PMID: ESummary 항목}
+
+    Returns:
+        list: [{"title", "url"}] (요약이 없는 PMID는 제외)
+    """
+    results = []
+    for pmid in pmids:
+        paper = summaries.get(pmid)
+        if paper:
+            results.append({
+                "title": paper.get("title", "제목 없음"),
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            })
+    return results
+
+
+class NcbiBackend:
+    """NCBI E-utilities ESearch + ESummary 백엔드입니다."""
+
+    def __init__(self, options, bucket):
+        self.options = options
+        self.bucket = bucket
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=options['POOL_SIZE'])
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint, params, error):
+        params = {**params, 'tool': self.options['TOOL']}
+        if self.options['API_KEY']:
+            params['api_key'] = self.options['API_KEY']
+        if self.options['EMAIL']:
+            params['email'] = self.options['EMAIL']
+        self.bucket.acquire()
+        # search_many의 여러 스레드가 동시에 호출함
+        with self._lock:
+            self.calls += 1
+        try:
+            response = self.session.get(f"{self.options['BASE_URL']}/{endpoint}", params=params,
+                                        timeout=self.options['TIMEOUT'])
+        except requests.RequestException as e:
+            raise PubmedError(f"{error}: {e}") from e
+        if response.status_code != 200:
+            raise PubmedError(error)
+        return response.json()
+
+    def esearch(self, term, retmax):
+        """검색어의 PMID 목록 (ESearch)."""
+        found = self._get("esearch.fcgi", {"db": "pubmed", "term": term, "retmode": "json",
+                                           "retmax": retmax}, "PubMed 검색 실패")
+        return found.get("esearchresult", {}).get("idlist", [])
+
+    def esummary(self, pmids):
+        """PMID들의 요약 정보 (ESummary, 여러 검색어의 PMID를 한 번에 조회 가능)."""
+        return self._get("esummary.fcgi", {"db": "pubmed", "id": ",".join(pmids),
+                                           "retmode": "json"}, "PubMed 요약 정보 실패").get("result", {})
+
+    def search(self, term, retmax):
+        """
+        검색어로 논문 목록을 조회합니다.
+
+        Args:
+            term: PubMed 검색어
+            retmax: 최대 결과 수
+
+        Returns:
+            list: [{"title", "url"}]
+
+        Raises:
+            PubmedError: NCBI 호출 실패
+        """
+        pmids = self.esearch(term, retmax)
+        if not pmids:
+            return []
+        return format_papers(pmids, self.esummary(pmids))
+
+
+class FakeBackend:
+    """
+    네트워크 없이 검색어에서 결정적으로 만든 결과를 돌려주는 백엔드입니다.
+
+    Attributes:
+        latency: 호출당 지연 시간(초, NCBI 왕복 시간 흉내)
+        calls: 누적 호출 수 (ESearch/ESummary 각각 1회)
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._titles = {}
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def esearch(self, term, retmax):
+        self._call()
+        digest = hashlib.sha256(term.encode()).hexdigest()
+        pmids = [str(int(digest[8 + i:16 + i], 16) % 40_000_000)
+                 for i in range(int(digest[:2], 16) % (retmax + 1))]
+        with self._lock:
+            for i, pmid in enumerate(pmids):
+                self._titles.setdefault(pmid, f"{term} ({i + 1})")
+        return pmids
+
+    def esummary(self, pmids):
+        self._call()
+        with self._lock:
+            return {pmid: {"title": self._titles.get(pmid, f"PMID {pmid}")} for pmid in pmids}
+
+    def search(self, term, retmax):
+        pmids = self.esearch(term, retmax)
+        if not pmids:
+            return []
+        return format_papers(pmids, self.esummary(pmids))
+
+
+class PubmedClient:
+    """
+    캐시와 요청 합치기를 거쳐 백엔드를 호출하는 PubMed 클라이언트입니다.
+
+    Attributes:
+        backend: NcbiBackend 또는 FakeBackend
+        cache: ResultCache (None이면 캐시 사용 안 함)
+        retmax: 검색어당 최대 결과 수
+        hits, misses, coalesced: 누적 통계
+    """
+
+    def __init__(self, backend, cache=None, retmax=DEFAULT_PUBMED['RETMAX']):
+        self.backend = backend
+        self.cache = cache
+        self.retmax = retmax
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def key(self, term):
+        return f"{self.retmax}|{term}"
+
+    def search(self, term):
+        """
+        검색어의 논문 목록을 반환합니다.
+
+        캐시에 있으면 바로 반환하고, 같은 검색어를 이미 다른 스레드가 조회 중이면
+        그 결과를 기다립니다.
+
+        Args:
+            term: PubMed 검색어
+
+        Returns:
+            list: [{"title", "url"}]
+
+        Raises:
+            PubmedError: NCBI 호출 실패
+        """
+        key = self.key(term)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return cached
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = self.backend.search(term, self.retmax)
+            if self.cache is not None:
+                self.cache.set(key, call['result'])
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call['done'].set()
+
+    def search_many(self, terms, workers=4):
+        """
+        여러 검색어를 동시에 조회합니다 (속도 제한은 백엔드의 토큰 버킷이 지킴).
+
+        Args:
+            terms: 검색어 목록
+            workers: 동시 조회 스레드 수
+
+        Returns:
+            dict: {검색어: 결과 목록 또는 PubmedError}
+        """
+        def run(term):
+            try:
+                return self.search(term)
+            except PubmedError as e:
+                return e
+
+        unique = list(dict.fromkeys(terms))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(unique, pool.map(run, unique)))
+
+    def stats(self):
+        """캐시 히트/미스, 합쳐진 요청 수, 백엔드 호출 수."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'backend': type(self.backend).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'backend_calls': self.backend.calls,
+                'cached_entries': len(self.cache) if self.cache is not None else 0,
+            }
+
+
+def create_client(options=None):
+    """
+    설정으로 PubmedClient를 만듭니다.
+
+    Args:
+        options: pubmed_options() 결과 (생략 시 현재 설정)
+
+    Returns:
+        PubmedClient: 클라이언트
+    """
+    options = options or pubmed_options()
+    cache_dir = options['CACHE_DIR'] or os.path.join(settings.MEDIA_ROOT, 'pubmed_cache')
+    cache = ResultCache(cache_dir, options['CACHE_TTL'], options['CACHE_MAX_ENTRIES'])
+    if options['BACKEND'] == 'fake':
+        backend = FakeBackend(latency=options['FAKE_LATENCY'])
+    elif options['BACKEND'] == 'ncbi':
+        rate = options['RATE'] or (10 if options['API_KEY'] else 3)
+        backend = NcbiBackend(options, TokenBucket(rate, options['BURST']))
+    else:
+        raise ValueError(f"지원되지 않는 PubMed 백엔드: {options['BACKEND']}")
+    return PubmedClient(backend, cache=cache, retmax=options['RETMAX'])
+
+
+def node_term(nodes_registry, code):
+    """노드(질병 코드)의 검색어 (영문명). 영문명이 없으면 None."""
+    node_id = nodes_registry.id(code)
+    return None if node_id is None else nodes_registry.english[node_id]
+
+
+def edge_term(nodes_registry, source, target):
+    """엣지의 검색어 ("source 영문명 AND target 영문명"). 영문명이 없으면 None."""
+    source_term = node_term(nodes_registry, source)
+    target_term = node_term(nodes_registry, target)
+    if source_term is None or target_term is None:
+        return None
+    return f"{source_term} AND {target_term}"
+
+
+def stored_results(term, retmax=None):
+    """
+    prefetch_pubmed가 PubmedResult 테이블에 저장해 둔 결과를 반환합니다.
+
+    Args:
+        term: PubMed 검색어
+        retmax: 최대 결과 수 (생략 시 설정값). 저장 당시 retmax가 더 작으면 사용하지 않음
+
+    Returns:
+        list 또는 None: [{"title", "url"}] (저장된 결과가 없으면 None)
+    """
+    from .models import PubmedResult
+
+    retmax = retmax or pubmed_options()['RETMAX']
+    stored = PubmedResult.objects.filter(term=term, retmax__gte=retmax).only('results').first()
+    return None if stored is None else stored.results[:retmax]
+
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """
+    프로세스 단위 PubmedClient를 반환합니다.
+
+    fork된 워커 프로세스에서는 부모의 HTTP 세션을 쓰지 않고 새로 만듭니다.
+
+    Returns:
+        PubmedClient: settings.PUBMED 설정의 클라이언트
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = create_client()
+            _client_pid = pid
+        return _client
+
+
+def clear():
+    """프로세스 클라이언트를 버립니다. 다음 요청 시 설정으로 다시 만듭니다."""
+    global _client
+    with _lock:
+        _client = None
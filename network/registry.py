@@ -0,0 +1,121 @@
+"""
+node_base / node_shapes의 프로세스 단위 메모리 레지스트리.
+
+node_base는 1,187행의 정적 테이블이므로 프로세스당 한 번만 읽고,
+질병 코드마다 정수 id(정렬된 코드 배열의 인덱스)를 부여해 한글명/영문명/크기/색상을
+배열 인덱싱으로 조회합니다. 데이터셋 버전(settings.COTDEX_DATASET_VERSION)이
+바뀌면 다시 적재합니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .db import get_db_connection
+from .payload import NodeTable
+from .snapshot import dataset_version
+
+
+class NodeRegistry(NodeTable):
+    """
+    node_base 전체를 담은 NodeTable입니다.
+
+    Attributes:
+        codes: 정렬된 질병 코드 배열 (인덱스가 곧 노드 id)
+        korean, english: 한글/영문 질병명 (없으면 None)
+        raw_width, raw_height: node_base의 원래 width/height 값
+        width, height, labels, colors: 화면 표시용 속성 (NodeTable)
+        shapes: node_shapes 테이블 (없으면 None)
+        version: 적재 시점의 데이터셋 버전
+    """
+
+    def __init__(self, disease_df, shapes=None, version=None):
+        table = NodeTable.from_frame(disease_df)
+        super().__init__(table.codes, table.width, table.height, table.labels)
+
+        by_code = disease_df.set_index(disease_df['code'].astype(str)).reindex(self.codes)
+        self.korean = by_code['Korean'].astype(object).where(by_code['Korean'].notna(), None).to_numpy()
+        self.english = by_code['English'].astype(object).where(by_code['English'].notna(), None).to_numpy()
+        self.raw_width = by_code['width'].to_numpy(dtype=np.float64)
+        self.raw_height = by_code['height'].to_numpy(dtype=np.float64)
+        self.shapes = shapes
+        self.version = version
+        self._ids = {code: i for i, code in enumerate(self.codes.tolist())}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._ids
+
+    def id(self, code):
+        """질병 코드의 노드 id를 반환합니다. 없으면 None."""
+        return self._ids.get(code)
+
+    def ids(self, codes):
+        """질병 코드 배열의 노드 id 배열을 반환합니다 (없는 코드는 -1)."""
+        return self.lookup(codes)
+
+    def records(self, code_key='code'):
+        """
+        템플릿에 넘길 질병 목록을 만듭니다.
+
+        Args:
+            code_key: 코드 필드 이름 ('code' 또는 'node_code')
+
+        Returns:
+            list: {code_key, Korean, width, height} 딕셔너리 목록
+        """
+        return [
+            {code_key: code, 'Korean': korean, 'width': width, 'height': height}
+            for code, korean, width, height in zip(
+                self.codes.tolist(), self.korean.tolist(),
+                self.raw_width.tolist(), self.raw_height.tolist())
+        ]
+
+
+def load_registry():
+    """
+    MariaDB에서 node_base와 node_shapes를 읽어 NodeRegistry를 만듭니다.
+
+    Returns:
+        NodeRegistry: 새로 적재한 레지스트리
+    """
+    engine = get_db_connection()
+    disease_df = pd.read_sql_query(
+        "SELECT node_code AS code, width, height, Korean, English FROM node_base", engine)
+    try:
+        shapes = pd.read_sql_query("SELECT * FROM node_shapes", engine)
+    except Exception:
+        # node_shapes는 scripts/init_db.py로 선택적으로 적재되는 테이블
+        shapes = None
+    return NodeRegistry(disease_df, shapes=shapes, version=dataset_version())
+
+
+_registry = None
+_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    프로세스 단위 NodeRegistry를 반환합니다. 데이터셋 버전이 바뀌었으면 다시 적재합니다.
+
+    Returns:
+        NodeRegistry: node_base 레지스트리
+    """
+    global _registry
+    version = dataset_version()
+    registry = _registry
+    if registry is not None and registry.version == version:
+        return registry
+    with _lock:
+        if _registry is None or _registry.version != version:
+            _registry = load_registry()
+        return _registry
+
+
+def clear():
+    """적재된 레지스트리를 버립니다. 다음 요청 시 다시 적재됩니다."""
+    global _registry
+    with _lock:
+        _registry = None
@@ -0,0 +1,453 @@
+"""
+edge_stat 테이블의 follow-up 별 읽기 전용 스냅샷.
+
+edge_stat은 적재 이후 변하지 않으므로, 각 follow-up 파티션을 프로세스당 한 번만
+읽어 NumPy 컬럼 배열로 보관합니다. 질병 코드는 사전(dictionary) 인코딩하고,
+수치 컬럼은 float32로 저장하며, 행은 rr_values 기준으로 정렬해 두어
+RR 범위 필터를 이진 탐색 + 벡터 마스크로 처리합니다.
+
+여러 워커 프로세스가 같은 데이터를 각자 복사하지 않도록, 파티션을 버전이 붙은
+바이너리 파일로 저장해 두고 읽기 전용 메모리 맵으로 열 수 있습니다
+(`python manage.py build_edge_snapshot`). 파일이 없거나 데이터셋 버전이 맞지 않으면
+DB에서 직접 적재합니다.
+"""
+import json
+import logging
+import mmap
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+EDGE_COLUMNS = [
+    'cause_abb', 'outcome_abb', 'rr_values', 'log_rr_values',
+    'adjusted_chisq_p_values', 'adjusted_fisher_p_values',
+]
+
+# 한 번에 읽어들일 행 수 (파티션 적재 시 메모리 사용량 제한)
+LOAD_CHUNKSIZE = 500_000
+
+# 스냅샷 파일 형식
+FILE_MAGIC = b'CTDXEDGE'
+FORMAT_VERSION = 1
+ARRAY_ALIGNMENT = 64
+ARRAY_FIELDS = ['cause', 'outcome', 'rr', 'log_rr', 'chisq', 'fisher']
+
+
+# 서비스하는 follow-up 기간 (그 외 값은 파티션을 적재/캐시하지 않음)
+DEFAULT_FOLLOW_UPS = tuple(range(1, 11))
+
+
+class StaleSnapshotError(Exception):
+    """스냅샷 파일의 형식 또는 데이터셋 버전이 현재 설정과 맞지 않을 때 발생합니다."""
+
+
+def dataset_version():
+    """현재 설정된 데이터셋 버전 문자열 (settings.COTDEX_DATASET_VERSION)."""
+    return str(getattr(settings, 'COTDEX_DATASET_VERSION', '1'))
+
+
+def follow_ups():
+    """서비스하는 follow-up 기간 목록 (settings.COTDEX_FOLLOW_UPS, 기본값: 1~10)."""
+    return tuple(getattr(settings, 'COTDEX_FOLLOW_UPS', DEFAULT_FOLLOW_UPS))
+
+
+def snapshot_dir():
+    """스냅샷 파일이 저장되는 디렉토리 (settings.EDGE_SNAPSHOT_DIR)."""
+    return str(getattr(settings, 'EDGE_SNAPSHOT_DIR',
+                       os.path.join(settings.MEDIA_ROOT, 'snapshot')))
+
+
+def snapshot_path(follow_up, directory=None):
+    """Follow-up 파티션의 스냅샷 파일 경로."""
+    return os.path.join(directory or snapshot_dir(), f"edge_stat_fu{follow_up}.bin")
+
+
+class EdgePartition:
+    """
+    하나의 follow-up 기간에 해당하는 edge_stat 컬럼 배열입니다.
+
+    Attributes:
+        follow_up: Follow-up 기간
+        codes: 정렬된 질병 코드 사전 (cause/outcome 인덱스가 가리키는 값)
+        cause, outcome: codes에 대한 정수 인덱스 배열
+        rr, log_rr, chisq, fisher: float32 통계값 배열 (rr 오름차순 정렬)
+    """
+
+    def __init__(self, follow_up, codes, cause, outcome, rr, log_rr, chisq, fisher,
+                 log_rr_sorted=None):
+        self.follow_up = follow_up
+        self.codes = codes
+        self.cause = cause
+        self.outcome = outcome
+        self.rr = rr
+        self.log_rr = log_rr
+        self.chisq = chisq
+        self.fisher = fisher
+        self._code_index = {code: i for i, code in enumerate(codes.tolist())}
+        # log_rr이 rr 정렬 순서에서 단조 증가하면 log_rr 범위도 이진 탐색으로 처리
+        # (NaN이 섞여 있으면 비교가 False가 되어 전체 마스크로 대체됨)
+        if log_rr_sorted is None:
+            log_rr_sorted = bool(np.all(log_rr[1:] >= log_rr[:-1]))
+        self.log_rr_sorted = log_rr_sorted
+        # 메모리 맵으로 열린 경우 원본 파일 경로
+        self.mapped_path = None
+
+    @classmethod
+    def from_frame(cls, follow_up, df):
+        """
+        EDGE_COLUMNS를 가진 DataFrame으로 파티션을 생성합니다.
+
+        Args:
+            follow_up: Follow-up 기간
+            df: edge_stat 행을 담은 DataFrame
+
+        Returns:
+            EdgePartition: 생성된 파티션
+        """
+        builder = PartitionBuilder(follow_up)
+        builder.add(df)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.rr)
+
+    @property
+    def nbytes(self):
+        arrays = (self.cause, self.outcome, self.rr, self.log_rr, self.chisq, self.fisher)
+        return sum(a.nbytes for a in arrays)
+
+    def code_id(self, code):
+        """질병 코드의 사전 인덱스를 반환합니다. 없으면 None."""
+        return self._code_index.get(code)
+
+    def select(self, rr_min, rr_max, chisq_max, fisher_max, rr_column='rr_values', code=None):
+        """
+        조건을 만족하는 행 인덱스를 반환합니다.
+
+        SQL의 `BETWEEN`/`<=`와 같이 경계값을 포함하며, 비교는 저장 정밀도(float32)로
+        수행합니다.
+
+        Args:
+            rr_min: RR 최소값
+            rr_max: RR 최대값
+            chisq_max: adjusted chi-square p-value 임계값
+            fisher_max: adjusted Fisher p-value 임계값
+            rr_column: 범위를 적용할 컬럼 ('rr_values' 또는 'log_rr_values')
+            code: 지정 시 cause 또는 outcome이 해당 질병인 행만 선택
+
+        Returns:
+            np.ndarray: rr 오름차순의 행 인덱스 배열
+        """
+        lo_val, hi_val = np.float32(rr_min), np.float32(rr_max)
+
+        if rr_column == 'rr_values':
+            lo = np.searchsorted(self.rr, lo_val, side='left')
+            hi = np.searchsorted(self.rr, hi_val, side='right')
+            mask = np.ones(hi - lo, dtype=bool)
+        elif rr_column == 'log_rr_values':
+            if self.log_rr_sorted:
+                lo = np.searchsorted(self.log_rr, lo_val, side='left')
+                hi = np.searchsorted(self.log_rr, hi_val, side='right')
+                mask = np.ones(hi - lo, dtype=bool)
+            else:
+                lo, hi = 0, len(self)
+                window = self.log_rr
+                mask = (window >= lo_val) & (window <= hi_val)
+        else:
+            raise ValueError(f"지원되지 않는 컬럼: {rr_column}")
+
+        mask &= self.chisq[lo:hi] <= np.float32(chisq_max)
+        mask &= self.fisher[lo:hi] <= np.float32(fisher_max)
+
+        if code is not None:
+            code_id = self.code_id(code)
+            if code_id is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= (self.cause[lo:hi] == code_id) | (self.outcome[lo:hi] == code_id)
+
+        return np.flatnonzero(mask) + lo
+
+    def frame(self, idx):
+        """
+        행 인덱스에 해당하는 데이터를 edge_stat과 같은 컬럼의 DataFrame으로 반환합니다.
+
+        Args:
+            idx: select()가 반환한 행 인덱스
+
+        Returns:
+            pd.DataFrame: EDGE_COLUMNS 컬럼을 가진 DataFrame
+        """
+        return pd.DataFrame({
+            'cause_abb': self.codes[self.cause[idx]],
+            'outcome_abb': self.codes[self.outcome[idx]],
+            'rr_values': self.rr[idx].astype(np.float64),
+            'log_rr_values': self.log_rr[idx].astype(np.float64),
+            'adjusted_chisq_p_values': self.chisq[idx].astype(np.float64),
+            'adjusted_fisher_p_values': self.fisher[idx].astype(np.float64),
+        })
+
+
+class PartitionBuilder:
+    """
+    청크 단위로 들어오는 edge_stat 행을 모아 EdgePartition을 만듭니다.
+
+    청크마다 질병 코드를 정수로 인코딩하므로, 파티션 전체를 문자열 객체로
+    메모리에 올리지 않습니다.
+    """
+
+    def __init__(self, follow_up):
+        self.follow_up = follow_up
+        self._vocab = {}
+        self._chunks = []
+
+    def _encode(self, values):
+        uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        ids = np.array([self._vocab.setdefault(c, len(self._vocab)) for c in uniq.tolist()],
+                       dtype=np.int32)
+        return ids[inverse]
+
+    def add(self, df):
+        if df.empty:
+            return
+        self._chunks.append((
+            self._encode(df['cause_abb']),
+            self._encode(df['outcome_abb']),
+            df['rr_values'].to_numpy(dtype=np.float32),
+            df['log_rr_values'].to_numpy(dtype=np.float32),
+            df['adjusted_chisq_p_values'].to_numpy(dtype=np.float32),
+            df['adjusted_fisher_p_values'].to_numpy(dtype=np.float32),
+        ))
+
+    def build(self):
+        if self._chunks:
+            cause, outcome, rr, log_rr, chisq, fisher = (
+                np.concatenate(parts) for parts in zip(*self._chunks)
+            )
+        else:
+            cause = outcome = np.empty(0, dtype=np.int32)
+            rr = log_rr = chisq = fisher = np.empty(0, dtype=np.float32)
+        self._chunks = []
+
+        # 코드 사전을 정렬된 순서로 재배치
+        codes = np.array(sorted(self._vocab), dtype=str)
+        remap = np.empty(len(self._vocab), dtype=np.int32)
+        for code, old_id in self._vocab.items():
+            remap[old_id] = np.searchsorted(codes, code)
+        index_dtype = np.uint16 if len(codes) <= np.iinfo(np.uint16).max else np.int32
+
+        # rr이 같은 행은 log_rr 순으로 두어 log_rr도 단조 증가하도록 정렬
+        order = np.lexsort((log_rr, rr))
+        return EdgePartition(
+            self.follow_up,
+            codes,
+            remap[cause[order]].astype(index_dtype),
+            remap[outcome[order]].astype(index_dtype),
+            rr[order],
+            log_rr[order],
+            chisq[order],
+            fisher[order],
+        )
+
+
+def load_partition_from_db(follow_up, engine=None):
+    """
+    MariaDB의 edge_stat에서 한 follow-up 파티션을 읽어 EdgePartition을 만듭니다.
+
+    Args:
+        follow_up: Follow-up 기간
+        engine: SQLAlchemy 엔진 (생략 시 get_db_connection())
+
+    Returns:
+        EdgePartition: 적재된 파티션
+    """
+    engine = engine or get_db_connection()
+    query = f"""
+    SELECT {', '.join(EDGE_COLUMNS)} FROM edge_stat
+    WHERE fu = %(follow_up)s
+    """
+    builder = PartitionBuilder(follow_up)
+    for chunk in pd.read_sql_query(query, engine, params={'follow_up': follow_up},
+                                   chunksize=LOAD_CHUNKSIZE):
+        builder.add(chunk)
+    return builder.build()
+
+
+def load_partition_from_csv(follow_up, path=None):
+    """
+    `media/final_result_{fu}.csv` 내보내기 파일로 EdgePartition을 만듭니다.
+
+    Args:
+        follow_up: Follow-up 기간
+        path: CSV 경로 (생략 시 MEDIA_ROOT/final_result_{fu}.csv)
+
+    Returns:
+        EdgePartition: 적재된 파티션
+    """
+    path = path or os.path.join(settings.MEDIA_ROOT, f"final_result_{follow_up}.csv")
+    builder = PartitionBuilder(follow_up)
+    for chunk in pd.read_csv(path, usecols=EDGE_COLUMNS, chunksize=LOAD_CHUNKSIZE):
+        builder.add(chunk)
+    return builder.build()
+
+
+def _aligned(offset):
+    return (offset + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def write_partition(partition, path, version=None):
+    """
+    파티션을 메모리 맵으로 열 수 있는 바이너리 파일로 저장합니다.
+
+    파일 구조: magic(8) | format version(uint32) | header 길이(uint32) | JSON header |
+    64바이트 정렬된 배열들. 임시 파일에 쓴 뒤 교체하므로, 이미 파일을 열고 있는
+    워커가 반쯤 쓰인 파일을 보는 일은 없습니다.
+
+    Args:
+        partition: 저장할 EdgePartition
+        path: 저장 경로
+        version: 데이터셋 버전 (생략 시 dataset_version())
+    """
+    arrays = {name: np.ascontiguousarray(getattr(partition, name)) for name in ARRAY_FIELDS}
+    header = {
+        'dataset_version': version or dataset_version(),
+        'follow_up': partition.follow_up,
+        'rows': len(partition),
+        'codes': partition.codes.tolist(),
+        'log_rr_sorted': partition.log_rr_sorted,
+        'arrays': {},
+    }
+    # 헤더 크기가 오프셋에 영향을 주므로, 오프셋 자리를 넉넉히 잡은 뒤 계산
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'offset': 0, 'length': len(array)}
+    prefix_len = len(FILE_MAGIC) + 8 + len(json.dumps(header).encode()) + 32 * len(arrays)
+    offset = _aligned(prefix_len)
+    for name, array in arrays.items():
+        header['arrays'][name]['offset'] = offset
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * (prefix_len - len(FILE_MAGIC) - 8 - len(header_bytes))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(FILE_MAGIC)
+        f.write(np.array([FORMAT_VERSION, len(header_bytes)], dtype='<u4').tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def open_partition(path, follow_up=None, version=None):
+    """
+    스냅샷 파일을 읽기 전용 메모리 맵으로 열어 EdgePartition을 만듭니다.
+
+    배열은 파일을 직접 가리키는 NumPy 뷰이므로 복사가 일어나지 않고,
+    같은 파일을 여는 모든 워커가 OS 페이지 캐시 하나를 공유합니다.
+
+    Args:
+        path: 스냅샷 파일 경로
+        follow_up: 기대하는 follow-up 기간 (지정 시 검증)
+        version: 기대하는 데이터셋 버전 (생략 시 dataset_version())
+
+    Returns:
+        EdgePartition: 메모리 맵 기반 파티션
+
+    Raises:
+        StaleSnapshotError: 형식/데이터셋 버전/follow-up이 맞지 않는 경우
+    """
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buf[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise StaleSnapshotError(f"{path}: 스냅샷 파일이 아닙니다.")
+    format_version, header_len = np.frombuffer(buf, dtype='<u4', count=2, offset=len(FILE_MAGIC))
+    if format_version != FORMAT_VERSION:
+        raise StaleSnapshotError(
+            f"{path}: 파일 형식 버전 {format_version} != {FORMAT_VERSION}")
+    header_start = len(FILE_MAGIC) + 8
+    header = json.loads(buf[header_start:header_start + int(header_len)])
+
+    expected_version = version or dataset_version()
+    if header['dataset_version'] != expected_version:
+        raise StaleSnapshotError(
+            f"{path}: 데이터셋 버전 {header['dataset_version']} != {expected_version}")
+    if follow_up is not None and header['follow_up'] != follow_up:
+        raise StaleSnapshotError(f"{path}: follow-up {header['follow_up']} != {follow_up}")
+
+    arrays = {
+        name: np.frombuffer(buf, dtype=np.dtype(spec['dtype']), count=spec['length'],
+                            offset=spec['offset'])
+        for name, spec in header['arrays'].items()
+    }
+    partition = EdgePartition(
+        header['follow_up'],
+        np.array(header['codes'], dtype=str),
+        log_rr_sorted=header['log_rr_sorted'],
+        **arrays,
+    )
+    partition.mapped_path = path
+    return partition
+
+
+def load_partition(follow_up):
+    """
+    스냅샷 파일이 있으면 메모리 맵으로 열고, 없거나 오래된 경우 DB에서 적재합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        EdgePartition: 해당 follow-up의 파티션
+    """
+    path = snapshot_path(follow_up)
+    if os.path.exists(path):
+        try:
+            return open_partition(path, follow_up=follow_up)
+        except StaleSnapshotError as e:
+            logger.warning("스냅샷 파일을 사용하지 않습니다: %s", e)
+    return load_partition_from_db(follow_up)
+
+
+_partitions = {}
+_lock = threading.Lock()
+
+
+def get_partition(follow_up):
+    """
+    Follow-up 파티션을 반환합니다. 처음 요청될 때 한 번만 적재합니다.
+
+    Args:
+        follow_up: Follow-up 기간
+
+    Returns:
+        EdgePartition: 해당 follow-up의 스냅샷
+
+    Raises:
+        ValueError: follow_ups()에 없는 follow-up인 경우 (적재/캐시하지 않음)
+    """
+    if follow_up not in follow_ups():
+        raise ValueError(f"Invalid follow-up period: {follow_up}")
+    partition = _partitions.get(follow_up)
+    if partition is not None:
+        return partition
+    with _lock:
+        partition = _partitions.get(follow_up)
+        if partition is None:
+            partition = load_partition(follow_up)
+            _partitions[follow_up] = partition
+    return partition
+
+
+def clear():
+    """적재된 모든 파티션을 버립니다. 다음 요청 시 다시 적재됩니다."""
+    with _lock:
+        _partitions.clear()
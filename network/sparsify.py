@@ -0,0 +1,105 @@
+"""
+메인 네트워크 엣지 희소화(sparsification).
+
+느슨한 임계값에서는 메인 네트워크 엣지가 Cytoscape/fcose가 대화형으로 배치할 수 있는
+수를 넘기 때문에, 임계값으로 고른 파티션 행을 한 번 더 줄여 읽을 수 있는 크기로
+만듭니다. 모든 방식은 선택된 행의 배열 연산(정렬/bincount)으로 계산하며, 결과
+payload는 희소화 파라미터가 포함된 키로 그래프 캐시에 저장됩니다.
+
+- top: RR 상위 k개 엣지
+- node_top: 노드마다 RR 상위 k개 엣지 (양 끝 중 한쪽에서라도 상위 k개면 유지)
+- disparity: disparity filter (Serrano et al., 2009). 노드의 전체 가중치(RR 합) 중
+  엣지 비중이 무작위 배분으로 설명되지 않는(p < alpha) 엣지만 유지
+- backbone: RR 기준 최대 신장 숲 (connectivity.spanning_forest)
+"""
+import numpy as np
+
+from . import connectivity
+
+
+def top_k(partition, rows, k):
+    """RR 상위 k개 엣지의 행 번호 (오름차순)."""
+    if len(rows) <= k:
+        return rows
+    top = np.argpartition(-partition.rr[rows], k - 1)[:k]
+    return np.sort(rows[top])
+
+
+def node_top_k(partition, rows, k):
+    """
+    노드마다 RR 상위 k개 엣지를 남깁니다.
+
+    노드별 힙 대신 (노드, RR 내림차순)으로 한 번 정렬한 뒤 노드 구간 안의 순위를 구해
+    모든 노드를 한꺼번에 처리합니다.
+
+    Returns:
+        np.ndarray: 양 끝 노드 중 한쪽에서라도 상위 k개인 엣지의 행 번호 (오름차순)
+    """
+    rr = partition.rr[rows]
+    keep = np.zeros(len(rows), dtype=bool)
+    for nodes in (partition.cause[rows], partition.outcome[rows]):
+        order = np.lexsort((-rr, nodes))
+        sorted_nodes = nodes[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_nodes, sorted_nodes, side='left')
+        keep[order[rank < k]] = True
+    return rows[keep]
+
+
+def disparity_filter(partition, rows, alpha):
+    """
+    Disparity filter로 노드별로 유의하게 큰 엣지를 남깁니다.
+
+    노드 i의 차수가 k, RR 합이 s일 때 엣지 RR w의 p-value는 (1 - w/s)^(k-1)입니다.
+    차수가 1인 쪽은 판단하지 않습니다 (p = 1).
+
+    Returns:
+        np.ndarray: 양 끝 노드 중 한쪽에서라도 p < alpha인 엣지의 행 번호 (오름차순)
+    """
+    n_nodes = len(partition.codes)
+    cause = partition.cause[rows]
+    outcome = partition.outcome[rows]
+    weight = partition.rr[rows].astype(np.float64)
+    strength = np.bincount(cause, weight, n_nodes) + np.bincount(outcome, weight, n_nodes)
+    degree = np.bincount(cause, minlength=n_nodes) + np.bincount(outcome, minlength=n_nodes)
+
+    keep = np.zeros(len(rows), dtype=bool)
+    for nodes in (cause, outcome):
+        k = degree[nodes]
+        share = np.divide(weight, strength[nodes], out=np.zeros_like(weight), where=strength[nodes] > 0)
+        p_value = np.where(k > 1, (1 - share) ** (k - 1), 1.0)
+        keep |= p_value < alpha
+    return rows[keep]
+
+
+def backbone(partition, rows):
+    """RR 기준 최대 신장 숲의 행 번호 (오름차순)."""
+    order = np.argsort(-partition.rr[rows], kind='stable')
+    forest_rows, _, _ = connectivity.spanning_forest(partition, rows[order])
+    return np.sort(forest_rows)
+
+
+def sparsify(partition, rows, mode, sparsify_k=None, sparsify_alpha=None):
+    """
+    임계값으로 고른 행을 희소화 방식에 따라 줄입니다.
+
+    Args:
+        partition: EdgePartition
+        rows: 파티션 행 번호 (partition.select() 결과)
+        mode: 'top', 'node_top', 'disparity', 'backbone' (None이면 그대로)
+        sparsify_k: top/node_top의 k
+        sparsify_alpha: disparity의 유의수준
+
+    Returns:
+        np.ndarray: 남은 행 번호 (오름차순)
+    """
+    if not mode:
+        return rows
+    if mode == 'top':
+        return top_k(partition, rows, sparsify_k)
+    if mode == 'node_top':
+        return node_top_k(partition, rows, sparsify_k)
+    if mode == 'disparity':
+        return disparity_filter(partition, rows, sparsify_alpha)
+    if mode == 'backbone':
+        return backbone(partition, rows)
+    raise ValueError(f"지원되지 않는 희소화 방식: {mode}")
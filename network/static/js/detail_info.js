@@ -0,0 +1,78 @@
+// 노드/엣지 상세 정보(인구학적 분포) 조회기 (서버: get_detail_info_batch)
+// 같은 이벤트 루프 안에서 요청된 노드/엣지를 모아 한 번의 배치 요청으로 보내고,
+// 받은 결과는 페이지에 남겨 두어 같은 요소를 다시 클릭하거나 호버해도 재요청하지 않습니다.
+const DETAIL_BATCH_URL = '/network/get_detail_info_batch/';
+const DETAIL_BATCH_LIMIT = 200;
+
+const detailCache = new Map();   // 키 → Promise<{type, data}>
+let detailQueue = [];            // [{key, type, code | source/target/followUp, resolve, reject}]
+let detailFlushScheduled = false;
+
+function detailKey(request) {
+    return request.type === 'node'
+        ? `node|${request.nodeId}`
+        : `edge|${request.followUp}|${request.source}:${request.target}`;
+}
+
+function flushDetailQueue() {
+    detailFlushScheduled = false;
+    const queue = detailQueue;
+    detailQueue = [];
+
+    // 엣지는 follow-up 별로, 한 요청당 DETAIL_BATCH_LIMIT개씩 묶음
+    const groups = new Map();
+    queue.forEach(item => {
+        const groupKey = item.type === 'edge' ? `edge|${item.followUp}` : 'node';
+        if (!groups.has(groupKey)) groups.set(groupKey, []);
+        groups.get(groupKey).push(item);
+    });
+
+    groups.forEach(items => {
+        for (let start = 0; start < items.length; start += DETAIL_BATCH_LIMIT) {
+            const chunk = items.slice(start, start + DETAIL_BATCH_LIMIT);
+            const params = new URLSearchParams();
+            if (chunk[0].type === 'node') {
+                params.set('nodes', chunk.map(item => item.nodeId).join(','));
+            } else {
+                params.set('edges', chunk.map(item => `${item.source}:${item.target}`).join(','));
+                params.set('follow_up', chunk[0].followUp);
+            }
+            fetch(`${DETAIL_BATCH_URL}?${params.toString()}`)
+                .then(response => response.json())
+                .then(json => {
+                    chunk.forEach(item => {
+                        if (json.error) {
+                            detailCache.delete(item.key);
+                            item.resolve({ error: json.error });
+                            return;
+                        }
+                        const data = item.type === 'node'
+                            ? json.nodes[item.nodeId]
+                            : json.edges[`${item.source}:${item.target}`];
+                        item.resolve({ type: item.type, data: data });
+                    });
+                })
+                .catch(err => chunk.forEach(item => {
+                    detailCache.delete(item.key);
+                    item.reject(err);
+                }));
+        }
+    });
+}
+
+// request: {type: 'node', nodeId} 또는 {type: 'edge', source, target, followUp}
+// 반환값은 get_detail_info 응답과 같은 {type, data} (오류 시 {error})
+function fetchDetailInfo(request) {
+    const key = detailKey(request);
+    if (detailCache.has(key)) return detailCache.get(key);
+
+    const promise = new Promise((resolve, reject) => {
+        detailQueue.push({ ...request, key, resolve, reject });
+        if (!detailFlushScheduled) {
+            detailFlushScheduled = true;
+            setTimeout(flushDetailQueue, 0);
+        }
+    });
+    detailCache.set(key, promise);
+    return promise;
+}
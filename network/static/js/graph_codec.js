@@ -0,0 +1,87 @@
+// 바이너리 그래프 payload 디코더 (서버 인코더: network/wire.py)
+// 노드 테이블은 한 번만, 엣지는 노드 인덱스(uint16)/weight(float32) 배열로 전송됩니다.
+const GRAPH_CONTENT_TYPE = 'application/x-cotdex-graph';
+const GRAPH_FLAG_WIDE_INDEX = 0x01;
+
+function alignTo4(offset) {
+    return offset + ((4 - offset % 4) % 4);
+}
+
+// 소수 자릿수 정리 (float32 → JSON 응답과 같은 표기)
+function roundTo(value, digits) {
+    const scale = Math.pow(10, digits);
+    return Math.round(value * scale) / scale;
+}
+
+// ArrayBuffer → {nodes, edges, node_names} (Cytoscape 요소 형식)
+function decodeGraph(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+    if (magic !== 'CTDX' || view.getUint8(4) !== 1) {
+        throw new Error('지원되지 않는 그래프 payload 형식입니다.');
+    }
+    const flags = view.getUint8(5);
+    const nodeCount = view.getUint32(8, true);
+    const edgeCount = view.getUint32(12, true);
+    const metaLength = view.getUint32(16, true);
+
+    let offset = 20;
+    const metaText = new TextDecoder().decode(new Uint8Array(buffer, offset, metaLength));
+    const meta = JSON.parse(metaText.replace(/\0+$/, ''));
+    offset += metaLength;
+
+    // 정렬된 오프셋이므로 typed array를 복사 없이 바로 씌울 수 있음 (little-endian 가정)
+    const width = new Float32Array(buffer, offset, nodeCount);
+    const height = new Float32Array(buffer, offset + 4 * nodeCount, nodeCount);
+    const color = new Uint8Array(buffer, offset + 8 * nodeCount, nodeCount);
+    offset = alignTo4(offset + 9 * nodeCount);
+
+    const IndexArray = (flags & GRAPH_FLAG_WIDE_INDEX) ? Uint32Array : Uint16Array;
+    const source = new IndexArray(buffer, offset, edgeCount);
+    const target = new IndexArray(buffer, offset + IndexArray.BYTES_PER_ELEMENT * edgeCount, edgeCount);
+    offset = alignTo4(offset + 2 * IndexArray.BYTES_PER_ELEMENT * edgeCount);
+    const weight = new Float32Array(buffer, offset, edgeCount);
+
+    const ids = meta.ids;
+    const nodes = new Array(nodeCount);
+    const nodeNames = new Array(nodeCount);
+    for (let i = 0; i < nodeCount; i++) {
+        const node = {
+            data: { id: ids[i], label: meta.labels[i],
+                    width: roundTo(width[i], 2), height: roundTo(height[i], 2) },
+            style: { 'background-color': meta.palette[color[i]] }
+        };
+        if (meta.pinned[ids[i]]) {
+            node.position = meta.pinned[ids[i]];
+            node.locked = true;
+        } else if (meta.positions && meta.positions[ids[i]]) {
+            node.position = meta.positions[ids[i]];  // 서버 레이아웃 좌표
+        }
+        nodes[i] = node;
+        nodeNames[i] = `${ids[i]} (${meta.labels[i]})`;
+    }
+    const edges = new Array(edgeCount);
+    for (let i = 0; i < edgeCount; i++) {
+        edges[i] = { data: { source: ids[source[i]], target: ids[target[i]], weight: roundTo(weight[i], 6) } };
+    }
+    return { nodes: nodes, edges: edges, node_names: nodeNames };
+}
+
+// 바이너리 형식으로 그래프 데이터를 요청합니다. JSON 응답(오류, 델타)은 그대로 전달하며,
+// X-Graph-Token 헤더가 있으면 결과의 token 필드로 붙입니다.
+function fetchGraph(url, options = {}) {
+    const headers = Object.assign({ 'Accept': GRAPH_CONTENT_TYPE }, options.headers || {});
+    const sep = url.indexOf('?') >= 0 ? '&' : '?';
+    return fetch(url + sep + 'format=binary', { credentials: 'same-origin', headers: headers })
+        .then(res => {
+            const token = res.headers.get('X-Graph-Token');
+            const body = (res.headers.get('Content-Type') || '').indexOf(GRAPH_CONTENT_TYPE) === 0
+                ? res.arrayBuffer().then(decodeGraph)
+                : res.json();
+            return body.then(data => {
+                if (token) data.token = token;
+                return data;
+            });
+        });
+}
@@ -0,0 +1,55 @@
+// 델타 응답 적용기
+// 슬라이더 변경 시 서버가 보낸 {added, removed}만 반영하고, 기존 노드 위치를 유지한 채
+// 새로 추가된 노드가 있을 때만 레이아웃을 이어서(randomize: false) 실행합니다.
+// 서버 레이아웃 좌표(positions)가 있으면 레이아웃 대신 모든 노드를 그 좌표로 옮깁니다 (graph_layout.js).
+function applyGraphDelta(cy, delta, layoutOptions) {
+    let added = cy.collection();
+    cy.batch(() => {
+        if (delta.removed.edges.length) {
+            const removed = new Set(delta.removed.edges.map(pair => pair[0] + '\t' + pair[1]));
+            cy.edges().filter(edge => removed.has(edge.data('source') + '\t' + edge.data('target'))).remove();
+        }
+        delta.removed.nodes.forEach(id => cy.getElementById(id).remove());
+
+        added = cy.add(delta.added.nodes);
+        cy.add(delta.added.edges);
+
+        // 새 노드는 이미 배치된 이웃 근처에서 시작
+        if (delta.positions) return;
+        added.forEach(node => {
+            if (node.locked()) return;
+            const anchor = node.neighborhood('node').difference(added).first();
+            if (anchor.nonempty()) {
+                const pos = anchor.position();
+                node.position({ x: pos.x + (Math.random() - 0.5) * 100, y: pos.y + (Math.random() - 0.5) * 100 });
+            }
+        });
+    });
+    if (delta.positions && typeof presetLayout === 'function') {
+        cy.layout(presetLayout(layoutOptions, delta.positions)).run();
+    } else if (added.nonempty()) {
+        cy.layout(Object.assign({}, layoutOptions, { randomize: false })).run();
+    }
+}
+
+// 델타는 직전 응답을 기준으로 하므로 요청이 겹치면 안 됩니다.
+// update(프라미스 반환)를 한 번에 하나씩 실행하고, 실행 중 들어온 호출은 끝난 뒤 한 번으로 합칩니다.
+function serializeGraphUpdates(update) {
+    let running = false;
+    let queued = false;
+    function run() {
+        if (running) {
+            queued = true;
+            return;
+        }
+        running = true;
+        Promise.resolve(update()).finally(() => {
+            running = false;
+            if (queued) {
+                queued = false;
+                run();
+            }
+        });
+    }
+    return run;
+}
@@ -0,0 +1,23 @@
+// 서버 레이아웃(network/layout.py) 적용기
+// 서버가 모든 노드의 position을 보냈으면 좌표를 그대로 쓰는 preset 레이아웃으로 그리고,
+// 좌표가 없으면(서버 레이아웃 비활성/노드 수 초과) 기존 fcose 레이아웃을 실행합니다.
+function hasServerPositions(nodes) {
+    return nodes.length > 0 && nodes.every(node => node.position);
+}
+
+// positions({id: {x, y}})를 주면 해당 좌표로 (애니메이션과 함께) 옮김
+function presetLayout(layoutOptions, positions) {
+    const options = {
+        name: 'preset',
+        animate: layoutOptions.animate,
+        fit: layoutOptions.fit !== false,
+        padding: layoutOptions.padding || 30
+    };
+    if (positions) options.positions = node => positions[node.id()];
+    return options;
+}
+
+// nodes: 방금 추가한 Cytoscape 노드 요소 목록
+function graphLayout(nodes, layoutOptions) {
+    return hasServerPositions(nodes) ? presetLayout(layoutOptions) : layoutOptions;
+}
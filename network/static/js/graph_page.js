@@ -1,17 +1,24 @@
 
-const elements = {
-    nodes: window.graphData.nodes,
-    edges: window.graphData.edges
-};
-
 const diseaseList = document.querySelectorAll('.disease-item');
 const searchBar = document.getElementById('search-bar');
 const cyContainer = document.getElementById('cy');
 const nodeInfo = document.getElementById('node-info');
 
+const layoutOptions = {
+    name: 'fcose',
+    animate: true,
+    nodeRepulsion: 80000,
+    idealEdgeLength: 150,
+    gravity: 1,
+    nodeSeparation: 100,
+    uniformNodeDimensions: false,
+    fit: true,
+    padding: 30
+};
+
 const cy = cytoscape({
     container: cyContainer,
-    elements: elements,
+    elements: [],
     style: [
         {
             selector: 'node',
@@ -59,21 +66,39 @@ const cy = cytoscape({
             }
         }
     ],
-    layout: {
-        name: 'fcose',
-        animate: true,
-        nodeRepulsion: 80000,
-        idealEdgeLength: 150,
-        gravity: 1,
-        nodeSeparation: 100,
-        uniformNodeDimensions: false,
-        fit: true,
-        padding: 30
-    },
     zoom: 1,
     pan: { x: 0, y: 0 }
 });
 
+// 네트워크 데이터는 별도 엔드포인트에서 받아옴 (ETag/304로 브라우저 캐시 재사용)
+function loadGraphData(url) {
+    // graph_codec.js가 있으면 바이너리 형식으로 받음
+    const request = typeof fetchGraph === 'function'
+        ? fetchGraph(url)
+        : fetch(url, { credentials: 'same-origin' }).then(res => res.json());
+    return request
+        .then(data => {
+            if (data.error) {
+                alert("❌ 오류: " + data.error);
+                return;
+            }
+            cy.elements().remove();
+            cy.add(data.nodes);
+            cy.add(data.edges);
+            cy.layout(graphLayout(data.nodes, layoutOptions)).run();
+        })
+        .catch(err => console.error("Graph data fetch error:", err));
+}
+
+// 큰 그래프(서버가 stream 지정)만 NDJSON으로 받아 강한 엣지부터 먼저 그림.
+// 그 외에는 그래프 캐시를 거치는 바이너리/JSON 응답으로 받음
+if (window.graphData.stream && window.ReadableStream && typeof streamGraphInto === 'function') {
+    streamGraphInto(cy, window.graphData.data_url + '&stream=1', layoutOptions)
+        .catch(err => console.error("Graph data stream error:", err));
+} else {
+    loadGraphData(window.graphData.data_url);
+}
+
 cy.on('layoutstop', () => {
     cy.fit(null, 20);
     cy.zoom(1.4);
@@ -205,8 +230,7 @@ cy.on('tap', 'node', function (evt) {
                              <p>로딩 중...</p>`;
     sidebar.classList.add("open");
 
-    fetch(`/network/get_detail_info/?type=node&node_id=${nodeId}`)
-        .then(response => response.json())
+    fetchDetailInfo({ type: 'node', nodeId: nodeId })
         .then(json => {
             if (json.error) {
                 sidebarBody.innerHTML = `<p><strong>${nodeId}</strong></p><p>${json.error}</p>`;
@@ -360,10 +384,7 @@ sidebarBody.innerHTML = `
     `;
 sidebar.classList.add("open");
 
-const url = `/network/get_detail_info/?type=edge&source=${source}&target=${target}&follow_up=${followUp}&rr_values_min=${rrMin}&rr_values_max=${rrMax}&chisq_p_values=${chisq}&fisher_p_values=${fisher}`;
-
-fetch(url)
-    .then(response => response.json())
+fetchDetailInfo({ type: 'edge', source: source, target: target, followUp: followUp })
     .then(json => {
         if (json.error) {
             sidebarBody.innerHTML = `<p><strong>Edge</strong>: ${source} → ${target}</p><p>${json.error}</p>`;
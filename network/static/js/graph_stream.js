@@ -0,0 +1,82 @@
+// NDJSON 스트리밍 그래프 데이터 로더
+// 서버가 RR이 높은 엣지부터 한 줄씩 보내는 청크({nodes, edges, node_names} / {positions} / {done})를
+// 도착하는 대로 onChunk 콜백에 전달합니다.
+function fetchNdjson(url, onChunk, options = {}) {
+    const onResponse = options.onResponse;
+    return fetch(url, options).then(res => {
+        if (onResponse) onResponse(res);
+        // 스트림을 지원하지 않는 브라우저: 전체를 받은 뒤 줄 단위로 처리
+        if (!res.body || !window.TextDecoder) {
+            return res.text().then(text => {
+                text.split('\n').forEach(line => {
+                    if (line.trim()) onChunk(JSON.parse(line));
+                });
+            });
+        }
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        function pump() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    if (buffer.trim()) onChunk(JSON.parse(buffer));
+                    return;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(line => {
+                    if (line.trim()) onChunk(JSON.parse(line));
+                });
+                return pump();
+            });
+        }
+        return pump();
+    });
+}
+
+// 청크를 Cytoscape 인스턴스에 점진적으로 추가합니다.
+// 첫 청크(가장 강한 엣지들)로 레이아웃을 한 번 돌리고, 마지막에 전체 레이아웃을 다시 실행합니다.
+// 모든 노드에 서버 레이아웃 좌표가 있으면 fcose 대신 preset 레이아웃을 씁니다 (graph_layout.js).
+// 캐시된 좌표가 없으면 서버가 엣지 청크 뒤에 {positions}를 보내므로 마지막 레이아웃에 그 좌표를 씁니다.
+function streamGraphInto(cy, url, layoutOptions, options = {}) {
+    let first = true;
+    const canPreset = typeof presetLayout === 'function';
+    let positioned = canPreset;
+    let positions = null;
+    const nodeNames = [];
+    return fetchNdjson(url, chunk => {
+        if (chunk.error) {
+            alert("❌ 오류: " + chunk.error);
+            return;
+        }
+        if (first) {
+            cy.elements().remove();
+        }
+        if (chunk.positions) {
+            positions = chunk.positions;
+            return;
+        }
+        if (chunk.done) {
+            if (positions && canPreset) {
+                cy.layout(presetLayout(layoutOptions, positions)).run();
+            } else {
+                cy.layout(positioned ? presetLayout(layoutOptions) : layoutOptions).run();
+            }
+            if (options.onDone) options.onDone(nodeNames, chunk);
+            return;
+        }
+        cy.batch(() => {
+            cy.add(chunk.nodes);
+            cy.add(chunk.edges);
+        });
+        nodeNames.push(...(chunk.node_names || []));
+        positioned = positioned && chunk.nodes.every(node => node.position);
+        if (first) {
+            cy.layout(positioned ? presetLayout(layoutOptions) : layoutOptions).run();
+            first = false;
+        }
+    }, { credentials: 'same-origin', headers: options.headers || {}, onResponse: options.onResponse });
+}
@@ -0,0 +1,103 @@
+"""
+두 follow-up 기간의 메인 네트워크 비교(temporal diff).
+
+follow-up마다 파티션의 질병 코드 사전이 다르므로, 두 사전의 합집합으로 코드를 다시
+번호 매긴 뒤 (cause, outcome)을 int64 키 하나로 합칩니다. 정렬된 키 배열끼리
+searchsorted로 병합하므로 edge_stat 자기 조인 없이 배열 연산만으로 계산합니다.
+
+- appeared: 나중 기간(to)에만 있는 엣지
+- disappeared: 이전 기간(from)에만 있는 엣지
+- persisted: 두 기간 모두 있고 RR 변화가 허용 오차 이하인 엣지
+- changed: 두 기간 모두 있고 RR이 허용 오차보다 크게 변한 엣지
+"""
+import numpy as np
+
+DIFF_STATUSES = ('appeared', 'disappeared', 'persisted', 'changed')
+
+
+class EdgeDiff:
+    """
+    edge_diff()의 결과 배열 모음입니다 (엣지는 (cause, outcome) 코드 순).
+
+    Attributes:
+        codes: 두 파티션 코드 사전의 합집합 (정렬됨)
+        cause, outcome: codes에 대한 정수 인덱스 배열
+        rr_from, rr_to: 각 기간의 RR (해당 기간에 없으면 NaN)
+        status: DIFF_STATUSES 인덱스 배열
+    """
+
+    def __init__(self, codes, cause, outcome, rr_from, rr_to, status):
+        self.codes = codes
+        self.cause = cause
+        self.outcome = outcome
+        self.rr_from = rr_from
+        self.rr_to = rr_to
+        self.status = status
+
+    def __len__(self):
+        return len(self.status)
+
+    def counts(self):
+        """상태별 엣지 수."""
+        counts = np.bincount(self.status, minlength=len(DIFF_STATUSES))
+        return dict(zip(DIFF_STATUSES, counts.tolist()))
+
+
+def edge_keys(partition, rows, codes):
+    """
+    파티션 행의 (cause, outcome)을 합집합 코드 사전 기준 int64 키로 바꿉니다.
+
+    Returns:
+        np.ndarray: cause * len(codes) + outcome
+    """
+    remap = np.searchsorted(codes, partition.codes)
+    cause = remap[partition.cause[rows]].astype(np.int64)
+    outcome = remap[partition.outcome[rows]].astype(np.int64)
+    return cause * len(codes) + outcome
+
+
+def edge_diff(before, before_rows, after, after_rows, rr_tolerance):
+    """
+    두 파티션에서 고른 엣지를 비교합니다.
+
+    Args:
+        before, after: 이전/나중 기간의 EdgePartition
+        before_rows, after_rows: 각 파티션에서 임계값으로 고른 행 번호
+        rr_tolerance: persisted/changed를 나누는 RR 절대 변화량
+
+    Returns:
+        EdgeDiff: 비교 결과
+    """
+    codes = np.union1d(before.codes, after.codes)
+    key_from = edge_keys(before, before_rows, codes)
+    key_to = edge_keys(after, after_rows, codes)
+    order_from = np.argsort(key_from, kind='stable')
+    order_to = np.argsort(key_to, kind='stable')
+    key_from, key_to = key_from[order_from], key_to[order_to]
+    rr_from = before.rr[before_rows][order_from].astype(np.float64)
+    rr_to = after.rr[after_rows][order_to].astype(np.float64)
+
+    # 정렬된 키끼리 병합: from의 각 키가 to에 있는지
+    pos = np.searchsorted(key_to, key_from)
+    matched = pos < len(key_to)
+    matched[matched] = key_to[pos[matched]] == key_from[matched]
+    in_to = np.zeros(len(key_to), dtype=bool)
+    in_to[pos[matched]] = True
+
+    keys = np.concatenate([key_from, key_to[~in_to]])
+    rr_a = np.concatenate([rr_from, np.full((~in_to).sum(), np.nan)])
+    rr_b = np.full(len(key_from), np.nan)
+    rr_b[matched] = rr_to[pos[matched]]
+    rr_b = np.concatenate([rr_b, rr_to[~in_to]])
+
+    status = np.full(len(keys), DIFF_STATUSES.index('appeared'), dtype=np.int64)
+    status[:len(key_from)] = np.where(
+        matched,
+        np.where(np.abs(rr_b[:len(key_from)] - rr_from) > rr_tolerance,
+                 DIFF_STATUSES.index('changed'), DIFF_STATUSES.index('persisted')),
+        DIFF_STATUSES.index('disappeared'),
+    )
+
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    return EdgeDiff(codes, keys // len(codes), keys % len(codes), rr_a[order], rr_b[order], status[order])
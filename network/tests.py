@@ -1,215 +1,1385 @@
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>단일 질병 그래프</title>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/cytoscape/3.21.0/cytoscape.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/layout-base/layout-base.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/cose-base/cose-base.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/cytoscape-fcose/cytoscape-fcose.min.js"></script>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        body {
-            display: flex;
-            font-family: Arial, sans-serif;
-            height: 100vh;
-            overflow: hidden;
-        }
-        #sidebar {
-            width: 320px;
-            background: #f4f4f4;
-            padding: 20px;
-            overflow-y: auto;
-            border-right: 2px solid #ddd;
-        }
-        #sidebar h1 {
-            font-size: 22px;
-            margin-bottom: 15px;
-            text-align: center;
-        }
-        .filter-info, .filter-section {
-            font-size: 14px;
-            margin-bottom: 15px;
-            padding: 10px;
-            background: #fff;
-            border-radius: 5px;
-            box-shadow: 0 0 5px rgba(0, 0, 0, 0.1);
-        }
-        .filter-info p, .filter-section label {
-            margin: 5px 0;
-            font-weight: bold;
-        }
-        button {
-            width: 100%;
-            padding: 10px;
-            font-size: 16px;
-            margin-top: 10px;
-            cursor: pointer;
-            background-color: #007BFF;
-            color: white;
-            border: none;
-            border-radius: 5px;
-        }
-        button:hover {
-            background-color: #0056b3;
-        }
-        #cy {
-            flex: 1;
-            height: 100vh;
-        }
-        input[type="range"], input[type="number"], select {
-            width: 100%;
-            padding: 8px;
-            margin-top: 5px;
-            border: 1px solid #ddd;
-            border-radius: 5px;
-            font-size: 14px;
-        }
-        .slider-container {
-            margin-top: 15px;
-            text-align: center;
-        }
-        .slider-value {
-            font-size: 16px;
-            font-weight: bold;
-            text-align: center;
-            margin-top: 5px;
+import asyncio
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from sqlalchemy import exc
+
+from . import connectivity, db, layout, registry, snapshot, views
+from .adjacency import Adjacency
+from .bitset import NeighborBitsets
+from .connectivity import ConnectivityIndex, SpanningForest
+from .cube import LOG_RR_GRID, P_LEVELS, RR_GRID, ThresholdCube, read_cube, write_cube
+from .db import PoolStats, TimedQueuePool, get_db_connection, pool_status
+from .graph_cache import GraphCache
+from .management.commands import prefetch_pubmed
+from .metrics import compute_metrics
+from .models import PubmedResult, UserGraph
+from .params import MAIN_DEFAULTS
+from .payload import NodeTable, build_elements, delta_elements, diff_elements, stream_elements
+from .pubmed import FakeBackend, PubmedClient, ResultCache, TokenBucket, stored_results
+from .registry import NodeRegistry
+from .snapshot import (ARRAY_FIELDS, EdgePartition, StaleSnapshotError, dataset_version, open_partition, snapshot_path,
+                       write_partition)
+from .sparsify import sparsify
+from .temporal import DIFF_STATUSES, edge_diff
+from .timeseries import NODE_FIELDS, SERIES_FIELDS, build_timeseries
+from .wire import FLAG_WIDE_INDEX, decode_elements, encode_elements
+
+# 테스트용 edge_stat 행 (float32로 정확히 표현되는 값만 사용)
+EDGE_ROWS = [
+    # cause, outcome, rr, log_rr, chisq, fisher
+    ('A01', 'B02', 1.25, 0.25, 0.01, 0.02),
+    ('A01', 'C03', 2.5, 1.0, 0.5, 0.25),
+    ('B02', 'C03', 0.75, -0.5, 0.0001, 0.0001),
+    ('C03', 'A01', 12.0, 2.5, 0.03125, 0.0625),
+    ('D04', 'B02', 1.5, 0.5, 0.75, 0.01),
+    ('E05', 'A01', 3.0, 1.5, 0.001, 0.001),
+    ('B02', 'E05', 1.125, 0.125, 0.05, 0.05),
+    ('X99', 'D04', 4.0, 2.0, 0.0, 0.0),
+]
+
+
+NODE_ROWS = [
+    # code, width, height, Korean
+    ('A01', 0.5, 0.25, '질병 A'),
+    ('B02', None, 0.75, '질병 B'),
+    ('C03', 1.0, None, None),
+    ('D04', 0.125, 0.125, '질병 D'),
+    ('E05', 0.5, 0.5, '질병 E'),
+]
+
+
+def random_edge_frame(n_codes=25, n_edges=300, seed=0):
+    """(cause, outcome) 쌍이 유일한 무작위 edge_stat 행 (RR은 0.01 단위, p-value는 0.001 단위)."""
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"{chr(65 + i % 26)}{i:02d}" for i in range(n_codes)])
+    pairs = rng.choice(n_codes * n_codes, size=n_edges, replace=False)
+    rr = rng.integers(50, 400, n_edges) / 100
+    return pd.DataFrame({
+        'cause_abb': codes[pairs // n_codes],
+        'outcome_abb': codes[pairs % n_codes],
+        'rr_values': rr,
+        'log_rr_values': np.log(rr),
+        'adjusted_chisq_p_values': rng.integers(0, 1000, n_edges) / 1000,
+        'adjusted_fisher_p_values': rng.integers(0, 1000, n_edges) / 1000,
+    })
+
+
+def edge_frame(rows=EDGE_ROWS):
+    return pd.DataFrame(rows, columns=[
+        'cause_abb', 'outcome_abb', 'rr_values', 'log_rr_values',
+        'adjusted_chisq_p_values', 'adjusted_fisher_p_values',
+    ])
+
+
+def node_frame():
+    return pd.DataFrame(NODE_ROWS, columns=['code', 'width', 'height', 'Korean'])
+
+
+def registry_frame():
+    """NODE_ROWS에 영문명을 더한 node_base 행."""
+    return node_frame().assign(English=['Disease A', 'Disease B', None, 'Disease D', 'Disease E'])
+
+
+def legacy_filter(df, rr_min, rr_max, chisq_max, fisher_max, rr_column='rr_values'):
+    """기존 SQL 조건 (`BETWEEN`, `<=`)을 pandas로 적용합니다."""
+    return df[df[rr_column].between(rr_min, rr_max)
+              & (df['adjusted_chisq_p_values'] <= chisq_max)
+              & (df['adjusted_fisher_p_values'] <= fisher_max)]
+
+
+def legacy_elements(df, disease_df):
+    """기존 graph_page의 iterrows 루프로 만든 Cytoscape 노드/엣지 목록."""
+    size_mapping = {
+        row['code']: {
+            'width': round(row['width'] * 80, 2) if pd.notna(row['width']) else 30,
+            'height': round(row['height'] * 80, 2) if pd.notna(row['height']) else 30
         }
-    </style>
-</head>
-<body>
-
-    <!-- 왼쪽 사이드바 -->
-    <div id="sidebar">
-        <h1>단일 질병 그래프</h1>
-
-        {% if error_message %}
-            <p class="error-message" style="color: red; font-size: 16px; font-weight: bold;">{{ error_message }}</p>
-        {% else %}
-            <div class="filter-info">
-                <p><b>선택한 질병:</b> {{ disease_code }}</p>
-                <p><b>Follow-Up 기간:</b> <span id="follow-up-value">{{ follow_up }}</span></p>
-                <p><b>RR 값 범위:</b> <span id="rr-value">{{ rr_min }} ~ {{ rr_max }}</span></p>
-                <p><b>Chi-Square P-Values:</b> ≤ <span id="chisq-value">{{ chisq_p }}</span></p>
-                <p><b>Fisher P-Values:</b> ≤ <span id="fisher-value">{{ fisher_p }}</span></p>
-            </div>
-        {% endif %}
-
-        <!-- Follow-Up 기간 조절 슬라이드 바 -->
-        <div class="slider-container">
-            <label for="follow-up-slider"><b>Follow-Up 기간 조정</b></label>
-            <input type="range" id="follow-up-slider" min="1" max="10" step="1" value="{{ follow_up }}" oninput="updateFollowUpValue(this.value)">
-            <p class="slider-value">선택된 값: <span id="follow-up-display">{{ follow_up }}</span></p>
-        </div>
-
-        <br/>
-
-        <!-- RR Value 선택 -->
-        <div class="filter-section">
-            <label for="rr-min">RR Values Min:</label>
-            <input type="number" id="rr-min" step="0.1" value="{{ rr_min }}" oninput="updateRRValue()">
-            <label for="rr-max">RR Values Max:</label>
-            <input type="number" id="rr-max" step="0.1" value="{{ rr_max }}" oninput="updateRRValue()">
-        </div>
-
-        <!-- P-Value 선택 -->
-        <div class="filter-section">
-            <label for="chisq-p">Chi-Square P-Values:</label>
-            <select id="chisq-p" onchange="updateChisqValue()">
-                <option value="0.5">≤ 0.5</option>
-                <option value="0.05">≤ 0.05</option>
-                <option value="0.005">≤ 0.005</option>
-                <option value="0.0001">≤ 0.0001</option>
-            </select>
-
-            <label for="fisher-p">Fisher P-Values:</label>
-            <select id="fisher-p" onchange="updateFisherValue()">
-                <option value="0.5">≤ 0.5</option>
-                <option value="0.05">≤ 0.05</option>
-                <option value="0.005">≤ 0.005</option>
-                <option value="0.0001">≤ 0.0001</option>
-            </select>
-        </div>
-
-        <button onclick="window.location.href='{% url 'disease_select' %}'">뒤로 가기</button>
-    </div>
-
-    <!-- 오른쪽 그래프 -->
-    <div id="cy"></div>
-
-    <script>
-        var elements = {
-            nodes: {{ nodes|safe }},
-            edges: {{ edges|safe }}
-        };
-
-        var cy = cytoscape({
-            container: document.getElementById('cy'),
-            elements: elements,
-            style: [
-                {
-                    selector: 'node',
-                    style: {
-                        'background-color': '#666',
-                        'label': 'data(id)',
-                        'text-valign': 'center',
-                        'text-halign': 'center',
-                        'color': '#fff',
-                        'font-size': '12px',
-                        'width': '30px',
-                        'height': '30px',
-                    }
-                },
-                {
-                    selector: 'edge',
-                    style: {
-                        'width': 'mapData(weight, 0, 10, 0.5, 3)',
-                        'line-color': '#ccc',
-                        'target-arrow-shape': 'triangle',
-                        'target-arrow-color': '#ccc',
-                        'curve-style': 'bezier'
-                    }
+        for _, row in disease_df.iterrows()
+    }
+    label_mapping = {
+        row['code']: row['Korean'] if pd.notna(row['Korean']) else row['code']
+        for _, row in disease_df.iterrows()
+    }
+    pastel_colors = {'A': '#FFB3BA', 'B': '#FFDFBA', 'C': '#FFFFBA', 'D': '#BAFFBA', 'E': '#BAE1FF',
+                     'X': '#E9F7D2'}
+
+    nodes, edges, unique_nodes = [], [], set()
+    for _, row in df.iterrows():
+        cause, outcome = row['cause_abb'], row['outcome_abb']
+        weight = max(1, min(10, round(row['rr_values'], 2)))
+        for node in [cause, outcome]:
+            if node not in unique_nodes:
+                size = size_mapping.get(node, {'width': 30, 'height': 30})
+                nodes.append({
+                    "data": {"id": node, "label": label_mapping.get(node, node),
+                             "width": size['width'], "height": size['height']},
+                    "style": {"background-color": pastel_colors.get(node[0], "#666")},
+                })
+                unique_nodes.add(node)
+        edges.append({"data": {"source": cause, "target": outcome, "weight": weight}})
+    return nodes, edges
+
+
+def edge_set(edges):
+    return sorted((e['data']['source'], e['data']['target'], e['data']['weight']) for e in edges)
+
+
+def node_map(nodes):
+    return {node['data']['id']: node for node in nodes}
+
+
+class SnapshotMixin:
+    """
+    테스트용 파티션을 스냅샷 파일로 써 두고 스냅샷 디렉터리, 데이터셋 버전, node_base 레지스트리,
+    기본 캐시를 테스트 데이터로 바꿉니다 (DB 없이 뷰와 명령을 실행).
+
+    Attributes:
+        frames: {follow-up: edge_stat DataFrame}
+        modules: 테스트 전후로 clear()할 모듈
+    """
+    frames = {1: edge_frame(), 2: random_edge_frame()}
+    modules = (snapshot, registry)
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for follow_up, df in self.frames.items():
+            write_partition(EdgePartition.from_frame(follow_up, df), snapshot_path(follow_up, directory.name),
+                            version='test')
+        overrides = override_settings(
+            EDGE_SNAPSHOT_DIR=directory.name,
+            COTDEX_DATASET_VERSION='test',
+            COTDEX_FOLLOW_UPS=sorted(self.frames),
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                'LOCATION': self.id()}},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        loader = mock.patch('network.registry.load_registry',
+                            return_value=NodeRegistry(registry_frame(), version='test'))
+        loader.start()
+        self.addCleanup(loader.stop)
+        for module in self.modules:
+            module.clear()
+            self.addCleanup(module.clear)
+
+
+class SnapshotFileTest(TestCase):
+    """write_partition()으로 쓴 스냅샷 파일을 open_partition()이 같은 파티션으로 여는지 확인합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(3, random_edge_frame())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = snapshot_path(3, directory.name)
+        write_partition(self.partition, self.path, version='v1')
+
+    def test_round_trip(self):
+        loaded = open_partition(self.path, follow_up=3, version='v1')
+        self.assertEqual(loaded.follow_up, 3)
+        self.assertEqual(loaded.mapped_path, self.path)
+        np.testing.assert_array_equal(loaded.codes, self.partition.codes)
+        for name in ARRAY_FIELDS:
+            with self.subTest(array=name):
+                self.assertEqual(getattr(loaded, name).dtype, getattr(self.partition, name).dtype)
+                np.testing.assert_array_equal(getattr(loaded, name), getattr(self.partition, name))
+        for case, column in (((1.0, 2.0, 0.5, 0.5), 'rr_values'), ((-0.5, 0.5, 1.0, 1.0), 'log_rr_values')):
+            with self.subTest(case=case, column=column):
+                np.testing.assert_array_equal(loaded.select(*case, rr_column=column),
+                                              self.partition.select(*case, rr_column=column))
+
+    def test_version_mismatch(self):
+        with self.assertRaises(StaleSnapshotError):
+            open_partition(self.path, version='v2')
+
+    def test_default_version(self):
+        with override_settings(COTDEX_DATASET_VERSION='v1'):
+            self.assertEqual(len(open_partition(self.path)), len(self.partition))
+        with override_settings(COTDEX_DATASET_VERSION='v2'):
+            with self.assertRaises(StaleSnapshotError):
+                open_partition(self.path)
+
+    def test_follow_up_mismatch(self):
+        with self.assertRaises(StaleSnapshotError):
+            open_partition(self.path, follow_up=4, version='v1')
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'edge_stat')
+        with self.assertRaises(StaleSnapshotError):
+            open_partition(self.path, version='v1')
+
+
+class EdgePartitionSelectTest(TestCase):
+    """EdgePartition.select()가 기존 edge_stat SQL 조건과 같은 행을 고르는지 확인합니다."""
+
+    def setUp(self):
+        self.df = edge_frame()
+        self.partition = EdgePartition.from_frame(1, self.df)
+
+    def selected(self, idx):
+        frame = self.partition.frame(idx)
+        return sorted(zip(frame['cause_abb'], frame['outcome_abb']))
+
+    def expected(self, *args, **kwargs):
+        found = legacy_filter(self.df, *args, **kwargs)
+        return sorted(zip(found['cause_abb'], found['outcome_abb']))
+
+    def test_rr_range_matches_sql(self):
+        cases = [
+            (0.0, 100.0, 1.0, 1.0),
+            (1.25, 3.0, 1.0, 1.0),      # 경계값 포함
+            (1.0, 2.5, 0.05, 0.05),
+            (5.0, 6.0, 1.0, 1.0),       # 빈 결과
+            (0.0, 100.0, 0.0, 0.0),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(self.selected(self.partition.select(*case)), self.expected(*case))
+
+    def test_log_rr_range_matches_sql(self):
+        for case in [(-1.0, 1.0, 1.0, 1.0), (0.125, 2.0, 0.05, 0.05), (0.5, 0.5, 1.0, 1.0)]:
+            with self.subTest(case=case):
+                idx = self.partition.select(*case, rr_column='log_rr_values')
+                self.assertEqual(self.selected(idx), self.expected(*case, rr_column='log_rr_values'))
+
+    def test_code_filter(self):
+        idx = self.partition.select(0.0, 100.0, 1.0, 1.0, code='A01')
+        found = self.df[(self.df['cause_abb'] == 'A01') | (self.df['outcome_abb'] == 'A01')]
+        self.assertEqual(self.selected(idx), sorted(zip(found['cause_abb'], found['outcome_abb'])))
+        self.assertEqual(len(self.partition.select(0.0, 100.0, 1.0, 1.0, code='ZZZ')), 0)
+
+    def test_rows_are_sorted_by_rr(self):
+        idx = self.partition.select(0.0, 100.0, 1.0, 1.0)
+        self.assertTrue(np.all(np.diff(self.partition.rr[idx]) >= 0))
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.partition.select(0.0, 1.0, 1.0, 1.0, rr_column='chisq')
+
+
+class BuildElementsTest(TestCase):
+    """build_elements()가 기존 iterrows 루프와 같은 Cytoscape payload를 만드는지 확인합니다."""
+
+    def setUp(self):
+        self.df = edge_frame()
+        self.table = NodeTable.from_frame(node_frame())
+
+    def test_matches_legacy_loop(self):
+        found = legacy_filter(self.df, 0.0, 100.0, 1.0, 1.0)
+        nodes, edges, node_names = build_elements(
+            found['cause_abb'].to_numpy(), found['outcome_abb'].to_numpy(), found['rr_values'].to_numpy(),
+            self.table, weight_clip=(1, 10))
+        legacy_nodes, legacy_edges = legacy_elements(found, node_frame())
+
+        self.assertEqual(nodes, legacy_nodes)
+        self.assertEqual(edge_set(edges), edge_set(legacy_edges))
+        self.assertEqual(node_names, [f"{n['data']['id']} ({n['data']['label']})" for n in nodes])
+
+    def test_node_order_follows_first_appearance(self):
+        nodes, _, _ = build_elements(np.array(['C03', 'A01']), np.array(['A01', 'B02']),
+                                     np.array([1.5, 2.0]), self.table)
+        self.assertEqual([n['data']['id'] for n in nodes], ['C03', 'A01', 'B02'])
+
+    def test_unknown_node_defaults(self):
+        nodes, _, _ = build_elements(np.array(['X99']), np.array(['A01']), np.array([2.0]), self.table)
+        unknown = node_map(nodes)['X99']
+        self.assertEqual(unknown['data'], {"id": 'X99', "label": 'X99', "width": 30, "height": 30})
+
+    def test_pinned(self):
+        pinned = {'A01': {'x': 0, 'y': 0}}
+        nodes, _, _ = build_elements(np.array(['A01']), np.array(['B02']), np.array([2.0]), self.table,
+                                     pinned=pinned)
+        by_id = node_map(nodes)
+        self.assertEqual(by_id['A01']['position'], pinned['A01'])
+        self.assertTrue(by_id['A01']['locked'])
+        self.assertNotIn('position', by_id['B02'])
+
+    def test_positions(self):
+        pinned = {'A01': {'x': 0, 'y': 0}}
+        positions = {'A01': {'x': 5, 'y': 5}, 'B02': {'x': 10.5, 'y': -3.0}}
+        nodes, _, _ = build_elements(np.array(['A01']), np.array(['B02']), np.array([2.0]), self.table,
+                                     pinned=pinned, positions=positions)
+        by_id = node_map(nodes)
+        # 고정 위치가 서버 레이아웃 좌표보다 우선
+        self.assertEqual(by_id['A01']['position'], pinned['A01'])
+        self.assertEqual(by_id['B02']['position'], positions['B02'])
+        self.assertNotIn('locked', by_id['B02'])
+
+
+class NodeRegistryTest(TestCase):
+    """NodeRegistry의 코드 → 노드 id/이름/크기 조회를 확인합니다."""
+
+    def setUp(self):
+        self.registry = NodeRegistry(registry_frame().iloc[::-1], version='test')
+
+    def test_codes_sorted(self):
+        self.assertEqual(self.registry.codes.tolist(), ['A01', 'B02', 'C03', 'D04', 'E05'])
+        self.assertEqual(len(self.registry), 5)
+
+    def test_lookup(self):
+        self.assertIn('B02', self.registry)
+        self.assertNotIn('X99', self.registry)
+        self.assertEqual(self.registry.id('C03'), 2)
+        self.assertIsNone(self.registry.id('X99'))
+        np.testing.assert_array_equal(self.registry.ids(np.array(['E05', 'X99', 'A01'])), [4, -1, 0])
+        self.assertEqual(self.registry.korean[self.registry.id('A01')], '질병 A')
+        self.assertEqual(self.registry.english[self.registry.id('D04')], 'Disease D')
+        self.assertIsNone(self.registry.korean[self.registry.id('C03')])
+        self.assertIsNone(self.registry.english[self.registry.id('C03')])
+
+    def test_records(self):
+        records = self.registry.records(code_key='node_code')
+        self.assertEqual(records[0], {'node_code': 'A01', 'Korean': '질병 A', 'width': 0.5, 'height': 0.25})
+        self.assertTrue(math.isnan(records[1]['width']))
+        self.assertEqual([record['node_code'] for record in records], self.registry.codes.tolist())
+
+    def test_reloads_on_dataset_version_change(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+        with mock.patch('network.registry.load_registry',
+                        side_effect=lambda: NodeRegistry(registry_frame(), version=dataset_version())) as load:
+            with override_settings(COTDEX_DATASET_VERSION='a'):
+                first = registry.get_registry()
+                self.assertIs(registry.get_registry(), first)
+            with override_settings(COTDEX_DATASET_VERSION='b'):
+                self.assertIsNot(registry.get_registry(), first)
+        self.assertEqual(load.call_count, 2)
+
+
+class ConnectionPoolTest(TestCase):
+    """프로세스 단위 엔진의 TimedQueuePool 체크아웃 통계와 pool_status()를 확인합니다."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(COTDEX_DB_ENGINE={
+            'URL': f"sqlite:///{os.path.join(directory.name, 'pool.sqlite3')}",
+            'POOL_SIZE': 2,
+            'MAX_OVERFLOW': 0,
+            'POOL_TIMEOUT': 0.1,
+        })
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for name, value in (('_engine', None), ('_engine_pid', None), ('_stats', PoolStats())):
+            patcher = mock.patch.object(db, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: db._engine is not None and db._engine.dispose())
+
+    def test_shared_engine(self):
+        engine = get_db_connection()
+        self.assertIs(get_db_connection(), engine)
+        self.assertIsInstance(engine.pool, TimedQueuePool)
+
+    def test_checkout_and_status(self):
+        engine = get_db_connection()
+        with engine.connect(), engine.connect():
+            status = pool_status()
+            self.assertEqual((status['pool_size'], status['checked_out']), (2, 2))
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+        status = pool_status()
+        self.assertEqual((status['checkouts'], status['connects'], status['timeouts']), (2, 2, 1))
+        self.assertEqual((status['checked_out'], status['checked_in']), (0, 2))
+        # 시간 초과된 체크아웃은 POOL_TIMEOUT만큼 기다림
+        self.assertGreaterEqual(status['wait_max_ms'], 90)
+
+
+class GraphDataTest(SnapshotMixin, TestCase):
+    """graph_data의 ETag와 If-None-Match(304) 처리를 확인합니다."""
+
+    params = {'follow_up': 1, 'rr_values_min': -5, 'rr_values_max': 5,
+              'chisq_p_values': 1, 'fisher_p_values': 1}
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(get_user_model().objects.create_user('tester'))
+
+    def get(self, params, **headers):
+        return self.client.get(reverse('graph_data'), params, **headers)
+
+    def test_not_modified(self):
+        response = self.get(self.params)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        again = self.get(self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], etag)
+        self.assertEqual(again.content, b'')
+
+    def test_etag_follows_params(self):
+        etag = self.get(self.params)['ETag']
+        response = self.get({**self.params, 'rr_values_min': 0.5}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_payload(self):
+        data = self.get(self.params).json()
+        self.assertEqual(edge_set(data['edges']), edge_set(legacy_elements(edge_frame(), node_frame())[1]))
+
+    def test_etag_quantizes_thresholds(self):
+        etag = self.get({**self.params, 'chisq_p_values': 0.05})['ETag']
+        near = self.get({**self.params, 'chisq_p_values': 0.0500001})
+        self.assertEqual(near['ETag'], etag)
+        # 같은 키의 캐시된 응답이므로 실제로 적용된 임계값은 처음 요청의 값
+        self.assertEqual(near.json()['thresholds']['chisq_p_values'], 0.05)
+        other = self.get({**self.params, 'chisq_p_values': 0.051})
+        self.assertNotEqual(other['ETag'], etag)
+        self.assertEqual(other.json()['thresholds']['chisq_p_values'], 0.051)
+
+
+class StreamElementsTest(TestCase):
+    """stream_elements()의 NDJSON 청크 순서와, 이어 붙인 결과가 build_elements()와 같은지 확인합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, random_edge_frame())
+        self.table = NodeTable.from_frame(node_frame())
+        self.rows = self.partition.select(0.5, 4.0, 0.8, 0.8)
+
+    def lines(self, rows, chunk_size=16):
+        p = self.partition
+        return [json.loads(line) for line in stream_elements(
+            p.cause[rows], p.outcome[rows], p.rr[rows], self.table, codes=p.codes, chunk_size=chunk_size)]
+
+    def test_chunks_strongest_first(self):
+        *chunks, done = self.lines(self.rows)
+        self.assertEqual(len(chunks), math.ceil(len(self.rows) / 16))
+        self.assertTrue(all(len(chunk['edges']) <= 16 for chunk in chunks))
+        weights = [edge['data']['weight'] for chunk in chunks for edge in chunk['edges']]
+        self.assertEqual(weights, sorted(weights, reverse=True))
+
+        seen = set()
+        for chunk in chunks:
+            # 노드는 처음 등장하는 청크에만, 엣지보다 먼저 나옴
+            ids = [node['data']['id'] for node in chunk['nodes']]
+            self.assertTrue(seen.isdisjoint(ids))
+            seen.update(ids)
+            for edge in chunk['edges']:
+                self.assertIn(edge['data']['source'], seen)
+                self.assertIn(edge['data']['target'], seen)
+        self.assertEqual(done, {"done": True, "node_count": len(seen), "edge_count": len(self.rows)})
+
+    def test_reassembled_matches_build_elements(self):
+        *chunks, _ = self.lines(self.rows)
+        p, rows = self.partition, self.rows
+        nodes, edges, _ = build_elements(p.codes[p.cause[rows]], p.codes[p.outcome[rows]], p.rr[rows],
+                                         self.table)
+        self.assertEqual(node_map([node for chunk in chunks for node in chunk['nodes']]), node_map(nodes))
+        self.assertEqual(edge_set([edge for chunk in chunks for edge in chunk['edges']]), edge_set(edges))
+
+    def test_empty(self):
+        self.assertEqual(self.lines(self.rows[:0]), [{"done": True, "node_count": 0, "edge_count": 0}])
+
+
+class WireRoundTripTest(TestCase):
+    """encode_elements() → decode_elements()가 JSON payload(build_elements)와 같은 요소를 복원하는지 확인합니다."""
+
+    def setUp(self):
+        self.df = edge_frame()
+        self.table = NodeTable.from_frame(node_frame())
+
+    def assertSameElements(self, decoded, expected):
+        nodes, edges = decoded
+        expected_nodes, expected_edges = expected
+        self.assertEqual(node_map(nodes), node_map(expected_nodes))
+        self.assertEqual(len(edges), len(expected_edges))
+        for edge, other in zip(sorted(edges, key=lambda e: (e['data']['source'], e['data']['target'])),
+                               sorted(expected_edges, key=lambda e: (e['data']['source'], e['data']['target']))):
+            self.assertEqual(edge['data']['source'], other['data']['source'])
+            self.assertEqual(edge['data']['target'], other['data']['target'])
+            # weight는 float32로 전송
+            self.assertAlmostEqual(edge['data']['weight'], other['data']['weight'], places=6)
+
+    def test_round_trip_matches_json(self):
+        cause, outcome = self.df['cause_abb'].to_numpy(), self.df['outcome_abb'].to_numpy()
+        rr = self.df['rr_values'].to_numpy()
+        pinned = {'A01': {'x': 0, 'y': 0}}
+        for clip in (None, (1, 10)):
+            with self.subTest(weight_clip=clip):
+                nodes, edges, _ = build_elements(cause, outcome, rr, self.table, weight_clip=clip, pinned=pinned)
+                data = encode_elements(cause, outcome, rr, self.table, weight_clip=clip, pinned=pinned)
+                self.assertSameElements(decode_elements(data), (nodes, edges))
+
+    def test_round_trip_with_positions(self):
+        cause, outcome = self.df['cause_abb'].to_numpy(), self.df['outcome_abb'].to_numpy()
+        rr = self.df['rr_values'].to_numpy()
+        pinned = {'A01': {'x': 0, 'y': 0}}
+        positions = {'B02': {'x': 10.5, 'y': -3.0}, 'C03': {'x': 1.0, 'y': 2.0}}
+        nodes, edges, _ = build_elements(cause, outcome, rr, self.table, pinned=pinned, positions=positions)
+        data = encode_elements(cause, outcome, rr, self.table, pinned=pinned, positions=positions)
+        self.assertSameElements(decode_elements(data), (nodes, edges))
+
+    def test_round_trip_with_code_dictionary(self):
+        partition = EdgePartition.from_frame(1, self.df)
+        idx = partition.select(1.0, 5.0, 0.5, 0.5)
+        data = encode_elements(partition.cause[idx], partition.outcome[idx], partition.rr[idx], self.table,
+                               codes=partition.codes)
+        frame = partition.frame(idx)
+        nodes, edges, _ = build_elements(frame['cause_abb'].to_numpy(), frame['outcome_abb'].to_numpy(),
+                                         frame['rr_values'].to_numpy(), self.table)
+        self.assertSameElements(decode_elements(data), (nodes, edges))
+
+    def test_empty_graph(self):
+        empty = np.empty(0, dtype=str)
+        self.assertEqual(decode_elements(encode_elements(empty, empty, np.empty(0), self.table)), ([], []))
+
+    def test_wide_index(self):
+        n = np.iinfo(np.uint16).max + 10
+        cause = np.array([f"N{i:06d}" for i in range(n)])
+        outcome = np.full(n, 'A01')
+        data = encode_elements(cause, outcome, np.full(n, 2.0), self.table)
+        self.assertTrue(data[5] & FLAG_WIDE_INDEX)
+        nodes, edges = decode_elements(data)
+        self.assertEqual(len(nodes), n + 1)
+        self.assertEqual((edges[-1]['data']['source'], edges[-1]['data']['target']), (cause[-1], 'A01'))
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            decode_elements(b'XXXX' + bytes(16))
+
+
+def apply_delta(nodes, edges, delta):
+    """델타 payload를 이전 노드/엣지 목록에 적용합니다 (클라이언트 graph_delta.js와 같은 순서)."""
+    removed_nodes = set(delta['removed']['nodes'])
+    removed_edges = {tuple(edge) for edge in delta['removed']['edges']}
+    nodes = [n for n in nodes if n['data']['id'] not in removed_nodes] + delta['added']['nodes']
+    edges = [e for e in edges
+             if (e['data']['source'], e['data']['target']) not in removed_edges
+             and e['data']['source'] not in removed_nodes and e['data']['target'] not in removed_nodes]
+    return nodes, edges + delta['added']['edges']
+
+
+class DeltaElementsTest(TestCase):
+    """이전 선택의 payload에 delta_elements()를 적용하면 현재 선택의 전체 payload가 되는지 확인합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, random_edge_frame())
+        self.table = NodeTable.from_frame(node_frame())
+
+    def full(self, rows):
+        p = self.partition
+        nodes, edges, _ = build_elements(p.codes[p.cause[rows]], p.codes[p.outcome[rows]], p.rr[rows],
+                                         self.table)
+        return nodes, edges
+
+    def delta(self, rows, prev_rows, **kwargs):
+        p = self.partition
+        return delta_elements(p.cause, p.outcome, p.rr, rows, prev_rows, self.table, codes=p.codes, **kwargs)
+
+    def test_reconstructs_current_payload(self):
+        thresholds = [
+            (1.0, 2.0, 0.5, 0.5), (1.1, 2.0, 0.5, 0.5), (0.5, 4.0, 1.0, 1.0),
+            (2.5, 3.0, 0.05, 0.05), (5.0, 6.0, 1.0, 1.0), (0.5, 1.5, 0.2, 0.9),
+        ]
+        for before in thresholds:
+            for after in thresholds:
+                with self.subTest(before=before, after=after):
+                    prev_rows, rows = self.partition.select(*before), self.partition.select(*after)
+                    nodes, edges = apply_delta(*self.full(prev_rows), self.delta(rows, prev_rows))
+                    expected_nodes, expected_edges = self.full(rows)
+                    self.assertEqual(node_map(nodes), node_map(expected_nodes))
+                    self.assertEqual(edge_set(edges), edge_set(expected_edges))
+
+    def test_same_selection_is_empty(self):
+        rows = self.partition.select(1.0, 2.0, 0.5, 0.5)
+        delta = self.delta(rows, rows)
+        self.assertEqual(delta['added'], {"nodes": [], "edges": []})
+        self.assertEqual(delta['removed'], {"nodes": [], "edges": []})
+
+    def test_positions_included(self):
+        rows = self.partition.select(1.0, 2.0, 0.5, 0.5)
+        positions = {'A00': {'x': 1.0, 'y': 2.0}}
+        self.assertEqual(self.delta(rows, rows[:0], positions=positions)['positions'], positions)
+        self.assertNotIn('positions', self.delta(rows, rows[:0]))
+
+
+class ThresholdCubeTest(TestCase):
+    """격자 위 임계값의 큐브 추정치를 파티션 전체를 센 값(brute force)과 비교합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, random_edge_frame(n_codes=40, n_edges=800, seed=2))
+        self.cube = ThresholdCube.from_partition(self.partition, version='test')
+
+    def brute(self, values, rr_min, rr_max, chisq_max, fisher_max):
+        """큐브와 같은 규칙 (rr_min 초과, rr_max 이하, p-value 이하)으로 센 엣지/노드 수."""
+        p = self.partition
+        mask = ((values > np.float32(rr_min)) & (values <= np.float32(rr_max))
+                & (p.chisq <= np.float32(chisq_max)) & (p.fisher <= np.float32(fisher_max)))
+        nodes = np.unique(np.concatenate([p.cause[mask], p.outcome[mask]]))
+        return {"edges": int(mask.sum()), "nodes": len(nodes)}
+
+    def test_on_grid_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        for column, values, grid in (('rr_values', self.partition.rr, RR_GRID),
+                                     ('log_rr_values', self.partition.log_rr, LOG_RR_GRID)):
+            for _ in range(50):
+                lo, hi = np.sort(rng.choice(len(grid), 2))
+                chisq_max, fisher_max = rng.choice(P_LEVELS, 2)
+                case = (float(grid[lo]), float(grid[hi]), float(chisq_max), float(fisher_max))
+                with self.subTest(column=column, case=case):
+                    estimate = self.cube.estimate(*case, rr_column=column)
+                    self.assertTrue(estimate.pop('exact'))
+                    self.assertEqual(estimate, self.brute(values, *case))
+
+    def test_empty_range(self):
+        self.assertEqual(self.cube.estimate(2.0, 1.0, 1.0, 1.0), {"edges": 0, "nodes": 0, "exact": True})
+
+    def test_off_grid_is_approximate(self):
+        for case in [(1.01, 2.0, 1.0, 1.0), (1.0, 2.0, 0.3, 1.0), (-1.0, 2.0, 1.0, 1.0), (1.0, 20.0, 1.0, 1.0)]:
+            with self.subTest(case=case):
+                self.assertFalse(self.cube.estimate(*case)['exact'])
+
+    def test_out_of_grid_bounds_cover_all_edges(self):
+        estimate = self.cube.estimate(-1.0, 100.0, 1.0, 1.0)
+        self.assertEqual(estimate['edges'], len(self.partition))
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.cube.estimate(1.0, 2.0, 1.0, 1.0, rr_column='chisq')
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cube.npz')
+            write_cube(self.cube, path, version='test')
+            loaded = read_cube(path, follow_up=1, version='test')
+        for column in self.cube.axes:
+            np.testing.assert_array_equal(loaded.axes[column].edges, self.cube.axes[column].edges)
+            np.testing.assert_array_equal(loaded.axes[column].nodes, self.cube.axes[column].nodes)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'graph-test': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'graph-test'},
+})
+class GraphCacheTest(TestCase):
+    """GraphCache의 바이트 예산 LRU 삭제와 히트/미스 통계를 확인합니다."""
+
+    def setUp(self):
+        # 압축되지 않는 1,000바이트 payload 두 개(약 1 KB씩)까지 들어가는 예산
+        self.cache = GraphCache('graph-test', max_bytes=2500)
+        self.addCleanup(self.cache.clear)
+        rng = np.random.default_rng(0)
+        self.payloads = {key: rng.bytes(1000) for key in ('a', 'b', 'c')}
+
+    def test_evicts_least_recently_used(self):
+        for key in ('a', 'b'):
+            self.cache.set(key, self.payloads[key])
+        self.assertEqual(self.cache.get('a'), self.payloads['a'])
+        self.cache.set('c', self.payloads['c'])
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), self.payloads['a'])
+        self.assertEqual(self.cache.get('c'), self.payloads['c'])
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['entries']), (3, 1, 1, 2))
+        self.assertLessEqual(stats['bytes'], stats['max_bytes'])
+
+    def test_over_budget_is_not_stored(self):
+        self.assertIsNone(self.cache.set('big', np.random.default_rng(1).bytes(3000)))
+        self.assertIsNone(self.cache.get('big'))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_get_or_build(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return b'{"nodes": []}'
+
+        params = {'follow_up': 1, 'rr_values_min': 0.0, 'rr_values_max': 2.0,
+                  'chisq_p_values': 0.05, 'fisher_p_values': 0.05}
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_build('main', 'json', params, build), b'{"nodes": []}')
+        self.assertEqual(len(builds), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (2, 1, 0.6667))
+
+
+class WarmGraphCacheTest(SnapshotMixin, TestCase):
+    """warm_graph_cache 명령이 기본 프리셋 payload를 그래프 캐시에 미리 넣는지 확인합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.graph_cache = GraphCache()
+        patcher = mock.patch('network.graph_cache._cache', self.graph_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def warm(self, *follow_ups):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('warm_graph_cache', follow_ups=list(follow_ups), workers=1, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_main_presets(self):
+        self.warm(1, 2)
+        for follow_up in (1, 2):
+            params = {'follow_up': follow_up, **MAIN_DEFAULTS}
+            with self.subTest(follow_up=follow_up):
+                cached = self.graph_cache.get(GraphCache.key('main', 'json', params))
+                self.assertEqual(json.loads(cached), json.loads(views.main_network_bytes('json', **params)))
+                self.assertIsNotNone(self.graph_cache.get(GraphCache.key('main', 'binary', params)))
+
+    def test_skips_unserved_follow_ups(self):
+        user = get_user_model().objects.create_user('tester')
+        thresholds = {'rr_min': 1.1, 'rr_max': 1.3, 'chisq_p': 0.5, 'fisher_p': 0.5}
+        stale = UserGraph.objects.create(user=user, title='old', fu=99, disease_names='A01', **thresholds)
+        UserGraph.objects.create(user=user, title='saved', fu=1, disease_names='A01', **thresholds)
+
+        _, stderr = self.warm(1, 7)
+        self.assertIn(f"UserGraph {stale.pk}", stderr)
+        self.assertIn("follow-up 7", stderr)
+        params = {'disease': 'A01', 'follow_up': 1, 'rr_values_min': 1.1, 'rr_values_max': 1.3,
+                  'chisq_p_values': 0.5, 'fisher_p_values': 0.5}
+        self.assertIsNotNone(self.graph_cache.get(GraphCache.key('single', 'json', params)))
+
+
+class AdjacencyTest(TestCase):
+    """CSR 인접 인덱스의 조회 결과를 파티션 전체 마스크(brute force)와 비교합니다."""
+
+    def setUp(self):
+        df = random_edge_frame(seed=1)
+        # 자기 자신으로 가는 엣지 하나 추가 (같은 쌍이 이미 있으면 대체)
+        code = df['cause_abb'].iloc[0]
+        loop = df.iloc[[0]].assign(outcome_abb=code)
+        df = pd.concat([df[(df['cause_abb'] != code) | (df['outcome_abb'] != code)], loop])
+        self.partition = EdgePartition.from_frame(1, df)
+        self.adjacency = Adjacency(self.partition)
+        self.thresholds = [(0.5, 4.0, 1.0, 1.0), (1.0, 2.0, 0.5, 0.5), (1.25, 1.25, 1.0, 1.0), (3.5, 9.0, 0.1, 0.9)]
+
+    def brute_rows(self, code, rr_min, rr_max, chisq_max, fisher_max, direction='both'):
+        p = self.partition
+        node = p.code_id(code)
+        mask = ((p.rr >= np.float32(rr_min)) & (p.rr <= np.float32(rr_max))
+                & (p.chisq <= np.float32(chisq_max)) & (p.fisher <= np.float32(fisher_max)))
+        ends = {'out': p.cause == node, 'in': p.outcome == node,
+                'both': (p.cause == node) | (p.outcome == node)}[direction]
+        return np.flatnonzero(mask & ends)
+
+    def test_edge_rows_match_select(self):
+        for code in self.partition.codes.tolist():
+            for case in self.thresholds:
+                with self.subTest(code=code, case=case):
+                    np.testing.assert_array_equal(self.adjacency.edge_rows(code, *case),
+                                                  self.partition.select(*case, code=code))
+                    for direction in ('out', 'in'):
+                        np.testing.assert_array_equal(self.adjacency.edge_rows(code, *case, direction=direction),
+                                                      self.brute_rows(code, *case, direction=direction))
+
+    def test_neighbors(self):
+        p = self.partition
+        for code in p.codes.tolist():
+            rows = self.brute_rows(code, *self.thresholds[0])
+            others = np.concatenate([p.cause[rows], p.outcome[rows]])
+            expected = np.unique(p.codes[others[others != p.code_id(code)]])
+            with self.subTest(code=code):
+                np.testing.assert_array_equal(self.adjacency.neighbors(code, *self.thresholds[0]), expected)
+
+    def test_neighbor_edges_sorted_without_duplicates(self):
+        for code in self.partition.codes.tolist():
+            rows, _, _ = self.adjacency.neighbor_edges(code, *self.thresholds[0], sort='-rr')
+            with self.subTest(code=code):
+                self.assertEqual(sorted(rows.tolist()), self.brute_rows(code, *self.thresholds[0]).tolist())
+                self.assertTrue(np.all(np.diff(self.partition.rr[rows]) <= 0))
+
+    def test_unknown_code(self):
+        self.assertEqual(len(self.adjacency.edge_rows('ZZZ', *self.thresholds[0])), 0)
+        self.assertEqual(len(self.adjacency.neighbors('ZZZ', *self.thresholds[0])), 0)
+
+
+class CommonSubgraphTest(TestCase):
+    """비트셋 공통 이웃 부분 그래프를 기존 sub_disease_graph의 set.intersection 계산과 비교합니다."""
+
+    def setUp(self):
+        self.df = random_edge_frame(n_codes=30, n_edges=250, seed=4)
+        self.partition = EdgePartition.from_frame(1, self.df)
+        self.band = (1.0, 3.0, 0.7, 0.7)
+        self.bitsets = NeighborBitsets(Adjacency(self.partition), self.band)
+
+    def legacy_edges(self, code_list, at_least=None):
+        """기존 계산 (at_least 지정 시 그 수 이상의 선택 질병과 연결된 노드를 공통 이웃으로 봄)."""
+        df = legacy_filter(self.df, *self.band)
+        connected_sets = [set(df[df['cause_abb'] == code]['outcome_abb']) |
+                          set(df[df['outcome_abb'] == code]['cause_abb']) for code in code_list]
+        if at_least is None:
+            common_connected = set.intersection(*connected_sets)
+        else:
+            common_connected = {node for node in set.union(*connected_sets)
+                                if sum(node in connected for connected in connected_sets) >= at_least}
+        target_nodes = common_connected | set(code_list)
+        df = df[(df['cause_abb'].isin(target_nodes)) & (df['outcome_abb'].isin(target_nodes))]
+        return sorted(zip(df['cause_abb'], df['outcome_abb']))
+
+    def found_edges(self, codes, at_least=None):
+        frame = self.partition.frame(self.bitsets.common_subgraph(codes, at_least))
+        return sorted(zip(frame['cause_abb'], frame['outcome_abb']))
+
+    def test_common_neighbours(self):
+        rng = np.random.default_rng(5)
+        codes = self.partition.codes.tolist()
+        for size in (1, 2, 3):
+            for _ in range(10):
+                selected = rng.choice(codes, size=size, replace=False).tolist()
+                with self.subTest(codes=selected):
+                    self.assertEqual(self.found_edges(selected), self.legacy_edges(selected))
+
+    def test_min_shared(self):
+        rng = np.random.default_rng(6)
+        codes = self.partition.codes.tolist()
+        for size in (2, 3, 4):
+            selected = rng.choice(codes, size=size, replace=False).tolist()
+            for at_least in range(1, size + 2):
+                with self.subTest(codes=selected, at_least=at_least):
+                    self.assertEqual(self.found_edges(selected, at_least), self.legacy_edges(selected, at_least))
+
+    def test_unknown_code(self):
+        selected = [self.partition.codes[0], 'ZZZ']
+        self.assertEqual(self.found_edges(selected), self.legacy_edges(selected))
+
+
+class ConnectivityIndexTest(TestCase):
+    """union-find 연결성 인덱스의 결과를 networkx.has_path와 비교합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, random_edge_frame(n_codes=40, n_edges=120, seed=5))
+
+    def graph(self, rr_min, rr_max, chisq_max, fisher_max):
+        p = self.partition
+        rows = p.select(rr_min, rr_max, chisq_max, fisher_max)
+        graph = nx.Graph()
+        graph.add_nodes_from(p.codes.tolist())
+        graph.add_edges_from(zip(p.codes[p.cause[rows]].tolist(), p.codes[p.outcome[rows]].tolist()))
+        return graph
+
+    def test_matches_has_path(self):
+        rng = np.random.default_rng(6)
+        codes = self.partition.codes.tolist()
+        for band in [(4.0, 1.0, 1.0), (2.5, 0.5, 0.9), (3.0, 0.2, 0.2)]:
+            index = ConnectivityIndex(self.partition, band)
+            for rr_min in (0.5, 1.0, 1.5, 2.0):
+                graph = self.graph(rr_min, *band)
+                for _ in range(20):
+                    selected = rng.choice(codes, size=rng.integers(2, 5), replace=False).tolist()
+                    expected = all(nx.has_path(graph, selected[0], other) for other in selected[1:])
+                    with self.subTest(band=band, rr_min=rr_min, codes=selected):
+                        self.assertEqual(index.connected(selected, rr_min), expected)
+
+    def test_unknown_code(self):
+        index = ConnectivityIndex(self.partition, (4.0, 1.0, 1.0))
+        self.assertFalse(index.connected([self.partition.codes[0], 'ZZZ'], 0.5))
+
+
+class SpanningForestTest(TestCase):
+    """최대 신장 숲의 병목 RR을 RR 하한을 차례로 낮춰 보는 brute force 탐색과 비교합니다."""
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, random_edge_frame(n_codes=40, n_edges=150, seed=7))
+
+    def scan(self, codes, chisq_max, fisher_max):
+        """선택 질병들이 한 컴포넌트가 되는 가장 큰 RR 하한 (연결할 수 없으면 None)."""
+        p = self.partition
+        keep = (p.chisq <= np.float32(chisq_max)) & (p.fisher <= np.float32(fisher_max))
+        for rr_min in np.unique(p.rr[keep])[::-1]:
+            rows = np.flatnonzero(keep & (p.rr >= rr_min))
+            graph = nx.Graph()
+            graph.add_nodes_from(codes)
+            graph.add_edges_from(zip(p.codes[p.cause[rows]].tolist(), p.codes[p.outcome[rows]].tolist()))
+            if all(nx.has_path(graph, codes[0], other) for other in codes[1:]):
+                return rr_min
+        return None
+
+    def test_bottleneck_matches_threshold_scan(self):
+        rng = np.random.default_rng(8)
+        p = self.partition
+        for chisq_max, fisher_max in [(0.5, 0.5), (0.9, 0.9), (0.05, 0.5)]:
+            forest = SpanningForest(p, chisq_max, fisher_max)
+            for _ in range(20):
+                ids = rng.choice(len(p.codes), size=rng.integers(2, 4), replace=False).tolist()
+                expected = self.scan(p.codes[ids].tolist(), chisq_max, fisher_max)
+                found = forest.suggest(ids)
+                with self.subTest(p_values=(chisq_max, fisher_max), ids=ids):
+                    if expected is None:
+                        self.assertIsNone(found)
+                        continue
+                    self.assertEqual(found['rr_min'], float(expected))
+                    self.assertTrue(found['bottleneck'])
+                    self.assertTrue(all(p.rr[row] == expected for row in found['bottleneck']))
+
+
+class SuggestThresholdsTest(SnapshotMixin, TestCase):
+    """suggest_thresholds()가 제안한 조건에서 선택 질병들이 실제로 연결되는지 확인합니다."""
+
+    frames = {1: random_edge_frame(n_codes=40, n_edges=150, seed=7)}
+    modules = (snapshot, registry, connectivity)
+
+    def test_suggestions_connect(self):
+        rng = np.random.default_rng(9)
+        codes = snapshot.get_partition(1).codes.tolist()
+        for _ in range(10):
+            selected = rng.choice(codes, size=3, replace=False).tolist()
+            suggestions = connectivity.suggest_thresholds(selected, 1)
+            for s in suggestions:
+                with self.subTest(codes=selected, suggestion=s):
+                    self.assertTrue(connectivity.is_connected(
+                        selected, 1, s['rr_min'], s['rr_max'], s['chisq_max'], s['fisher_max']))
+                    # 다른 제안보다 RR 하한과 p-value가 모두 느슨한 제안은 없음
+                    self.assertFalse(any(
+                        other is not s and other['rr_min'] >= s['rr_min']
+                        and other['chisq_max'] <= s['chisq_max'] and other['fisher_max'] <= s['fisher_max']
+                        for other in suggestions))
+
+    def test_unknown_code(self):
+        self.assertEqual(connectivity.suggest_thresholds(['ZZZ', 'A00'], 1), [])
+
+    def test_forest_built_once(self):
+        with mock.patch('network.connectivity.SpanningForest', wraps=SpanningForest) as build:
+            forests = [connectivity.get_forest(1, 0.5, 0.5) for _ in range(3)]
+            self.assertEqual(build.call_count, 1)
+            self.assertIs(forests[0], forests[-1])
+            snapshot.clear()
+            self.assertIsNot(connectivity.get_forest(1, 0.5, 0.5), forests[0])
+            self.assertEqual(build.call_count, 2)
+
+
+class PubmedClientTest(TestCase):
+    """FakeBackend로 PubmedClient의 동시 요청 합치기와 결과 캐시를 확인합니다."""
+
+    def test_coalesces_concurrent_requests(self):
+        backend = FakeBackend(latency=0.2)
+        client = PubmedClient(backend)
+        barrier = threading.Barrier(8)
+
+        def search(_):
+            barrier.wait()
+            return client.search('Asthma AND Obesity')
+
+        with mock.patch.object(backend, 'search', wraps=backend.search) as backend_search:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(search, range(8)))
+        backend_search.assert_called_once_with('Asthma AND Obesity', client.retmax)
+        self.assertTrue(all(result == results[0] for result in results))
+        stats = client.stats()
+        self.assertEqual((stats['misses'], stats['coalesced']), (1, 7))
+
+    def test_cache_hit(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        client = PubmedClient(FakeBackend(), cache=ResultCache(directory.name, ttl=60, max_entries=10))
+        first = client.search('Asthma')
+        calls = client.backend.calls
+        self.assertEqual(client.search('Asthma'), first)
+        self.assertEqual(client.backend.calls, calls)
+        self.assertEqual((client.stats()['hits'], client.stats()['misses']), (1, 1))
+
+
+class ResultCacheTest(TestCase):
+    """PubMed 결과 디스크 캐시의 TTL 만료를 확인합니다."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(self.directory, ttl=60, max_entries=10)
+        now = time.time()
+        papers = [{"title": "Asthma (1)", "url": "https://pubmed.ncbi.nlm.nih.gov/1/"}]
+        with mock.patch('network.pubmed.time.time', return_value=now):
+            cache.set('5|Asthma', papers)
+        with mock.patch('network.pubmed.time.time', return_value=now + 59):
+            self.assertEqual(cache.get('5|Asthma'), papers)
+        with mock.patch('network.pubmed.time.time', return_value=now + 61):
+            self.assertIsNone(cache.get('5|Asthma'))
+        self.assertEqual(len(cache), 0)
+
+    def test_prune_keeps_recently_used(self):
+        cache = ResultCache(self.directory, ttl=60, max_entries=3)
+        clock = itertools.count(1000)
+        with mock.patch('network.pubmed.time.time', side_effect=lambda: float(next(clock))):
+            for i in range(5):
+                cache.set(f'k{i}', [i])
+            cache.get('k0')
+            cache.prune()
+            self.assertEqual([cache.get(f'k{i}') for i in range(5)], [[0], None, None, [3], [4]])
+
+    def test_prunes_every_interval(self):
+        with mock.patch.object(ResultCache, 'PRUNE_INTERVAL', 4):
+            cache = ResultCache(self.directory, ttl=60, max_entries=2)
+            for i in range(4):
+                cache.set(f'k{i}', [i])
+            self.assertEqual(len(cache), 2)
+            for i in range(4, 7):
+                cache.set(f'k{i}', [i])
+            self.assertEqual(len(cache), 5)
+
+
+class TokenBucketTest(TestCase):
+    """TokenBucket이 burst 이후 초당 rate개로 호출 속도를 제한하는지 확인합니다."""
+
+    def test_pacing(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(2):
+            self.assertTrue(bucket.acquire())
+        self.assertEqual(bucket.waited, 0)
+        for _ in range(3):
+            self.assertTrue(bucket.acquire())
+        # burst 뒤의 토큰 3개는 1/50초마다 하나씩 채워짐
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertGreater(bucket.waited, 0)
+
+    def test_timeout(self):
+        bucket = TokenBucket(rate=1)
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0.1))
+
+
+class PrefetchPubmedTest(TransactionTestCase):
+    """prefetch_pubmed의 체크포인트(PubmedResult)와 중단된 실행 이어가기를 확인합니다."""
+
+    def setUp(self):
+        self.command = prefetch_pubmed.Command(stdout=StringIO(), stderr=StringIO())
+
+    def test_pending_skips_saved_terms(self):
+        PubmedResult.objects.create(term='a', results=[], retmax=5)
+        PubmedResult.objects.create(term='b', results=[], retmax=3)
+        PubmedResult.objects.create(term='c', results=[], retmax=5)
+        PubmedResult.objects.filter(term='c').update(fetched_at=timezone.now() - timedelta(days=30))
+        terms = ['a', 'b', 'c', 'd']
+        # b는 저장 당시 retmax가 작아서, c는 max_age보다 오래되어서 다시 조회
+        self.assertEqual(self.command.pending(terms, None, 5), ['b', 'd'])
+        self.assertEqual(self.command.pending(terms, 7, 5), ['b', 'c', 'd'])
+
+    def test_resume(self):
+        backend = FakeBackend()
+        terms = [f"term {i}" for i in range(12)]
+        # 처음 실행이 5개만 저장하고 중단된 경우
+        self.assertEqual(asyncio.run(self.command.prefetch(backend, terms[:5], 5, 3, 4)), (5, 0))
+        pending = self.command.pending(terms, None, 5)
+        self.assertEqual(pending, terms[5:])
+
+        self.assertEqual(asyncio.run(self.command.prefetch(backend, pending, 5, 3, 4)), (7, 0))
+        self.assertEqual(self.command.pending(terms, None, 5), [])
+        for term in terms:
+            with self.subTest(term=term):
+                self.assertEqual(stored_results(term, 5), FakeBackend().search(term, 5))
+
+
+class DiseaseNeighborsTest(SnapshotMixin, TestCase):
+    """get_disease_neighbors의 cursor/limit 페이지네이션을 확인합니다."""
+
+    params = {'follow_up': 2, 'rr_values_min': 0.5, 'rr_values_max': 4.0,
+              'chisq_p_values': 1, 'fisher_p_values': 1}
+
+    def get(self, **params):
+        return self.client.get(reverse('get_disease_neighbors'), {**self.params, **params})
+
+    def pages(self, limit, **params):
+        neighbors, cursor = [], None
+        while True:
+            response = self.get(limit=limit, **params, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data['neighbors']), limit)
+            neighbors += data['neighbors']
+            cursor = data['next_cursor']
+            if cursor is None:
+                return neighbors, data['total']
+
+    def test_pages_without_duplicates_or_gaps(self):
+        for disease in ('A00', 'K10'):
+            expected = self.get(disease=disease, limit=500).json()
+            self.assertIsNone(expected['next_cursor'])
+            for limit in (1, 7, 50):
+                for sort in ('-rr', 'code'):
+                    with self.subTest(disease=disease, limit=limit, sort=sort):
+                        neighbors, total = self.pages(limit, disease=disease, sort=sort)
+                        self.assertEqual(total, expected['total'])
+                        self.assertEqual(len({(n['code'], n['direction']) for n in neighbors}), total)
+                        if sort == '-rr':
+                            self.assertEqual(neighbors, expected['neighbors'])
+
+    def test_bad_cursor(self):
+        cursor = self.get(disease='A00', limit=5).json()['next_cursor']
+        self.assertEqual(self.get(disease='A00', limit=5, cursor=cursor).status_code, 200)
+        for params in ({'cursor': 'garbage'}, {'cursor': cursor, 'disease': 'K10'},
+                       {'cursor': cursor, 'rr_values_min': 1.0}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**{'disease': 'A00', 'limit': 5, **params}).status_code, 400)
+
+
+class SparsifyTest(TestCase):
+    """희소화 방식별로 남는 엣지를 손으로 계산한 결과와 비교합니다."""
+
+    ROWS = [
+        # cause, outcome, rr
+        ('A01', 'B02', 4.0),
+        ('A01', 'C03', 3.0),
+        ('A01', 'D04', 1.0),
+        ('B02', 'C03', 2.0),
+        ('C03', 'D04', 0.5),
+        ('E05', 'D04', 1.5),
+    ]
+
+    def setUp(self):
+        self.partition = EdgePartition.from_frame(1, edge_frame([
+            (cause, outcome, rr, float(np.log(rr)), 0.01, 0.01) for cause, outcome, rr in self.ROWS
+        ]))
+        self.rows = self.partition.select(0.0, 10.0, 1.0, 1.0)
+
+    def kept(self, mode, **kwargs):
+        frame = self.partition.frame(sparsify(self.partition, self.rows, mode, **kwargs))
+        return set(zip(frame['cause_abb'], frame['outcome_abb']))
+
+    def test_top(self):
+        self.assertEqual(self.kept('top', sparsify_k=2), {('A01', 'B02'), ('A01', 'C03')})
+        self.assertEqual(len(self.kept('top', sparsify_k=10)), len(self.ROWS))
+
+    def test_node_top(self):
+        # 나가는 엣지 상위 1개: A→B, B→C, C→D, E→D / 들어오는 엣지 상위 1개: A→B, A→C, E→D
+        self.assertEqual(self.kept('node_top', sparsify_k=1),
+                         {(c, o) for c, o, _ in self.ROWS} - {('A01', 'D04')})
+
+    def test_disparity(self):
+        # 엣지별 p-value (양 끝 중 작은 쪽): A→B 0.25 (A), A→C 0.207 (C), E→D 0.25 (D),
+        # B→C 0.405, A→D 0.444, C→D 0.694. 차수가 1인 E는 판단하지 않음
+        self.assertEqual(self.kept('disparity', sparsify_alpha=0.3),
+                         {('A01', 'B02'), ('A01', 'C03'), ('E05', 'D04')})
+        self.assertEqual(self.kept('disparity', sparsify_alpha=0.21), {('A01', 'C03')})
+
+    def test_backbone(self):
+        # RR 내림차순으로 A→B, A→C를 넣고 B→C는 순환이라 제외, E→D와 A→D로 두 컴포넌트를 연결
+        self.assertEqual(self.kept('backbone'),
+                         {('A01', 'B02'), ('A01', 'C03'), ('E05', 'D04'), ('A01', 'D04')})
+
+    def test_no_mode(self):
+        self.assertIs(sparsify(self.partition, self.rows, None), self.rows)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            sparsify(self.partition, self.rows, 'random')
+
+
+class ComputePositionsTest(TestCase):
+    """서버 레이아웃 좌표 계산의 결정성과 고정/시작 좌표 처리를 확인합니다."""
+
+    def setUp(self):
+        p = EdgePartition.from_frame(1, random_edge_frame(n_codes=30, n_edges=80, seed=8))
+        self.codes = p.codes.tolist()
+        self.source, self.target = p.cause.astype(np.int64), p.outcome.astype(np.int64)
+
+    def compute(self, **kwargs):
+        return layout.compute_positions(self.codes, self.source, self.target, **kwargs)
+
+    def test_deterministic(self):
+        positions = self.compute()
+        self.assertEqual(list(positions), self.codes)
+        self.assertEqual(self.compute(), positions)
+
+    def test_pinned(self):
+        pinned = {'A00': {'x': 0.0, 'y': 0.0}, 'B01': {'x': 300.0, 'y': -150.0}}
+        positions = self.compute(pinned=pinned)
+        self.assertEqual({code: positions[code] for code in pinned}, pinned)
+        self.assertEqual(self.compute(pinned=pinned), positions)
+
+    def test_seed_positions_stay(self):
+        seed = self.compute()
+        new_code = self.codes[-1]
+        del seed[new_code]
+        positions = self.compute(seed=seed)
+        self.assertEqual({code: positions[code] for code in seed}, seed)
+        self.assertIn(new_code, positions)
+
+    @override_settings(GRAPH_LAYOUT={'REQUEST_WORK': (30 * 30 + layout.EDGE_COST * 80) * 25})
+    def test_request_work_cap(self):
+        with mock.patch('network.layout.force_layout', wraps=layout.force_layout) as force:
+            self.assertIsNotNone(self.compute())
+        self.assertEqual(force.call_args.kwargs['iterations'], 25)
+        # 반복 수를 MIN_ITERATIONS보다 줄여야 하면 좌표 없이 응답
+        with override_settings(GRAPH_LAYOUT={'REQUEST_WORK': 1000}):
+            self.assertIsNone(self.compute())
+            with layout.offline():
+                self.assertIsNotNone(self.compute())
+
+
+class TemporalDiffTest(TestCase):
+    """두 follow-up 파티션의 엣지 비교(edge_diff) 상태 분류를 확인합니다."""
+
+
+    BEFORE = [
+        # cause, outcome, rr
+        ('A01', 'B02', 1.5),
+        ('A01', 'C03', 2.0),
+        ('D04', 'A01', 3.0),
+        ('B02', 'C03', 1.25),
+        ('C03', 'C03', 4.0),    # 임계값으로 제외
+    ]
+    AFTER = [
+        ('A01', 'B02', 1.5625),  # |Δ| ≤ 0.1 → persisted
+        ('A01', 'C03', 2.5),     # |Δ| > 0.1 → changed
+        ('B02', 'C03', 1.125),   # |Δ| > 0.1 → changed
+        ('E05', 'A01', 1.75),    # from에 없는 코드 → appeared
+        ('C03', 'B02', 1.5),     # 방향이 반대인 엣지 → appeared
+    ]
+    EXPECTED = {
+        ('A01', 'B02'): ('persisted', 1.5, 1.5625),
+        ('A01', 'C03'): ('changed', 2.0, 2.5),
+        ('B02', 'C03'): ('changed', 1.25, 1.125),
+        ('D04', 'A01'): ('disappeared', 3.0, None),
+        ('E05', 'A01'): ('appeared', None, 1.75),
+        ('C03', 'B02'): ('appeared', None, 1.5),
+    }
+
+    def partition(self, follow_up, rows):
+        return EdgePartition.from_frame(follow_up, edge_frame([
+            (cause, outcome, rr, float(np.log(rr)), 0.01, 0.01) for cause, outcome, rr in rows
+        ]))
+
+    def diff(self, rr_tolerance=0.1):
+        before, after = self.partition(1, self.BEFORE), self.partition(2, self.AFTER)
+        return edge_diff(before, before.select(0.0, 3.5, 1.0, 1.0), after, after.select(0.0, 3.5, 1.0, 1.0),
+                         rr_tolerance)
+
+    def statuses(self, diff):
+        result = {}
+        for cause, outcome, rr_from, rr_to, status in zip(
+                diff.codes[diff.cause].tolist(), diff.codes[diff.outcome].tolist(),
+                diff.rr_from.tolist(), diff.rr_to.tolist(), diff.status.tolist()):
+            result[(cause, outcome)] = (DIFF_STATUSES[status],
+                                        None if np.isnan(rr_from) else rr_from,
+                                        None if np.isnan(rr_to) else rr_to)
+        return result
+
+    def test_categories(self):
+        diff = self.diff()
+        self.assertEqual(self.statuses(diff), self.EXPECTED)
+        self.assertEqual(diff.counts(), {'appeared': 2, 'disappeared': 1, 'persisted': 1, 'changed': 2})
+
+    def test_sorted_by_edge(self):
+        diff = self.diff()
+        keys = diff.cause * len(diff.codes) + diff.outcome
+        self.assertTrue(np.all(np.diff(keys) > 0))
+
+    def test_tolerance(self):
+        statuses = self.statuses(self.diff(rr_tolerance=1.0))
+        self.assertEqual({edge: status for edge, (status, _, _) in statuses.items() if status != 'appeared'},
+                         {('A01', 'B02'): 'persisted', ('A01', 'C03'): 'persisted',
+                          ('B02', 'C03'): 'persisted', ('D04', 'A01'): 'disappeared'})
+
+    def test_same_partition_persists(self):
+        before = self.partition(1, self.BEFORE)
+        rows = before.select(0.0, 10.0, 1.0, 1.0)
+        diff = edge_diff(before, rows, before, rows, 0.0)
+        self.assertEqual(diff.counts(), {'appeared': 0, 'disappeared': 0, 'persisted': len(rows), 'changed': 0})
+
+    def test_diff_elements(self):
+        nodes, edges, _ = diff_elements(self.diff(), NodeTable.from_frame(node_frame()))
+        self.assertEqual({n['data']['id']: n['classes'] for n in nodes},
+                         {'A01': 'persisted', 'B02': 'persisted', 'C03': 'persisted',
+                          'D04': 'disappeared', 'E05': 'appeared'})
+        for edge in edges:
+            data = edge['data']
+            status, rr_from, rr_to = self.EXPECTED[(data['source'], data['target'])]
+            self.assertEqual((edge['classes'], data['status'], data['rr_from'], data['rr_to']),
+                             (status, status, rr_from, rr_to))
+class EdgeTimeSeriesTest(TestCase):
+    """시계열 배열에서 꺼낸 값을 follow-up 파티션에서 직접 찾은 값과 비교합니다."""
+
+    def setUp(self):
+        # follow-up 2에는 코드 U20~Y24가 없음
+        self.partitions = [
+            EdgePartition.from_frame(follow_up, random_edge_frame(n_codes=n_codes, n_edges=150, seed=10 + follow_up))
+            for follow_up, n_codes in ((1, 25), (2, 20), (3, 25))
+        ]
+        self.series = build_timeseries(self.partitions)
+        self.rows = [
+            {edge: row for row, edge in enumerate(zip(p.codes[p.cause].tolist(), p.codes[p.outcome].tolist()))}
+            for p in self.partitions
+        ]
+
+    def test_series(self):
+        pairs = sorted(set().union(*self.rows))[::7] + [('A00', 'ZZZ'), ('ZZZ', 'A00')]
+        sources, targets = (np.array(codes) for codes in zip(*pairs))
+        values = self.series.series(sources, targets)
+        for field, name in (('rr', 'rr'), ('log_rr', 'log_rr'), ('chisq_p', 'chisq'), ('fisher_p', 'fisher')):
+            expected = np.full((len(pairs), len(self.partitions)), np.nan, dtype=np.float32)
+            for column, (partition, rows) in enumerate(zip(self.partitions, self.rows)):
+                for i, pair in enumerate(pairs):
+                    if pair in rows:
+                        expected[i, column] = getattr(partition, name)[rows[pair]]
+            with self.subTest(field=field):
+                np.testing.assert_array_equal(values[SERIES_FIELDS.index(field)], expected)
+
+    def test_node_series(self):
+        codes = ['A00', 'K10', 'U20', 'ZZZ']
+        band = (-0.5, 1.0, 0.6, 0.6)  # log RR 범위, p-value 임계값
+        result = self.series.node_series(codes, *band)
+        for column, p in enumerate(self.partitions):
+            mask = ((p.log_rr >= np.float32(band[0])) & (p.log_rr <= np.float32(band[1]))
+                    & (p.chisq <= np.float32(band[2])) & (p.fisher <= np.float32(band[3])))
+            for slot, code in enumerate(codes):
+                node = p.code_id(code)
+                out_edges = mask & (p.cause == node) if node is not None else np.zeros(len(p), dtype=bool)
+                in_edges = mask & (p.outcome == node) if node is not None else np.zeros(len(p), dtype=bool)
+                expected = {
+                    'out_degree': out_edges.sum(),
+                    'in_degree': in_edges.sum(),
+                    'out_strength': p.rr[out_edges].astype(np.float64).sum(),
+                    'in_strength': p.rr[in_edges].astype(np.float64).sum(),
                 }
-            ],
-            layout: {
-                name: 'fcose',
-                nodeRepulsion: 20000,
-                idealEdgeLength: 250,
-                gravity: 0.001,
-                numIter: 5000,
-                avoidOverlap: true,
-                padding: 50,
-                nodeSeparation: 100,
-                uniformNodeDimensions: false,
-                randomize: true,
-                fit: true
-            }
-        });
-
-        function updateFollowUpValue(value) {
-            document.getElementById('follow-up-display').innerText = value;
-            document.getElementById('follow-up-value').innerText = value;
-        }
+                with self.subTest(follow_up=p.follow_up, code=code):
+                    np.testing.assert_allclose(result[:, slot, column], [expected[f] for f in NODE_FIELDS])
 
-        function updateRRValue() {
-            let min = document.getElementById("rr-min").value;
-            let max = document.getElementById("rr-max").value;
-            document.getElementById("rr-value").innerText = min + " ~ " + max;
-        }
 
-        function updateChisqValue() {
-            document.getElementById("chisq-value").innerText = document.getElementById("chisq-p").value;
-        }
+class ComputeMetricsTest(TestCase):
+    """compute_metrics()의 density/clustering/component 값을 networkx와 비교합니다."""
 
-        function updateFisherValue() {
-            document.getElementById("fisher-value").innerText = document.getElementById("fisher-p").value;
-        }
-    </script>
+    def setUp(self):
+        df = random_edge_frame(n_codes=30, n_edges=150, seed=9)
+        # 자기 자신으로 가는 엣지 (같은 쌍이 이미 있으면 대체)
+        loop = df.iloc[[0]].assign(outcome_abb=df['cause_abb'].iloc[0])
+        df = pd.concat([df[(df['cause_abb'] != loop['cause_abb'].iloc[0])
+                           | (df['outcome_abb'] != loop['outcome_abb'].iloc[0])], loop])
+        self.partition = EdgePartition.from_frame(1, df)
 
-</body>
-</html>
+    def test_matches_networkx(self):
+        p = self.partition
+        for case in [(0.5, 4.0, 1.0, 1.0), (1.0, 2.5, 0.5, 0.5), (2.0, 4.0, 0.3, 0.9)]:
+            rows = p.select(*case)
+            metrics = compute_metrics(p, rows)
+            graph = nx.DiGraph()
+            graph.add_edges_from(zip(p.codes[p.cause[rows]].tolist(), p.codes[p.outcome[rows]].tolist()))
+            simple = graph.copy()
+            simple.remove_edges_from(list(nx.selfloop_edges(simple)))
+            undirected = nx.Graph(simple)
+            weak = [len(c) for c in nx.weakly_connected_components(graph)]
+            strong = [len(c) for c in nx.strongly_connected_components(graph)]
+            with self.subTest(case=case):
+                self.assertEqual((metrics['nodes'], metrics['edges'], metrics['self_loops']),
+                                 (graph.number_of_nodes(), graph.number_of_edges(), nx.number_of_selfloops(graph)))
+                self.assertAlmostEqual(metrics['density'], nx.density(simple))
+                self.assertAlmostEqual(metrics['clustering']['average'], nx.average_clustering(undirected))
+                self.assertAlmostEqual(metrics['clustering']['transitivity'], nx.transitivity(undirected))
+                self.assertEqual(metrics['components'], {
+                    'weak': len(weak), 'strong': len(strong),
+                    'largest_weak': max(weak), 'largest_strong': max(strong),
+                })
@@ -0,0 +1,253 @@
+"""
+엣지/노드 통계의 follow-up별 시계열.
+
+모든 follow-up 파티션에 나오는 (cause, outcome) 쌍에 pair_id를 붙이고, 통계값을
+[필드, pair_id, follow-up] float32 배열 하나에 펼쳐 둡니다 (해당 follow-up에 없는 칸은
+NaN). 엣지 여러 개의 시계열은 pair_id 배열로 한 번 인덱싱하면 되고, 노드의 차수/
+강도(RR 합)도 같은 배열에서 임계값 마스크와 bincount로 계산합니다.
+
+신뢰구간은 파티션 스냅샷에 없으므로 settings.EDGE_TIMESERIES['CI_COLUMNS']에
+edge_stat의 (하한, 상한) 컬럼 이름을 지정한 경우에만 별도 배열(ci)을 만들어 DB에서
+읽어 채웁니다. 지정하지 않으면 신뢰구간 배열은 만들지 않습니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from . import snapshot
+from .db import get_db_connection
+
+DEFAULT_EDGE_TIMESERIES = {
+    'FOLLOW_UPS': list(range(1, 11)),
+    # edge_stat의 신뢰구간 (하한, 상한) 컬럼 이름. None이면 CI 없이 응답
+    'CI_COLUMNS': None,
+}
+
+# 엣지 시계열 필드 (values의 첫 번째 축 순서)
+SERIES_FIELDS = ('rr', 'log_rr', 'chisq_p', 'fisher_p')
+
+# 신뢰구간 필드 (ci의 첫 번째 축 순서, CI_COLUMNS를 지정한 경우에만)
+CI_FIELDS = ('ci_lower', 'ci_upper')
+
+# 노드 시계열 필드
+NODE_FIELDS = ('out_degree', 'in_degree', 'out_strength', 'in_strength')
+
+
+def timeseries_options():
+    """settings.EDGE_TIMESERIES를 기본값과 합친 설정."""
+    return {**DEFAULT_EDGE_TIMESERIES, **getattr(settings, 'EDGE_TIMESERIES', {})}
+
+
+class EdgeTimeSeries:
+    """
+    (pair_id × follow-up) 통계 배열입니다.
+
+    Attributes:
+        follow_ups: follow-up 기간 배열 (values의 마지막 축 순서)
+        codes: 모든 파티션 코드 사전의 합집합 (정렬)
+        pair_keys: 정렬된 쌍 키 (cause * len(codes) + outcome), 인덱스가 pair_id
+        cause, outcome: pair_id별 codes 인덱스
+        values: [len(SERIES_FIELDS), 쌍 수, follow-up 수] float32 (없는 칸은 NaN)
+        ci: [len(CI_FIELDS), 쌍 수, follow-up 수] float32 또는 None (신뢰구간을 읽지 않은 경우)
+    """
+
+    def __init__(self, follow_ups, codes, pair_keys, values, ci=None):
+        self.follow_ups = np.asarray(follow_ups, dtype=np.int64)
+        self.codes = codes
+        self.pair_keys = pair_keys
+        self.cause = pair_keys // len(codes) if len(codes) else pair_keys
+        self.outcome = pair_keys % len(codes) if len(codes) else pair_keys
+        self.values = values
+        self.ci = ci
+
+    def __len__(self):
+        return len(self.pair_keys)
+
+    @property
+    def has_ci(self):
+        """신뢰구간을 채웠는지."""
+        return self.ci is not None
+
+    @property
+    def fields(self):
+        """series()가 반환하는 필드 (신뢰구간이 있으면 SERIES_FIELDS 뒤에 CI_FIELDS)."""
+        return SERIES_FIELDS + CI_FIELDS if self.has_ci else SERIES_FIELDS
+
+    def code_ids(self, codes):
+        """질병 코드 배열의 사전 인덱스 (없는 코드는 -1)."""
+        codes = np.asarray(codes, dtype=str)
+        if len(self.codes) == 0:
+            return np.full(len(codes), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+        return np.where(self.codes[pos] == codes, pos, -1)
+
+    def pair_ids(self, sources, targets):
+        """
+        (source, target) 코드 쌍의 pair_id를 구합니다.
+
+        Returns:
+            np.ndarray: pair_id 배열 (어느 follow-up에도 없는 쌍은 -1)
+        """
+        cause, outcome = self.code_ids(sources), self.code_ids(targets)
+        if len(self) == 0:
+            return np.full(len(cause), -1, dtype=np.int64)
+        keys = cause * len(self.codes) + outcome
+        pos = np.minimum(np.searchsorted(self.pair_keys, keys), len(self) - 1)
+        return np.where((cause >= 0) & (outcome >= 0) & (self.pair_keys[pos] == keys), pos, -1)
+
+    def series(self, sources, targets):
+        """
+        엣지들의 시계열을 한 번의 인덱싱으로 꺼냅니다.
+
+        Args:
+            sources, targets: cause/outcome 질병 코드 배열
+
+        Returns:
+            np.ndarray: [len(self.fields), 엣지 수, follow-up 수] (없는 쌍은 모두 NaN)
+        """
+        ids = self.pair_ids(sources, targets)
+        found = ids >= 0
+        values = np.full((len(self.fields), len(ids), len(self.follow_ups)), np.nan, dtype=np.float32)
+        values[:len(SERIES_FIELDS), found] = self.values[:, ids[found]]
+        if self.has_ci:
+            values[len(SERIES_FIELDS):, found] = self.ci[:, ids[found]]
+        return values
+
+    def node_series(self, codes, rr_min, rr_max, chisq_max, fisher_max):
+        """
+        노드별 follow-up마다의 차수와 강도(RR 합)를 구합니다.
+
+        메인 네트워크와 같이 log RR 범위와 p-value 임계값을 만족하는 엣지만 셉니다.
+
+        Args:
+            codes: 질병 코드 배열
+            rr_min, rr_max: log RR 범위
+            chisq_max, fisher_max: p-value 임계값
+
+        Returns:
+            np.ndarray: [len(NODE_FIELDS), 노드 수, follow-up 수] float64
+        """
+        ids = self.code_ids(codes)
+        result = np.zeros((len(NODE_FIELDS), len(ids), len(self.follow_ups)))
+        # 요청한 노드가 한쪽 끝인 쌍만 골라 임계값 마스크 계산
+        slot = np.full(len(self.codes) + 1, -1, dtype=np.int64)
+        slot[ids[ids >= 0]] = np.flatnonzero(ids >= 0)
+        pairs = np.flatnonzero((slot[self.cause] >= 0) | (slot[self.outcome] >= 0))
+        rr, log_rr, chisq, fisher = self.values[:, pairs]
+        with np.errstate(invalid='ignore'):
+            mask = ((log_rr >= np.float32(rr_min)) & (log_rr <= np.float32(rr_max)) &
+                    (chisq <= np.float32(chisq_max)) & (fisher <= np.float32(fisher_max)))
+        weight = np.where(mask, rr, 0).astype(np.float64)
+        for degree, strength, ends in ((0, 2, self.cause), (1, 3, self.outcome)):
+            node = slot[ends[pairs]]
+            keep = node >= 0
+            np.add.at(result[degree], node[keep], mask[keep])
+            np.add.at(result[strength], node[keep], weight[keep])
+        return result
+
+
+def series_lists(values, integer=False):
+    """
+    [n, follow-up 수] 배열을 JSON용 리스트로 바꿉니다.
+
+    NaN은 None, float32 값은 유효숫자 7자리로 표기하며 integer=True(차수)이면 정수로 바꿉니다.
+    """
+    if integer:
+        return np.asarray(values).astype(np.int64).tolist()
+    return [[None if v != v else float(f"{v:.7g}") for v in row] for row in np.asarray(values).tolist()]
+
+
+def build_timeseries(partitions):
+    """
+    follow-up 파티션들로 EdgeTimeSeries를 만듭니다 (신뢰구간 없음).
+
+    Args:
+        partitions: EdgePartition 목록 (follow-up 순)
+
+    Returns:
+        EdgeTimeSeries: 시계열 배열
+    """
+    codes = np.unique(np.concatenate([p.codes for p in partitions])) if partitions else np.empty(0, dtype=str)
+    n_codes = max(len(codes), 1)
+    keys = []
+    for partition in partitions:
+        remap = np.searchsorted(codes, partition.codes)
+        keys.append(remap[partition.cause].astype(np.int64) * n_codes + remap[partition.outcome])
+    pair_keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+
+    values = np.full((len(SERIES_FIELDS), len(pair_keys), len(partitions)), np.nan, dtype=np.float32)
+    for column, (partition, partition_keys) in enumerate(zip(partitions, keys)):
+        ids = np.searchsorted(pair_keys, partition_keys)
+        for field, array in (('rr', partition.rr), ('log_rr', partition.log_rr),
+                             ('chisq_p', partition.chisq), ('fisher_p', partition.fisher)):
+            values[SERIES_FIELDS.index(field), ids, column] = array
+    return EdgeTimeSeries([p.follow_up for p in partitions], codes, pair_keys, values)
+
+
+def load_ci(series, columns, engine=None):
+    """
+    edge_stat의 신뢰구간 컬럼을 읽어 series.ci(ci_lower/ci_upper)를 만듭니다.
+
+    Args:
+        series: EdgeTimeSeries
+        columns: (하한, 상한) 컬럼 이름 (settings에서 지정한 값)
+        engine: SQLAlchemy 엔진 (생략 시 get_db_connection())
+    """
+    lower, upper = columns
+    engine = engine or get_db_connection()
+    query = f"SELECT fu, cause_abb, outcome_abb, {lower}, {upper} FROM edge_stat"
+    column_of = {int(fu): i for i, fu in enumerate(series.follow_ups.tolist())}
+    ci = np.full((len(CI_FIELDS), len(series), len(series.follow_ups)), np.nan, dtype=np.float32)
+    for chunk in pd.read_sql_query(query, engine, chunksize=snapshot.LOAD_CHUNKSIZE):
+        column = chunk['fu'].map(column_of)
+        keep = column.notna().to_numpy()
+        ids = series.pair_ids(chunk['cause_abb'].astype(str).to_numpy()[keep],
+                              chunk['outcome_abb'].astype(str).to_numpy()[keep])
+        found = ids >= 0
+        cols = column.to_numpy()[keep][found].astype(np.int64)
+        for i, name in enumerate((lower, upper)):
+            ci[i, ids[found], cols] = pd.to_numeric(chunk[name], errors='coerce').to_numpy(dtype=np.float32)[keep][found]
+    series.ci = ci
+
+
+def load_timeseries():
+    """
+    설정된 follow-up 파티션으로 시계열을 만들고, CI 컬럼이 지정되어 있으면 DB에서 채웁니다.
+
+    Returns:
+        EdgeTimeSeries: 시계열 배열
+    """
+    options = timeseries_options()
+    series = build_timeseries([snapshot.get_partition(fu) for fu in options['FOLLOW_UPS']])
+    if options['CI_COLUMNS']:
+        load_ci(series, options['CI_COLUMNS'])
+    return series
+
+
+_series = None
+_lock = threading.Lock()
+
+
+def get_timeseries():
+    """
+    시계열 배열을 반환합니다. 처음 요청될 때 한 번만 만듭니다.
+
+    Returns:
+        EdgeTimeSeries: 시계열 배열
+    """
+    global _series
+    if _series is not None:
+        return _series
+    with _lock:
+        if _series is None:
+            _series = load_timeseries()
+    return _series
+
+
+def clear():
+    """만들어 둔 시계열을 버립니다. 다음 요청 시 다시 만듭니다."""
+    global _series
+    with _lock:
+        _series = None
@@ -4,6 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.visualization_home, name='visualization_home'),  # Follow-up 입력 페이지
     path('graph/', views.graph_page, name='graph_page'),           # 그래프 표시 페이지
+    path('graph/data/', views.graph_data, name='graph_data'),      # 메인 네트워크 데이터 (JSON, ETag)
+    path('graph/diff/', views.graph_diff, name='graph_diff'),      # 두 follow-up 기간 비교 (temporal diff)
+    path('graph/metrics/', views.graph_metrics, name='graph_metrics'),  # 네트워크 구조 지표
+    path('graph/size/', views.graph_size, name='graph_size'),      # 그래프 크기 미리보기 (임계값 큐브)
     path('search_pubmed/', views.search_pubmed, name='search_pubmed'),
     path('get_network_data', views.get_network_data, name='get_network_data'),  # 네트워크 데이터 제공
     path('main_select/', views.main_select, name='main_select'),
@@ -12,9 +16,13 @@ urlpatterns = [
     path('sub_select/', views.sub_select, name='sub_select'),
     path('sub_disease_graph/', views.sub_disease_graph, name='sub_disease_graph'),
     path('check_disease_connection/', views.check_disease_connection, name='check_disease_connection'),
-    path('get_connected_diseases/', views.get_connected_diseases, name='get_connected_diseases'),
+    path('get_disease_neighbors/', views.get_disease_neighbors, name='get_disease_neighbors'),  # 이웃 질병 (페이지네이션)
     path('mypage/', views.mypage, name='mypage'),
     path('get_detail_info/', views.get_detail_info, name='get_detail_info'),
+    path('get_detail_info_batch/', views.get_detail_info_batch, name='get_detail_info_batch'),
+    path('get_timeseries/', views.get_timeseries, name='get_timeseries'),  # follow-up별 엣지/노드 시계열
     path('save_graph/', views.save_graph, name='save_graph'),
     path('analysis_history/', views.analysis_history, name='analysis_history'),
+    path('db_pool_status/', views.db_pool_status, name='db_pool_status'),
+    path('graph_cache_status/', views.graph_cache_status, name='graph_cache_status'),
 ]
@@ -0,0 +1,147 @@
+"""
+그래프 payload의 압축 바이너리 전송 형식.
+
+Cytoscape JSON은 엣지마다 "data"/"source"/"target" 키와 질병 코드 문자열을 반복하므로,
+노드 테이블을 한 번만 보내고 엣지는 노드 인덱스 배열로 보냅니다.
+클라이언트 디코더는 network/static/js/graph_codec.js 입니다.
+
+형식 (little-endian):
+    magic 'CTDX'(4) | version uint8 | flags uint8 | reserved uint16
+    node_count uint32 | edge_count uint32 | meta_len uint32
+    meta JSON (utf-8, 4바이트 정렬 패딩): {"ids", "labels", "palette", "pinned", "positions"}
+    width float32[N] | height float32[N] | color uint8[N] (4바이트 정렬 패딩)
+    source uint16[E] | target uint16[E] (4바이트 정렬 패딩) | weight float32[E]
+
+flags의 FLAG_WIDE_INDEX가 켜져 있으면 source/target은 uint32입니다.
+"""
+import json
+import struct
+
+import numpy as np
+
+from .payload import DEFAULT_SIZE, edge_weights, pastel_colors_for
+
+CONTENT_TYPE = 'application/x-cotdex-graph'
+MAGIC = b'CTDX'
+VERSION = 1
+FLAG_WIDE_INDEX = 0x01
+
+_HEADER = struct.Struct('<4sBBHIII')
+
+
+def _pad(buf):
+    return buf + b'\0' * (-len(buf) % 4)
+
+
+def encode_elements(cause, outcome, rr_values, table, codes=None, weight_clip=None, pinned=None,
+                    positions=None):
+    """
+    엣지 컬럼 배열을 바이너리 그래프 payload로 인코딩합니다.
+
+    Args:
+        cause, outcome: 노드 코드 배열 (codes 지정 시 codes에 대한 정수 인덱스 배열)
+        rr_values: RR 값 배열 (엣지 weight)
+        table: NodeTable
+        codes: cause/outcome 인덱스가 가리키는 코드 사전
+        weight_clip: (최소, 최대) weight 범위
+        pinned: {코드: 위치} 고정 위치 노드
+        positions: {코드: 위치} 서버 레이아웃 좌표 (network/layout.py)
+
+    Returns:
+        bytes: 인코딩된 payload
+    """
+    cause = np.asarray(cause)
+    outcome = np.asarray(outcome)
+    endpoints = np.concatenate([cause, outcome])
+    uniq, inverse = np.unique(endpoints, return_inverse=True)
+    node_codes = codes[uniq] if codes is not None else uniq.astype(str)
+    source = inverse[:len(cause)]
+    target = inverse[len(cause):]
+
+    pos = table.lookup(node_codes)
+    known = pos >= 0
+    safe = np.where(known, pos, 0)
+    if len(table.codes):
+        width = np.where(known, table.width[safe], DEFAULT_SIZE)
+        height = np.where(known, table.height[safe], DEFAULT_SIZE)
+        labels = np.where(known, table.labels[safe], node_codes.astype(object))
+    else:
+        width = height = np.full(len(node_codes), DEFAULT_SIZE, dtype=np.float64)
+        labels = node_codes.astype(object)
+    palette, color_index = np.unique(pastel_colors_for(node_codes).astype(str), return_inverse=True)
+
+    pinned = pinned or {}
+    positions = positions or {}
+    meta = _pad(json.dumps({
+        'ids': node_codes.tolist(),
+        'labels': labels.tolist(),
+        'palette': palette.tolist(),
+        'pinned': {code: pinned[code] for code in node_codes.tolist() if code in pinned},
+        'positions': {code: positions[code] for code in node_codes.tolist()
+                      if code in positions and code not in pinned},
+    }, ensure_ascii=False).encode())
+
+    wide = len(node_codes) > np.iinfo(np.uint16).max
+    index_dtype = '<u4' if wide else '<u2'
+    header = _HEADER.pack(MAGIC, VERSION, FLAG_WIDE_INDEX if wide else 0, 0,
+                          len(node_codes), len(cause), len(meta))
+    return b''.join([
+        header,
+        meta,
+        _pad(np.asarray(width, dtype='<f4').tobytes()
+             + np.asarray(height, dtype='<f4').tobytes()
+             + color_index.astype(np.uint8).tobytes()),
+        _pad(source.astype(index_dtype).tobytes() + target.astype(index_dtype).tobytes()),
+        edge_weights(rr_values, clip=weight_clip).astype('<f4').tobytes(),
+    ])
+
+
+def decode_elements(data):
+    """
+    바이너리 payload를 Cytoscape 노드/엣지 목록으로 복원합니다 (검증/테스트용).
+
+    Args:
+        data: encode_elements()가 만든 bytes
+
+    Returns:
+        tuple: (nodes, edges)
+    """
+    magic, version, flags, _, n_nodes, n_edges, meta_len = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("지원되지 않는 그래프 payload 형식입니다.")
+    offset = _HEADER.size
+    meta = json.loads(data[offset:offset + meta_len].rstrip(b'\0'))
+    offset += meta_len
+
+    width = np.frombuffer(data, '<f4', n_nodes, offset)
+    height = np.frombuffer(data, '<f4', n_nodes, offset + 4 * n_nodes)
+    color = np.frombuffer(data, np.uint8, n_nodes, offset + 8 * n_nodes)
+    offset += 9 * n_nodes + (-9 * n_nodes % 4)
+
+    index_dtype = '<u4' if flags & FLAG_WIDE_INDEX else '<u2'
+    itemsize = np.dtype(index_dtype).itemsize
+    source = np.frombuffer(data, index_dtype, n_edges, offset)
+    target = np.frombuffer(data, index_dtype, n_edges, offset + itemsize * n_edges)
+    offset += 2 * itemsize * n_edges
+    offset += -offset % 4
+    weight = np.frombuffer(data, '<f4', n_edges, offset)
+
+    ids = meta['ids']
+    nodes = []
+    for i, code in enumerate(ids):
+        node = {
+            "data": {"id": code, "label": meta['labels'][i],
+                     "width": float(width[i]), "height": float(height[i])},
+            "style": {"background-color": meta['palette'][color[i]]},
+        }
+        if code in meta['pinned']:
+            node["position"] = meta['pinned'][code]
+            node["locked"] = True
+        elif code in meta.get('positions', {}):
+            node["position"] = meta['positions'][code]
+        nodes.append(node)
+    edges = [
+        {"data": {"source": ids[s], "target": ids[t], "weight": float(w)}}
+        for s, t, w in zip(source.tolist(), target.tolist(), weight.tolist())
+    ]
+    return nodes, edges
@@ -0,0 +1,109 @@
+"""
+그래프 payload 생성 벤치마크: 기존 iterrows 루프 vs network.payload 벡터화 빌더.
+
+실행: python scripts/bench_payload.py
+(합성 데이터 사용, DB 불필요)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from network import payload  # noqa: E402
+
+N_NODES = 1187
+EDGE_COUNTS = [1_000, 10_000, 30_000, 100_000]
+REPEAT = 3
+
+
+def make_data(n_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"{chr(ord('A') + i % 26)}{i:03d}" for i in range(N_NODES)])
+    disease_df = pd.DataFrame({
+        'code': codes,
+        'width': rng.random(N_NODES),
+        'height': rng.random(N_NODES),
+        'Korean': [f"질병{c}" for c in codes],
+    })
+    df = pd.DataFrame({
+        'cause_abb': codes[rng.integers(0, N_NODES, n_edges)],
+        'outcome_abb': codes[rng.integers(0, N_NODES, n_edges)],
+        'rr_values': np.exp(rng.normal(0.3, 0.5, n_edges)),
+    })
+    return df, disease_df
+
+
+def legacy_build(df, disease_df):
+    """기존 graph_page의 iterrows 기반 payload 생성 (비교 기준)."""
+    pastel_colors = payload.PASTEL_COLORS
+    nodes = []
+    edges = []
+    unique_nodes = set()
+
+    size_mapping = {
+        row['code']: {
+            'width': round(row['width'] * 80, 2) if pd.notna(row['width']) else 30,
+            'height': round(row['height'] * 80, 2) if pd.notna(row['height']) else 30
+        }
+        for _, row in disease_df.iterrows()
+    }
+    label_mapping = {
+        row['code']: row['Korean'] if pd.notna(row['Korean']) else row['code']
+        for _, row in disease_df.iterrows()
+    }
+
+    for _, row in df.iterrows():
+        cause = row['cause_abb']
+        outcome = row['outcome_abb']
+        weight = max(1, min(10, round(row['rr_values'], 2)))
+        for node in [cause, outcome]:
+            if node not in unique_nodes:
+                size = size_mapping.get(node, {'width': 30, 'height': 30})
+                nodes.append({
+                    "data": {
+                        "id": node,
+                        "label": label_mapping.get(node, node),
+                        "width": size['width'],
+                        "height": size['height']
+                    },
+                    "style": {"background-color": pastel_colors.get(node[0], "#666")}
+                })
+                unique_nodes.add(node)
+        edges.append({"data": {"source": cause, "target": outcome, "weight": weight}})
+    return nodes, edges
+
+
+def vectorized_build(df, disease_df):
+    nodes, edges, _ = payload.build_elements(
+        df['cause_abb'].to_numpy(),
+        df['outcome_abb'].to_numpy(),
+        df['rr_values'].to_numpy(),
+        payload.NodeTable.from_frame(disease_df),
+        weight_clip=(1, 10),
+    )
+    return nodes, edges
+
+
+def best_of(func, *args):
+    best = float('inf')
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+if __name__ == '__main__':
+    print(f"{'edges':>8} {'nodes':>6} {'iterrows (ms)':>14} {'vectorized (ms)':>16} {'speedup':>8}")
+    for n_edges in EDGE_COUNTS:
+        df, disease_df = make_data(n_edges)
+        legacy_time, (legacy_nodes, legacy_edges) = best_of(legacy_build, df, disease_df)
+        new_time, (new_nodes, new_edges) = best_of(vectorized_build, df, disease_df)
+        assert legacy_nodes == new_nodes and legacy_edges == new_edges
+        print(f"{n_edges:>8} {len(new_nodes):>6} {legacy_time * 1e3:>14.1f} "
+              f"{new_time * 1e3:>16.1f} {legacy_time / new_time:>7.1f}x")
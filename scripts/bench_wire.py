@@ -0,0 +1,64 @@
+"""
+그래프 payload 전송 형식 벤치마크: Cytoscape JSON vs network.wire 바이너리.
+
+크기(원본/gzip)와 인코딩 시간을 비교하고, 바이너리를 디코딩한 결과가 JSON과
+같은지 확인합니다.
+
+실행: python scripts/bench_wire.py
+(합성 데이터 사용, DB 불필요)
+"""
+import gzip
+import json
+import os
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from network import payload, wire  # noqa: E402
+from bench_payload import EDGE_COUNTS, best_of, make_data  # noqa: E402
+
+
+def json_encode(cause, outcome, rr, table):
+    nodes, edges, _ = payload.build_elements(cause, outcome, rr, table, weight_clip=(1, 10))
+    return json.dumps({"nodes": nodes, "edges": edges}, ensure_ascii=False).encode()
+
+
+def binary_encode(cause, outcome, rr, table):
+    return wire.encode_elements(cause, outcome, rr, table, weight_clip=(1, 10))
+
+
+def same_elements(json_body, binary_body):
+    expected = json.loads(json_body)
+    nodes, edges = wire.decode_elements(binary_body)
+    key = lambda node: node['data']['id']  # noqa: E731
+    expected_nodes = sorted(expected['nodes'], key=key)
+    if [n['data']['id'] for n in expected_nodes] != [n['data']['id'] for n in sorted(nodes, key=key)]:
+        return False
+    if len(edges) != len(expected['edges']):
+        return False
+    for got, want in zip(edges, expected['edges']):
+        got, want = got['data'], want['data']
+        if (got['source'], got['target']) != (want['source'], want['target']):
+            return False
+        if not np.isclose(got['weight'], want['weight'], rtol=1e-6):
+            return False
+    return True
+
+
+if __name__ == '__main__':
+    print(f"{'edges':>8} {'json (KB)':>10} {'gzip':>8} {'binary (KB)':>12} {'gzip':>8} "
+          f"{'json (ms)':>10} {'binary (ms)':>12}")
+    for n_edges in EDGE_COUNTS:
+        df, disease_df = make_data(n_edges)
+        table = payload.NodeTable.from_frame(disease_df)
+        args = (df['cause_abb'].to_numpy(), df['outcome_abb'].to_numpy(),
+                df['rr_values'].to_numpy(), table)
+        json_time, json_body = best_of(json_encode, *args)
+        binary_time, binary_body = best_of(binary_encode, *args)
+        assert same_elements(json_body, binary_body)
+        print(f"{n_edges:>8} {len(json_body) / 1024:>10.1f} {len(gzip.compress(json_body)) / 1024:>8.1f} "
+              f"{len(binary_body) / 1024:>12.1f} {len(gzip.compress(binary_body)) / 1024:>8.1f} "
+              f"{json_time * 1e3:>10.1f} {binary_time * 1e3:>12.1f}")